@@ -0,0 +1,69 @@
+"""
+Benchmark contact submission writes: one insert_one per submission versus the
+write-behind queue batching them into insert_many.
+Run against a scratch database: DB_NAME=portfolio_bench python benchmark_contact_writes.py
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime
+from database import db, close_database
+from write_behind import WriteBehindQueue
+
+SUBMISSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+def make_submission(index):
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Benchmark {index}",
+        "email": f"bench{index}@example.com",
+        "service": "consulting",
+        "message": "Benchmark submission",
+        "submitted_at": datetime.utcnow(),
+        "status": "new"
+    }
+
+async def run_concurrently(submit):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(index):
+        async with semaphore:
+            await submit(make_submission(index))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(SUBMISSIONS)))
+    return time.perf_counter() - started
+
+async def benchmark():
+    collection = db.contact_submissions_benchmark
+    await collection.drop()
+
+    # Synchronous path: the request waits for its own insert_one
+    sync_seconds = await run_concurrently(collection.insert_one)
+    await collection.drop()
+
+    # Write-behind path: the request only waits for the enqueue, timing includes the final drain
+    queue = WriteBehindQueue(collection, max_size=SUBMISSIONS)
+    queue.start()
+
+    async def enqueue(document):
+        queue.put(document)
+
+    accept_seconds = await run_concurrently(enqueue)
+    drain_started = time.perf_counter()
+    await queue.stop()
+    total_seconds = accept_seconds + time.perf_counter() - drain_started
+    stored = await collection.count_documents({})
+    await collection.drop()
+
+    print(f"📨 {SUBMISSIONS} submissions, concurrency {CONCURRENCY}")
+    print(f"   insert_one per request: {sync_seconds:.3f}s ({SUBMISSIONS / sync_seconds:,.0f}/s)")
+    print(f"   write-behind accept:    {accept_seconds:.3f}s ({SUBMISSIONS / accept_seconds:,.0f}/s)")
+    print(f"   write-behind persisted: {total_seconds:.3f}s ({SUBMISSIONS / total_seconds:,.0f}/s) "
+          f"in {queue.batches} batches, {stored} stored")
+    await close_database()
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,89 @@
+"""
+Benchmark read throughput as the number of worker processes grows.
+Starts gunicorn (gunicorn.conf.py) with 1, 2, 4, ... workers on a scratch port and
+drives keep-alive GET requests at it from several client processes.
+Run next to a seeded database: python benchmark_workers.py [path] [seconds] [connections]
+"""
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from multiprocessing import Pool
+
+PATH = sys.argv[1] if len(sys.argv) > 1 else "/api/projects/"
+SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+CONNECTIONS = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+PORT = int(os.environ.get('BENCH_PORT', '8765'))
+APP = os.environ.get('BENCH_APP', 'server:app')
+CLIENT_PROCESSES = max(1, (os.cpu_count() or 2) // 2)
+CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+
+def worker_counts():
+    counts, workers = [], 1
+    while workers <= (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    return counts
+
+async def drive_connection(deadline):
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    request = f"GET {PATH} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    completed = 0
+    while time.monotonic() < deadline:
+        writer.write(request)
+        headers = await reader.readuntil(b"\r\n\r\n")
+        match = CONTENT_LENGTH.search(headers)
+        await reader.readexactly(int(match.group(1)) if match else 0)
+        completed += 1
+    writer.close()
+    return completed
+
+def client_process(connections):
+    async def run():
+        deadline = time.monotonic() + SECONDS
+        return sum(await asyncio.gather(*(drive_connection(deadline) for _ in range(connections))))
+    return asyncio.run(run())
+
+def wait_until_ready(timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/health/ready", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError("Server did not become ready")
+
+def benchmark(workers):
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(PORT)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", APP, "-c", "gunicorn.conf.py"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready()
+        with Pool(CLIENT_PROCESSES) as pool:
+            share = [max(1, CONNECTIONS // CLIENT_PROCESSES)] * CLIENT_PROCESSES
+            started = time.perf_counter()
+            completed = sum(pool.map(client_process, share))
+            elapsed = time.perf_counter() - started
+        return completed / elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    print(f"⚙️ GET {PATH} for {SECONDS:g}s, {CONNECTIONS} connections from {CLIENT_PROCESSES} client processes")
+    baseline = None
+    for workers in worker_counts():
+        throughput = benchmark(workers)
+        baseline = baseline or throughput
+        print(f"   {workers:>2} workers: {throughput:>9,.0f} req/s ({throughput / baseline:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from pydantic import BaseModel, ValidationError
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from typing import Any, Dict, List, Optional, Tuple, Type
+from models import BulkOperation
+from datetime import datetime
+import uuid
+
+
+class BulkOutcome:
+    """Per-item results of a bulk write plus the documents it touched"""
+
+    def __init__(self, operation_count: int):
+        self.results: List[Dict[str, Any]] = [{} for _ in range(operation_count)]
+        self.inserted: List[Dict[str, Any]] = []
+        self.updated_ids: List[str] = []
+        self.deleted_ids: List[str] = []
+        self.counts: Dict[str, int] = {}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated_ids or self.deleted_ids)
+
+
+def _error_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+
+async def run_bulk_write(
+    collection,
+    operations: List[BulkOperation],
+    create_model: Type[BaseModel],
+    update_model: Type[BaseModel],
+    insert_defaults: Optional[Dict[str, Any]] = None,
+    timestamp_fields: Tuple[str, ...] = ("created_at", "updated_at"),
+    update_timestamp: Optional[str] = "updated_at",
+) -> BulkOutcome:
+    """Validate mixed insert/update/delete operations and run them as one unordered bulk_write.
+
+    Operations that fail validation or target unknown ids are reported per item;
+    everything else goes to Mongo in a single round trip. Updates are matched by
+    the write itself, so an id deleted concurrently is reported as not_found.
+    """
+    outcome = BulkOutcome(len(operations))
+    requests = []
+    request_indexes = []
+
+    # A delete leaves nothing behind to tell which ids it matched, so delete targets
+    # are looked up first. Ids are never reused: a target missing here cannot appear
+    # before the write, and one deleted concurrently after it is gone either way.
+    delete_ids = [operation.id for operation in operations if operation.op == "delete" and operation.id]
+    existing_ids = set()
+    if delete_ids:
+        async for document in collection.find({"id": {"$in": delete_ids}}, {"_id": 0, "id": 1}):
+            existing_ids.add(document["id"])
+
+    now = datetime.utcnow()
+    for index, operation in enumerate(operations):
+        result = outcome.results[index]
+        result.update({"index": index, "op": operation.op})
+        try:
+            if operation.op == "insert":
+                document = create_model(**(operation.data or {})).dict()
+                document.update(insert_defaults or {})
+                document["id"] = str(uuid.uuid4())
+                for field in timestamp_fields:
+                    document[field] = now
+                requests.append(InsertOne(document))
+                result["id"] = document["id"]
+                outcome.inserted.append(document)
+            elif operation.op in ("update", "delete"):
+                result["id"] = operation.id
+                if not operation.id:
+                    result.update({"status": "error", "error": "id is required"})
+                    continue
+                if operation.op == "update":
+                    update_dict = {k: v for k, v in update_model(**(operation.data or {})).dict().items() if v is not None}
+                    if update_timestamp:
+                        update_dict[update_timestamp] = now
+                    requests.append(UpdateOne({"id": operation.id}, {"$set": update_dict}, upsert=False))
+                    outcome.updated_ids.append(operation.id)
+                elif operation.id not in existing_ids:
+                    result.update({"status": "not_found"})
+                    continue
+                else:
+                    requests.append(DeleteOne({"id": operation.id}))
+                    outcome.deleted_ids.append(operation.id)
+            else:
+                result.update({"status": "error", "error": f"Unknown op: {operation.op}"})
+                continue
+        except ValidationError as e:
+            result.update({"status": "error", "error": _error_message(e)})
+            continue
+
+        result["status"] = "ok"
+        request_indexes.append(index)
+
+    if not requests:
+        return outcome
+
+    try:
+        bulk_result = await collection.bulk_write(requests, ordered=False)
+        details = bulk_result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        for write_error in details.get("writeErrors", []):
+            result = outcome.results[request_indexes[write_error["index"]]]
+            result.update({"status": "error", "error": write_error.get("errmsg", "Write failed")})
+            failed_id = result.get("id")
+            outcome.inserted = [document for document in outcome.inserted if document["id"] != failed_id]
+            outcome.updated_ids = [doc_id for doc_id in outcome.updated_ids if doc_id != failed_id]
+            outcome.deleted_ids = [doc_id for doc_id in outcome.deleted_ids if doc_id != failed_id]
+
+    outcome.counts = {
+        "inserted": details.get("nInserted", 0),
+        "matched": details.get("nMatched", 0),
+        "modified": details.get("nModified", 0),
+        "deleted": details.get("nRemoved", 0),
+    }
+    if outcome.counts["matched"] < len(outcome.updated_ids):
+        await _mark_unmatched_updates(collection, outcome)
+    for document in outcome.inserted:
+        document.pop("_id", None)
+    return outcome
+
+
+async def _mark_unmatched_updates(collection, outcome: BulkOutcome) -> None:
+    """Report the updates the write did not match as not_found.
+
+    The matched count only says how many missed; since ids are never reused, the
+    targets still missing after the write are exactly the ones it did not match.
+    """
+    found_ids = set()
+    async for document in collection.find({"id": {"$in": outcome.updated_ids}}, {"_id": 0, "id": 1}):
+        found_ids.add(document["id"])
+    for result in outcome.results:
+        if result.get("op") == "update" and result.get("status") == "ok" and result["id"] not in found_ids:
+            result["status"] = "not_found"
+    outcome.updated_ids = [doc_id for doc_id in outcome.updated_ids if doc_id in found_ids]
+
+
+async def fetch_documents(collection, ids: List[str]) -> List[Dict[str, Any]]:
+    """Load documents by id without their Mongo ObjectIds"""
+    if not ids:
+        return []
+    return await collection.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))
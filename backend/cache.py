@@ -0,0 +1,232 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+
+# Cache configuration
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '300'))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '512'))
+# How long an expired entry may still be served while one task refreshes it
+CACHE_STALE_SECONDS = float(os.environ.get('CACHE_STALE_SECONDS', '30'))
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Runs at most one loader per key at a time and shares its result.
+
+    Concurrent callers asking for a key that is already loading await the same
+    task instead of starting their own query. The loader runs in its own task,
+    so a caller that disconnects does not cancel the load for the others.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    def start(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start loading a key unless it already is, and return the task doing it"""
+        task = self._flights.get(key)
+        if task is None:
+            task = self._flights[key] = asyncio.get_running_loop().create_task(loader())
+            task.add_done_callback(lambda done: self._flights.pop(key, None))
+        return task
+
+    async def run(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the loader's result, joining a load of the same key that is in progress"""
+        if key in self._flights:
+            self.coalesced += 1
+        return await asyncio.shield(self.start(key, loader))
+
+    def __len__(self):
+        return len(self._flights)
+
+
+class ResponseCache:
+    """In-process read-through cache with TTL expiry and LRU eviction.
+
+    Entries are keyed by collection name plus the query parameters of the
+    request, so every write to a collection can drop all of its entries at once.
+    get_or_load coalesces concurrent misses into one load and keeps serving an
+    expired entry for up to stale_seconds while a single task refreshes it.
+    Invalidated entries are removed outright and never served stale.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        stale_seconds: float = CACHE_STALE_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(collection: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Build a hashable key from a collection name and query parameters"""
+        return (collection, tuple(sorted((params or {}).items())))
+
+    def get(self, collection: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Return a cached value, or None when missing or expired"""
+        key = self.make_key(collection, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            if expires_at + self.stale_seconds < time.monotonic():
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, collection: str, params: Optional[Dict[str, Any]], value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries when full"""
+        key = self.make_key(collection, params)
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        collection: str,
+        params: Optional[Dict[str, Any]],
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value or await the loader and cache its result.
+
+        Concurrent misses for the same key share one loader call. An entry that
+        expired less than stale_seconds ago is returned as is while the loader
+        refreshes it in the background.
+        """
+        key = self.make_key(collection, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < expires_at + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self.stale_served += 1
+                self._refresh(key, collection, params, loader, ttl)
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        # Flights are per collection version, so requests arriving after a write
+        # never join a load that may have read the data from before it
+        flight = (key, self.version(collection))
+        return await self._flights.run(flight, lambda: self._load(collection, params, loader, ttl))
+
+    async def _load(
+        self,
+        collection: str,
+        params: Optional[Dict[str, Any]],
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+    ) -> Any:
+        version = self.version(collection)
+        value = await loader()
+        # Skip storing results that a write invalidated while they were loading
+        if self.version(collection) == version:
+            self.set(collection, params, value, ttl=ttl)
+        return value
+
+    def _refresh(self, key: Tuple, collection: str, params, loader, ttl):
+        """Reload a stale entry in the background, once no matter how many requests see it"""
+        flight = (key, self.version(collection))
+        if self._flights.in_flight(flight):
+            return
+        self.refreshes += 1
+        task = self._flights.start(flight, lambda: self._load(collection, params, loader, ttl))
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: "asyncio.Task"):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            # The stale entry stays in place and the next request that sees it retries
+            self.refresh_failures += 1
+            logger.warning(f"Background cache refresh failed: {error}")
+
+    def version(self, collection: str) -> int:
+        """Return the content version of a collection, bumped on every invalidation"""
+        return self._versions.get(collection, 0)
+
+    def add_invalidation_listener(self, listener: Callable[[str], None]):
+        """Call listener(collection) whenever a local write invalidates a collection"""
+        self._listeners.append(listener)
+
+    def invalidate(self, collection: str, propagate: bool = True):
+        """Drop every cached entry belonging to a collection and bump its version.
+
+        propagate=False is used when applying another worker's invalidation, so it
+        is not announced again.
+        """
+        self._versions[collection] = self.version(collection) + 1
+        stale_keys = [key for key in self._entries if key[0] == collection]
+        for key in stale_keys:
+            del self._entries[key]
+        self.invalidations += 1
+        if propagate:
+            for listener in self._listeners:
+                listener(collection)
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stale_seconds": self.stale_seconds,
+            "stale_served": self.stale_served,
+            "coalesced": self._flights.coalesced,
+            "in_flight": len(self._flights),
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Shared cache used by the routers
+response_cache = ResponseCache()
@@ -0,0 +1,134 @@
+from pymongo import ReturnDocument
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from cache import ResponseCache
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+async def bump_versions(collection, names: Iterable[str]):
+    """Announce changes made outside the API (e.g. by seed_data.py) to every running worker"""
+    await asyncio.gather(*(
+        collection.update_one({"_id": name}, {"$inc": {"version": 1}}, upsert=True) for name in names
+    ))
+
+# Worker processes serving the app; gunicorn.conf.py exports this to every worker
+WORKER_COUNT = max(1, int(os.environ.get('WEB_CONCURRENCY', '1')))
+# Version polling keeps workers consistent with each other and picks up changes that
+# scripts announce with bump_versions(), so it also runs with a single worker
+CACHE_COHERENCE = os.environ.get('CACHE_COHERENCE', 'true').lower() in ('1', 'true', 'yes')
+CACHE_COHERENCE_INTERVAL = float(os.environ.get('CACHE_COHERENCE_INTERVAL', '1'))
+
+
+class CacheCoherence:
+    """Keeps per-process caches consistent across workers through Mongo version documents.
+
+    Every local invalidation increments a {_id: <collection>, version} document.
+    Each worker polls the (tiny) version collection every interval seconds and,
+    when a version moved, drops its own cache entries for that collection and
+    runs the registered rebuild handlers, e.g. for the search index. Workers
+    therefore share nothing but a few counters, and see each other's writes
+    within one poll interval.
+    """
+
+    def __init__(self, cache: ResponseCache, collection, interval: float = CACHE_COHERENCE_INTERVAL):
+        self.cache = cache
+        self.collection = collection
+        self.interval = interval
+        self._seen: Dict[str, int] = {}
+        self._handlers: Dict[str, List[Callable[[], Awaitable[None]]]] = {}
+        self._publishing: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.applied = 0
+        cache.add_invalidation_listener(self._announce)
+
+    def on_change(self, collection: str, handler: Callable[[], Awaitable[None]]):
+        """Run handler when another worker changes a collection"""
+        self._handlers.setdefault(collection, []).append(handler)
+
+    def _announce(self, collection: str):
+        if self._task is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._publish(collection))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def announce(self, collections: Iterable[str]):
+        """Make every other worker treat these collections as changed"""
+        if self._task is not None:
+            await asyncio.gather(*(self._publish(collection) for collection in collections))
+
+    async def _publish(self, collection: str):
+        try:
+            document = await self.collection.find_one_and_update(
+                {"_id": collection},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self.published += 1
+            # Skip our own bump, unless it also hides a change from another worker
+            if self._seen.get(collection, 0) == document["version"] - 1:
+                self._seen[collection] = document["version"]
+        except Exception as e:
+            logger.error(f"Failed to announce invalidation of {collection}: {e}")
+
+    async def poll(self) -> List[str]:
+        """Apply every version change made by other workers since the last poll"""
+        changed = []
+        async for document in self.collection.find({}):
+            name, version = document["_id"], document["version"]
+            if self._seen.get(name, 0) != version:
+                self._seen[name] = version
+                changed.append(name)
+
+        handlers = []
+        for name in changed:
+            self.cache.invalidate(name, propagate=False)
+            self.applied += 1
+            for handler in self._handlers.get(name, []):
+                if handler not in handlers:
+                    handlers.append(handler)
+
+        # A handler shared by several changed collections runs once
+        for handler in handlers:
+            try:
+                await handler()
+            except Exception as e:
+                logger.error(f"Rebuild after remote change to {', '.join(changed)} failed: {e}")
+        return changed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Cache coherence poll failed: {e}")
+
+    async def start(self):
+        """Record the current versions, then follow changes in the background.
+
+        Call before warming in-memory state so no change can slip in between.
+        """
+        async for document in self.collection.find({}):
+            self._seen[document["_id"]] = document["version"]
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._publishing, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "enabled": self._task is not None,
+            "workers": WORKER_COUNT,
+            "published": self.published,
+            "applied": self.applied,
+        }
@@ -0,0 +1,184 @@
+from pymongo import monitoring
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_left
+from metrics import LATENCY_BUCKETS, metrics
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Commands slower than this are logged with their redacted filter shape
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+# Command fields that describe what was queried; inserted documents are never logged
+SHAPE_FIELDS = ("filter", "query", "sort", "projection", "pipeline", "updates", "deletes")
+
+
+class RequestDbTiming:
+    """Mongo time accumulated by one HTTP request.
+
+    Motor runs commands on its executor threads but copies the caller's context,
+    so the listener finds this object through request_db_timing and appends to it.
+    list.append is atomic, which keeps concurrent commands of one request safe.
+    """
+
+    __slots__ = ("durations",)
+
+    def __init__(self):
+        self.durations: List[float] = []
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.durations) * 1000
+
+
+request_db_timing: ContextVar[Optional[RequestDbTiming]] = ContextVar("request_db_timing", default=None)
+
+
+def redact(value: Any) -> Any:
+    """Replace every literal in a filter with '?' while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = redact(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def command_shape(command: Dict[str, Any]) -> Dict[str, Any]:
+    shape = {}
+    for field in SHAPE_FIELDS:
+        if field in command:
+            # Sort and projection specs carry no user data
+            shape[field] = command[field] if field in ("sort", "projection") else redact(command[field])
+    return shape
+
+
+class CommandStats:
+    __slots__ = ("buckets", "total", "count", "failures", "slow")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.failures = 0
+        self.slow = 0
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Times every Mongo command by name and collection.
+
+    Durations feed the metrics registry, the Server-Timing header of the request
+    that issued the command, and a slow-query log with redacted filters.
+    """
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, Tuple[str, Dict[str, Any]]] = {}
+        self._stats: Dict[Tuple[str, str], CommandStats] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            target = event.command.get("collection") if event.command_name == "getMore" else None
+        self._pending[(event.connection_id, event.request_id)] = (target or "", event.command)
+
+    def _finish(self, event, failed: bool):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, command = pending
+        seconds = event.duration_micros / 1_000_000
+
+        timing = request_db_timing.get()
+        if timing is not None:
+            timing.durations.append(seconds)
+
+        slow = seconds * 1000 >= self.slow_ms
+        key = (event.command_name, collection)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CommandStats()
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.total += seconds
+            stats.count += 1
+            stats.failures += failed
+            stats.slow += slow
+
+        if slow:
+            logger.warning(
+                f"Slow Mongo command {event.command_name} on {collection or event.database_name} "
+                f"took {seconds * 1000:.1f}ms{' (failed)' if failed else ''}: {command_shape(command)}"
+            )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def collect(self):
+        with self._lock:
+            snapshot = [
+                (command, collection, list(stats.buckets), stats.total, stats.count, stats.failures, stats.slow)
+                for (command, collection), stats in sorted(self._stats.items())
+            ]
+        yield "mongo_command_duration_seconds", "histogram", "Mongo command latency by command and collection", [
+            ({"command": command, "collection": collection}, (buckets, total, count))
+            for command, collection, buckets, total, count, _, _ in snapshot
+        ]
+        yield "mongo_command_failures_total", "counter", "Failed Mongo commands", [
+            ({"command": command, "collection": collection}, failures)
+            for command, collection, _, _, _, failures, _ in snapshot
+        ]
+        yield "mongo_slow_commands_total", "counter", f"Mongo commands slower than {SLOW_QUERY_MS:g}ms", [
+            ({"command": command, "collection": collection}, slow)
+            for command, collection, _, _, _, _, slow in snapshot
+        ]
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding a Server-Timing header with the request's Mongo time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestDbTiming()
+        token = request_db_timing.set(timing)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - started) * 1000
+                header = (
+                    f'db;dur={timing.total_ms:.1f};desc="{len(timing.durations)} commands", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                # Timing-Allow-Origin lets the cross-origin frontend read the header in devtools
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode()),
+                    (b"timing-allow-origin", b"*"),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_db_timing.reset(token)
+
+
+command_timing = CommandTimingListener()
+metrics.register_collector(command_timing.collect)
@@ -0,0 +1,22 @@
+from typing import Optional
+import hashlib
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body itself.
+
+    Every worker computes the same tag for the same bytes, and the tag changes
+    whenever the content does, however the underlying documents were modified.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
@@ -1,6 +1,12 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from metrics import pool_stats
+from command_monitor import command_timing
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -8,89 +14,230 @@ from dotenv import load_dotenv
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
+logger = logging.getLogger(__name__)
+
 db_name = os.environ.get('DB_NAME', 'vinoth_portfolio')
+# Build performance-only indexes in the background after the app is serving
+DEFER_OPTIONAL_INDEXES = os.environ.get('DEFER_OPTIONAL_INDEXES', 'true').lower() in ('1', 'true', 'yes')
+
+_client: Optional[AsyncIOMotorClient] = None
+_collections: Dict[str, Any] = {}
+_deferred_indexes: Optional[asyncio.Task] = None
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the Mongo client, creating it on first use"""
+    global _client
+    if _client is None:
+        mongo_url = os.environ.get('MONGO_URL')
+        if not mongo_url:
+            raise RuntimeError("MONGO_URL is not set")
+        _client = AsyncIOMotorClient(mongo_url, event_listeners=[pool_stats, command_timing])
+    return _client
+
+class LazyDatabase:
+    """Stand-in for the Motor database that creates the client on first attribute access"""
+
+    def __getattr__(self, name):
+        return getattr(get_client()[db_name], name)
+
+    def __getitem__(self, name):
+        return get_client()[db_name][name]
+
+class LazyCollection:
+    """Stand-in for a Motor collection, so modules can import collections before the client exists"""
+
+    def __init__(self, name: str):
+        self._name = name
 
-client = AsyncIOMotorClient(mongo_url)
-db = client[db_name]
+    @property
+    def name(self) -> str:
+        """Collection name, available without creating the client"""
+        return self._name
+
+    def __getattr__(self, attr):
+        collection = _collections.get(self._name)
+        if collection is None:
+            collection = _collections[self._name] = get_client()[db_name][self._name]
+        return getattr(collection, attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r})"
+
+db = LazyDatabase()
 
 # Collections
-projects_collection = db.projects
-contact_submissions_collection = db.contact_submissions
-about_info_collection = db.about_info
-research_projects_collection = db.research_projects
-services_collection = db.services
-testimonials_collection = db.testimonials
-page_views_collection = db.page_views
+projects_collection = LazyCollection("projects")
+contact_submissions_collection = LazyCollection("contact_submissions")
+about_info_collection = LazyCollection("about_info")
+research_projects_collection = LazyCollection("research_projects")
+services_collection = LazyCollection("services")
+testimonials_collection = LazyCollection("testimonials")
+page_views_collection = LazyCollection("page_views")
+page_view_rollups_collection = LazyCollection("page_view_rollups")
+idempotency_keys_collection = LazyCollection("idempotency_keys")
+cache_versions_collection = LazyCollection("cache_versions")
+
+# Raw page-view retention
+PAGE_VIEW_TTL_DAYS = int(os.environ.get('PAGE_VIEW_TTL_DAYS', '90'))
+
+# Indexes that enforce uniqueness or that writes depend on; built before serving
+CRITICAL_INDEXES: List[Tuple[Any, Any, Dict[str, Any]]] = [
+    # Notification workers claim submissions through these
+    (contact_submissions_collection, [("notify_status", 1), ("notify_next_attempt_at", 1)], {"sparse": True}),
+    (contact_submissions_collection, "notify_claim_token", {"sparse": True}),
+    # Keeps concurrent bootstraps from creating a second about_info document
+    (about_info_collection, "id", {"unique": True}),
+    (idempotency_keys_collection, "key", {"unique": True}),
+    (page_view_rollups_collection, [("page", 1), ("granularity", 1), ("bucket", 1)], {"unique": True}),
+]
+
+# Indexes that only speed up reads or expire old data; may be deferred
+OPTIONAL_INDEXES: List[Tuple[Any, Any, Dict[str, Any]]] = [
+    (projects_collection, "category", {}),
+    (projects_collection, "created_at", {}),
+    (contact_submissions_collection, "submitted_at", {}),
+    (contact_submissions_collection, "status", {}),
+    (research_projects_collection, "status", {}),
+    (testimonials_collection, "approved", {}),
+    # Compound indexes backing keyset pagination on (created_at, id)
+    (projects_collection, [("created_at", -1), ("id", -1)], {}),
+    (projects_collection, [("category", 1), ("created_at", -1), ("id", -1)], {}),
+    (research_projects_collection, [("created_at", -1), ("id", -1)], {}),
+    (services_collection, [("created_at", -1), ("id", -1)], {}),
+    (testimonials_collection, [("approved", 1), ("created_at", -1), ("id", -1)], {}),
+    (contact_submissions_collection, [("submitted_at", -1), ("id", -1)], {}),
+    (contact_submissions_collection, [("status", 1), ("submitted_at", -1), ("id", -1)], {}),
+    # Stored idempotent responses expire on their own
+    (idempotency_keys_collection, "created_at",
+     {"expireAfterSeconds": int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))}),
+    (page_view_rollups_collection, "expires_at", {"expireAfterSeconds": 0}),
+]
+
+async def ensure_ttl_index(collection, field, expire_after_seconds):
+    """Create a TTL index on field, converting an existing plain index in place"""
+    try:
+        await collection.create_index(field, expireAfterSeconds=expire_after_seconds)
+    except OperationFailure as e:
+        # IndexOptionsConflict: the index exists without (or with a different) TTL
+        if e.code not in (85, 86):
+            raise
+        await db.command(
+            "collMod", collection.name,
+            index={"keyPattern": {field: 1}, "expireAfterSeconds": expire_after_seconds}
+        )
+
+async def create_indexes(specs):
+    """Create a list of indexes concurrently"""
+    await asyncio.gather(*(collection.create_index(keys, **options) for collection, keys, options in specs))
+
+async def create_optional_indexes():
+    await create_indexes(OPTIONAL_INDEXES)
+    # Raw page views expire; rollups keep the long-term counts
+    await ensure_ttl_index(page_views_collection, "timestamp", PAGE_VIEW_TTL_DAYS * 86400)
+
+async def build_deferred_indexes():
+    started = time.perf_counter()
+    try:
+        await create_optional_indexes()
+        print(f"🗂️ Deferred indexes built in {(time.perf_counter() - started) * 1000:.0f}ms")
+    except Exception as e:
+        logger.error(f"Deferred index build failed: {e}")
+
+async def ensure_about_info():
+    """Create the default about_info document if it does not exist.
+
+    A single upsert, so workers starting together cannot both insert it.
+    """
+    default_about = {
+        "story": "From NIFT to leading sustainable innovation at Lulu Group, then advancing AI in fashion at Mad Street Den, and now pursuing cutting-edge research at Kent State University. I bridge creativity, technology, and sustainability to create meaningful impact in fashion.",
+        "competencies": [
+            {"icon": "Leaf", "text": "Sustainable Fashion"},
+            {"icon": "Zap", "text": "Fiber Innovation"},
+            {"icon": "Box", "text": "3D Visualization"},
+            {"icon": "RefreshCw", "text": "Circular Design"},
+            {"icon": "Brain", "text": "AI in Fashion"},
+            {"icon": "Users", "text": "Cross-Functional Leadership"}
+        ],
+        "credentials": [
+            "Master's in Fashion Design & Merchandising - Kent State University (Current)",
+            "Bachelor's in Fashion Design - NIFT",
+            "Inside LVMH Certificate",
+            "ESG & Sustainability Certification",
+            "Published Research in Fibers Journal (2025)"
+        ],
+        "experience": [
+            {
+                "company": "Kent State University",
+                "role": "Graduate Research Assistant",
+                "period": "2024 - Present",
+                "description": "Leading USDA-funded hemp fiber classification research"
+            },
+            {
+                "company": "Mad Street Den",
+                "role": "Fashion Technology Lead",
+                "period": "2022 - 2024",
+                "description": "Directed AI quality assurance for global fashion clients"
+            },
+            {
+                "company": "Lulu Group International",
+                "role": "Senior Fashion Designer",
+                "period": "2020 - 2022",
+                "description": "Led sustainable collection development and market research"
+            }
+        ]
+    }
+    try:
+        await about_info_collection.update_one(
+            {"id": "about_info"}, {"$setOnInsert": default_about}, upsert=True
+        )
+    except DuplicateKeyError:
+        # Another worker's upsert won the race; its document is the same default
+        pass
 
 async def get_database():
     """Get database instance"""
-    return db
+    return get_client()[db_name]
+
+async def connect_database():
+    """Create the client and wait for the first round trip to the server"""
+    await get_client()[db_name].command("ping")
 
 async def close_database():
     """Close database connection"""
-    client.close()
+    global _client
+    if _deferred_indexes is not None and not _deferred_indexes.done():
+        _deferred_indexes.cancel()
+        await asyncio.gather(_deferred_indexes, return_exceptions=True)
+    if _client is not None:
+        _client.close()
+        _client = None
+        _collections.clear()
 
 # Initialize collections with indexes
-async def init_database():
-    """Initialize database with indexes and default data"""
+async def init_database(defer_optional_indexes: bool = False):
+    """Initialize database with indexes and default data.
+
+    Index builds run concurrently; the about_info bootstrap waits for the
+    critical indexes so its upsert is backed by the unique index. With
+    defer_optional_indexes, only the critical indexes are awaited and the rest
+    are built by a background task.
+    """
+    global _deferred_indexes
+
+    async def bootstrap():
+        await create_indexes(CRITICAL_INDEXES)
+        await ensure_about_info()
+
     try:
-        # Create indexes for better performance
-        await projects_collection.create_index("category")
-        await projects_collection.create_index("created_at")
-        await contact_submissions_collection.create_index("submitted_at")
-        await contact_submissions_collection.create_index("status")
-        await research_projects_collection.create_index("status")
-        await testimonials_collection.create_index("approved")
-        await page_views_collection.create_index("timestamp")
-        
-        # Check if about_info exists, create default if not
-        about_info = await about_info_collection.find_one({"id": "about_info"})
-        if not about_info:
-            default_about = {
-                "id": "about_info",
-                "story": "From NIFT to leading sustainable innovation at Lulu Group, then advancing AI in fashion at Mad Street Den, and now pursuing cutting-edge research at Kent State University. I bridge creativity, technology, and sustainability to create meaningful impact in fashion.",
-                "competencies": [
-                    {"icon": "Leaf", "text": "Sustainable Fashion"},
-                    {"icon": "Zap", "text": "Fiber Innovation"},
-                    {"icon": "Box", "text": "3D Visualization"},
-                    {"icon": "RefreshCw", "text": "Circular Design"},
-                    {"icon": "Brain", "text": "AI in Fashion"},
-                    {"icon": "Users", "text": "Cross-Functional Leadership"}
-                ],
-                "credentials": [
-                    "Master's in Fashion Design & Merchandising - Kent State University (Current)",
-                    "Bachelor's in Fashion Design - NIFT",
-                    "Inside LVMH Certificate",
-                    "ESG & Sustainability Certification",
-                    "Published Research in Fibers Journal (2025)"
-                ],
-                "experience": [
-                    {
-                        "company": "Kent State University",
-                        "role": "Graduate Research Assistant",
-                        "period": "2024 - Present",
-                        "description": "Leading USDA-funded hemp fiber classification research"
-                    },
-                    {
-                        "company": "Mad Street Den",
-                        "role": "Fashion Technology Lead",
-                        "period": "2022 - 2024",
-                        "description": "Directed AI quality assurance for global fashion clients"
-                    },
-                    {
-                        "company": "Lulu Group International",
-                        "role": "Senior Fashion Designer",
-                        "period": "2020 - 2022",
-                        "description": "Led sustainable collection development and market research"
-                    }
-                ]
-            }
-            await about_info_collection.insert_one(default_about)
+        work = [bootstrap()]
+        if defer_optional_indexes:
+            _deferred_indexes = asyncio.create_task(build_deferred_indexes())
+        else:
+            work.append(create_optional_indexes())
+        await asyncio.gather(*work)
             
         print("✅ Database initialized successfully")
         
     except Exception as e:
         print(f"❌ Database initialization error: {e}")
-        raise e
\ No newline at end of file
+        raise e
@@ -0,0 +1,43 @@
+from fastapi import HTTPException
+from typing import Dict, Optional, Tuple
+from models import Project, ResearchProject, ServiceItem
+
+# Fields every list projection keeps so ids and pagination cursors still work
+REQUIRED_FIELDS = ("id", "created_at")
+
+# Fields that may be requested per collection
+ALLOWED_FIELDS = {
+    "projects": frozenset(Project.model_fields),
+    "research_projects": frozenset(ResearchProject.model_fields),
+    "services": frozenset(ServiceItem.model_fields),
+}
+
+# Default "summary" shape returned by list endpoints and bundle sections: every
+# field the frontend list and card views render, without the detail-page fields
+SUMMARY_FIELDS = {
+    "projects": ("title", "category", "company", "image", "description", "tools"),
+    "research_projects": ("title", "organization", "status", "collaboration", "description", "publications"),
+    "services": ("title", "description", "deliverables", "category"),
+}
+
+
+def resolve_fields(collection: str, fields: Optional[str]) -> Tuple[str, Optional[Dict[str, int]]]:
+    """Turn a `fields=` query value into a cache label and a Mongo projection.
+
+    No value returns the summary shape, "all" returns full documents (no projection),
+    and a comma-separated list returns exactly those fields plus the required ones.
+    """
+    if fields is None or fields == "summary":
+        requested = SUMMARY_FIELDS[collection]
+    elif fields == "all":
+        return "all", None
+    else:
+        requested = tuple(name.strip() for name in fields.split(",") if name.strip())
+        unknown = sorted(set(requested) - ALLOWED_FIELDS[collection])
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    selected = sorted(set(requested) | set(REQUIRED_FIELDS))
+    projection = {"_id": 0}
+    projection.update({name: 1 for name in selected})
+    return ",".join(selected), projection
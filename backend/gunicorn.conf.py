@@ -0,0 +1,27 @@
+"""
+Gunicorn settings for multi-worker production serving.
+Start with: gunicorn server:app -c gunicorn.conf.py
+Workers default to the CPUs available to the container; override with WEB_CONCURRENCY.
+"""
+import os
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get('WEB_CONCURRENCY') or min(available_cpus(), int(os.environ.get('WEB_MAX_WORKERS', '8'))))
+
+# Workers inherit this: rate_limit.py gives each worker 1/workers of every rate limit
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Production runs behind Railway's proxy, which appends the visitor's address to
+# X-Forwarded-For; without this every visitor would share the proxy's address
+os.environ.setdefault('TRUSTED_PROXY_HOPS', '1')
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
@@ -0,0 +1,113 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often the background task pings Mongo, and how long one ping may take
+HEALTH_PING_INTERVAL = float(os.environ.get('HEALTH_PING_INTERVAL', '5'))
+HEALTH_PING_TIMEOUT = float(os.environ.get('HEALTH_PING_TIMEOUT', '2'))
+# A ping result older than this many intervals no longer counts as healthy
+HEALTH_STALE_INTERVALS = 3
+# Queues filled beyond this fraction make the instance report not ready
+QUEUE_SATURATION = float(os.environ.get('HEALTH_QUEUE_SATURATION', '0.9'))
+
+
+class HealthMonitor:
+    """Background-refreshed readiness state.
+
+    A single task pings Mongo every HEALTH_PING_INTERVAL seconds and stores the
+    outcome, so liveness and readiness probes only read memory no matter how
+    often the platform polls them.
+    """
+
+    def __init__(self, ping: Callable[[], Awaitable[Any]], interval: float = HEALTH_PING_INTERVAL):
+        self.ping = ping
+        self.interval = interval
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.db_ok = False
+        self.db_latency_ms: Optional[float] = None
+        self.db_error: Optional[str] = None
+        self.last_ping: Optional[float] = None
+        self.last_ping_at: Optional[datetime] = None
+        self.consecutive_failures = 0
+        self._queues: Dict[str, Callable[[], Dict[str, int]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add_queue(self, name: str, stats: Callable[[], Dict[str, int]]):
+        """Report a queue whose stats() has depth and max_size (or capacity).
+
+        Only for queues that hold on to their items, where saturation means
+        writes are about to be refused; lossy buffers belong in metrics.
+        """
+        self._queues[name] = stats
+
+    async def check_database(self):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.ping(), HEALTH_PING_TIMEOUT)
+            self.db_ok = True
+            self.db_error = None
+            self.consecutive_failures = 0
+        except Exception as e:
+            if self.db_ok or self.consecutive_failures == 0:
+                logger.error(f"Database ping failed: {e or e.__class__.__name__}")
+            self.db_ok = False
+            self.db_error = str(e) or e.__class__.__name__
+            self.consecutive_failures += 1
+        self.db_latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.last_ping = time.monotonic()
+        self.last_ping_at = datetime.utcnow()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check_database()
+
+    async def start(self):
+        """Ping once so readiness is known immediately, then keep refreshing in the background"""
+        await self.check_database()
+        self._task = asyncio.create_task(self._run())
+
+    def mark_ready(self):
+        """Record that startup finished and caches are warm"""
+        self.ready_at = time.monotonic()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.ready_at = None
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"status": "alive", "uptime_seconds": round(time.monotonic() - self.started_at, 1)}
+
+    def readiness(self) -> Dict[str, Any]:
+        """Readiness checks from the last stored results; never touches the database"""
+        fresh = self.last_ping is not None and time.monotonic() - self.last_ping <= self.interval * HEALTH_STALE_INTERVALS
+        queues = {}
+        queues_ok = True
+        for name, stats in self._queues.items():
+            current = stats()
+            limit = current.get("max_size") or current.get("capacity")
+            saturated = bool(limit) and current["depth"] >= limit * QUEUE_SATURATION
+            queues_ok = queues_ok and not saturated
+            queues[name] = {"depth": current["depth"], "limit": limit, "saturated": saturated}
+
+        checks = {
+            "started": self.ready_at is not None,
+            "database": {
+                "ok": self.db_ok and fresh,
+                "latency_ms": self.db_latency_ms,
+                "checked_at": self.last_ping_at,
+                "error": self.db_error if not self.db_ok else (None if fresh else "Ping result is stale"),
+            },
+            "queues": queues,
+        }
+        ready = checks["started"] and checks["database"]["ok"] and queues_ok
+        return {"status": "ready" if ready else "not_ready", "ready": ready, "checks": checks}
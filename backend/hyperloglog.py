@@ -0,0 +1,92 @@
+from typing import Iterable, Optional
+import hashlib
+import math
+import zlib
+import numpy as np
+
+# 2^12 registers: 4 KiB per sketch, standard error 1.04 / sqrt(4096) ~= 1.6%
+DEFAULT_PRECISION = 12
+STANDARD_ERROR = 1.04 / math.sqrt(1 << DEFAULT_PRECISION)
+
+
+def hash64(value: str) -> int:
+    """64-bit hash of a string used to place values in the sketch"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch with 2^precision one-byte registers.
+
+    Memory is fixed at 2^precision bytes regardless of how many values are added,
+    and the relative standard error of count() is 1.04 / sqrt(2^precision).
+    Sketches with the same precision merge by taking the register-wise maximum,
+    which yields exactly the sketch of the union of both inputs.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(self.size, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.size)
+
+    def add(self, value: str):
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed: int):
+        """Add a value by its 64-bit hash"""
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - precision bits
+        rank = 64 - self.precision - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch into this one in place"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    def count(self) -> int:
+        """Estimated number of distinct values added"""
+        m = self.size
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        if estimate <= 2.5 * m:
+            # Small-range correction: linear counting over empty registers
+            zeros = int(np.count_nonzero(self.registers == 0))
+            if zeros:
+                estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, HyperLogLog)
+            and other.precision == self.precision
+            and np.array_equal(other.registers, self.registers)
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize as a precision byte followed by the zlib-compressed registers"""
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes(), 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        precision = data[0]
+        registers = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8).copy()
+        if registers.size != 1 << precision:
+            raise ValueError("Corrupt HyperLogLog sketch")
+        return cls(precision, registers)
@@ -0,0 +1,160 @@
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pymongo.errors import DuplicateKeyError
+from typing import Any, Awaitable, Callable, Dict, Optional
+from models import SuccessResponse
+from database import idempotency_keys_collection
+from cache import ResponseCache
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+
+# Stored responses live this long in Mongo (TTL index) and in the front cache
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+# How long a request waits for another process that is executing the same key
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', '10'))
+# How long a claim on a key is held before another request may take it over
+IDEMPOTENCY_LOCK_SECONDS = float(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '60'))
+MAX_KEY_LENGTH = 255
+
+# Recently completed responses, checked before Mongo
+_recent = ResponseCache(max_entries=2048, ttl_seconds=IDEMPOTENCY_TTL_SECONDS)
+# Executions currently running in this process, shared with concurrent duplicates
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def _fingerprint(payload: Any) -> str:
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _replay(record: Dict[str, Any], fingerprint: str) -> JSONResponse:
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request body")
+    return JSONResponse(content=record["response"], headers={"Idempotent-Replayed": "true"})
+
+
+async def _claim(key: str, fingerprint: str, token: str) -> Optional[Dict[str, Any]]:
+    """Claim a key for this request, or return its record once another request completes it.
+
+    A claim is a lease: while another request holds an unexpired lock this
+    polls, and a lock whose holder crashed or failed to release it is taken
+    over once locked_until has passed.
+    """
+    deadline = asyncio.get_running_loop().time() + IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while True:
+        now = datetime.utcnow()
+        claim = {
+            "fingerprint": fingerprint,
+            "status": "in_progress",
+            "claim_token": token,
+            "locked_until": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS),
+        }
+        try:
+            await idempotency_keys_collection.insert_one({"key": key, "created_at": now, **claim})
+            return None
+        except DuplicateKeyError:
+            pass
+        taken = await idempotency_keys_collection.find_one_and_update(
+            {"key": key, "status": "in_progress", "locked_until": {"$not": {"$gt": now}}},
+            {"$set": claim}
+        )
+        if taken is not None:
+            return None
+        record = await idempotency_keys_collection.find_one({"key": key}, {"_id": 0})
+        if record is not None and record["status"] == "completed":
+            return record
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+        if record is not None:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+
+def replay_exempt(scope: str) -> Callable[[Request], bool]:
+    """Rate-limit exemption for requests that will replay a response this process completed.
+
+    Only the in-memory front cache is consulted, so a client sending fresh keys
+    cannot make the limiter query Mongo; a replay of a key completed by another
+    worker is charged like any other request.
+    """
+    def is_replay(request: Request) -> bool:
+        idempotency_key = request.headers.get("idempotency-key")
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            return False
+        return _recent.get(scope, {"key": f"{scope}:{idempotency_key}"}) is not None
+    return is_replay
+
+
+async def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[SuccessResponse]],
+):
+    """Execute a create handler at most once per Idempotency-Key.
+
+    The first execution's response is stored in a TTL-indexed collection and a
+    local front cache; replays return it without running the handler again.
+    Concurrent duplicates in this process await the first execution, and
+    duplicates in other processes poll its stored record until it completes or
+    its lock expires.
+    """
+    if not idempotency_key:
+        return await handler()
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    key = f"{scope}:{idempotency_key}"
+    fingerprint = _fingerprint(payload)
+
+    record = _recent.get(scope, {"key": key})
+    if record is not None:
+        return _replay(record, fingerprint)
+
+    in_flight = _in_flight.get(key)
+    if in_flight is not None:
+        return _replay(await asyncio.shield(in_flight), fingerprint)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    token = uuid.uuid4().hex
+    try:
+        record = await _claim(key, fingerprint, token)
+        if record is not None:
+            _recent.set(scope, {"key": key}, record)
+            future.set_result(record)
+            return _replay(record, fingerprint)
+
+        try:
+            result = await handler()
+        except BaseException:
+            # Release the key so a later retry can run the handler again; if this
+            # fails too, the lock expires and the next retry takes it over
+            await idempotency_keys_collection.delete_one({"key": key, "claim_token": token})
+            raise
+
+        record = {"key": key, "fingerprint": fingerprint, "status": "completed", "response": jsonable_encoder(result)}
+        await idempotency_keys_collection.update_one(
+            {"key": key, "claim_token": token},
+            {"$set": {"status": "completed", "response": record["response"]},
+             "$unset": {"claim_token": "", "locked_until": ""}}
+        )
+        _recent.set(scope, {"key": key}, record)
+        future.set_result(record)
+        return result
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        elif not future.done():
+            future.set_exception(e)
+            # Mark the exception as retrieved when no duplicate is waiting on it
+            future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
@@ -0,0 +1,246 @@
+from pymongo import monitoring
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from bisect import bisect_left
+import threading
+import time
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (labels, value) pairs for one metric family
+Samples = Iterable[Tuple[Dict[str, Any], float]]
+
+
+class RouteStats:
+    """Request counters and a latency histogram for one route"""
+
+    __slots__ = ("method", "path", "name", "buckets", "total", "count", "statuses")
+
+    def __init__(self, method: str, path: str, name: str):
+        self.method = method
+        self.path = path
+        self.name = name
+        # One slot per bucket plus +Inf; stored per bucket and made cumulative on render
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """HTTP request metrics recorded by MetricsMiddleware.
+
+    Everything is updated from the event loop thread only, so recording needs no
+    locks: a dict lookup keyed by the matched route, a bisect into the
+    bucket bounds and a few integer increments. Extra metric families (pool,
+    cache and queue stats) are pulled from collectors only when scraped.
+    """
+
+    def __init__(self):
+        # Keyed by APIRoute.unique_id, a string FastAPI already holds, so lookups allocate nothing
+        self._routes: Dict[Optional[str], RouteStats] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = []
+        self.in_flight = 0
+
+    def observe(self, method: str, route: Any, status: int, seconds: float):
+        key = getattr(route, "unique_id", None)
+        stats = self._routes.get(key)
+        if stats is None:
+            if key is None:
+                stats = RouteStats("", "unmatched", "unmatched")
+            else:
+                stats = RouteStats(",".join(sorted(route.methods or [method])), route.path, route.name)
+            self._routes[key] = stats
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.total += seconds
+        stats.count += 1
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Samples]]]):
+        """Add a callable yielding (name, type, help, samples) families at scrape time.
+
+        Histogram samples carry (per-bucket counts, sum, count) as their value, with
+        the counts laid out like LATENCY_BUCKETS plus a final +Inf slot.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: Samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if kind == "histogram":
+                    histogram_lines(lines, name, labels, *value)
+                else:
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        routes = list(self._routes.values())
+        family("http_requests_total", "counter", "HTTP requests by route and status", [
+            ({"method": stats.method, "route": stats.path, "handler": stats.name, "status": status}, count)
+            for stats in routes for status, count in sorted(stats.statuses.items())
+        ])
+        family("http_request_duration_seconds", "histogram", "HTTP request latency by route", [
+            ({"method": stats.method, "route": stats.path, "handler": stats.name},
+             (stats.buckets, stats.total, stats.count))
+            for stats in routes
+        ])
+        family("http_requests_in_flight", "gauge", "HTTP requests currently being served", [({}, self.in_flight)])
+
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                family(name, kind, help_text, samples)
+
+        return "\n".join(lines) + "\n"
+
+
+def histogram_lines(lines: List[str], name: str, labels: Dict[str, Any], buckets: List[int], total: float, count: int):
+    cumulative = 0
+    for bound, bucket_count in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+        cumulative += bucket_count
+        lines.append(f"{name}_bucket{format_labels({**labels, 'le': format_value(bound)})} {cumulative}")
+    lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+    lines.append(f"{name}_count{format_labels(labels)} {count}")
+
+
+def escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request into a MetricsRegistry.
+
+    The route is read from scope["route"], which FastAPI sets once a route
+    matches, so histograms are labelled with path templates such as
+    /api/projects/{project_id} instead of raw URLs.
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            registry.observe(scope["method"], scope.get("route"), status, time.perf_counter() - started)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Connection pool counters for the Mongo client.
+
+    Pool events fire on driver threads, so the counters are guarded by a lock;
+    the cost is one uncontended acquire per checkout, off the HTTP hot path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.connections = 0
+        self.checked_out = 0
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.pool_clears = 0
+
+    def _add(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def pool_created(self, event):
+        self._add("pools")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("pool_clears")
+
+    def pool_closed(self, event):
+        self._add("pools", -1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections += 1
+            self.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections -= 1
+            self.closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            reason = str(event.reason)
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+    def collect(self) -> List[Tuple[str, str, str, Samples]]:
+        with self._lock:
+            return [
+                ("mongo_pools", "gauge", "Open Mongo connection pools (one per server)", [({}, self.pools)]),
+                ("mongo_pool_connections", "gauge", "Open Mongo connections", [({}, self.connections)]),
+                ("mongo_pool_checked_out", "gauge", "Mongo connections currently checked out", [({}, self.checked_out)]),
+                ("mongo_pool_connections_created_total", "counter", "Mongo connections opened", [({}, self.created)]),
+                ("mongo_pool_connections_closed_total", "counter", "Mongo connections closed", [({}, self.closed)]),
+                ("mongo_pool_checkouts_total", "counter", "Mongo connection checkouts", [({}, self.checkouts)]),
+                ("mongo_pool_clears_total", "counter", "Mongo pool clears", [({}, self.pool_clears)]),
+                ("mongo_pool_checkout_failures_total", "counter", "Failed Mongo connection checkouts by reason", [
+                    ({"reason": reason}, count) for reason, count in sorted(self.checkout_failures.items())
+                ]),
+            ]
+
+
+metrics = MetricsRegistry()
+pool_stats = PoolStatsListener()
+metrics.register_collector(pool_stats.collect)
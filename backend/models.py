@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import List, Optional
 from datetime import datetime
+from urllib.parse import urlsplit
+import re
 import uuid
 
 # Project Models
@@ -184,10 +186,39 @@ class AdminToken(BaseModel):
     expires_in: int
 
 # Analytics Models
+# Page paths recorded by the analytics beacon; each distinct path gets its own rollups
+PAGE_PATH_PATTERN = re.compile(r"^/[A-Za-z0-9._~\-/]*$")
+PAGE_PATH_MAX_LENGTH = 200
+
+class PageViewCreate(BaseModel):
+    page: str = Field(..., min_length=1, max_length=2000)
+    referrer: Optional[str] = Field(None, max_length=2000)
+
+    @field_validator("page")
+    @classmethod
+    def normalize_page(cls, value: str) -> str:
+        """Reduce a page (or full URL) to its path without query string, fragment or trailing slash"""
+        value = value.strip()
+        if "://" in value:
+            value = urlsplit(value).path
+        path = re.sub(r"/{2,}", "/", re.split(r"[?#]", value, maxsplit=1)[0])
+        if len(path) > PAGE_PATH_MAX_LENGTH or not PAGE_PATH_PATTERN.match(path):
+            raise ValueError("page must be a site path such as /portfolio")
+        return path.rstrip("/") or "/"
+
 class PageView(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     page: str
     user_agent: Optional[str] = None
     ip_address: Optional[str] = None
     referrer: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+# Bulk Write Models
+class BulkOperation(BaseModel):
+    op: str  # insert, update, delete
+    id: Optional[str] = None
+    data: Optional[dict] = None
+
+class BulkWriteRequest(BaseModel):
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=500)
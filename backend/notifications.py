@@ -0,0 +1,230 @@
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import os
+import random
+import smtplib
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# SMTP configuration; notifications are enabled once SMTP_HOST and NOTIFY_TO are set
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', 'true').lower() in ('1', 'true', 'yes')
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', '10'))
+NOTIFY_FROM = os.environ.get('NOTIFY_FROM', SMTP_USERNAME or 'portfolio@localhost')
+NOTIFY_TO = os.environ.get('NOTIFY_TO')
+NOTIFICATIONS_ENABLED = bool(SMTP_HOST and NOTIFY_TO)
+
+# Outbox worker configuration
+NOTIFICATION_WORKERS = int(os.environ.get('NOTIFICATION_WORKERS', '2'))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '20'))
+NOTIFICATION_POLL_INTERVAL = float(os.environ.get('NOTIFICATION_POLL_INTERVAL', '5'))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', '6'))
+NOTIFICATION_BACKOFF_SECONDS = float(os.environ.get('NOTIFICATION_BACKOFF_SECONDS', '30'))
+NOTIFICATION_MAX_BACKOFF_SECONDS = float(os.environ.get('NOTIFICATION_MAX_BACKOFF_SECONDS', '3600'))
+NOTIFICATION_LEASE_SECONDS = float(os.environ.get('NOTIFICATION_LEASE_SECONDS', '120'))
+
+
+def pending_notification() -> Dict[str, Any]:
+    """Notification state stored on a new submission, so the submission and its
+    pending notification are written by the same single-document insert"""
+    return {
+        "notify_status": "pending",
+        "notify_attempts": 0,
+        "notify_next_attempt_at": datetime.utcnow(),
+    }
+
+
+def build_contact_message(submission: Dict[str, Any]) -> EmailMessage:
+    """Build the email announcing a contact submission"""
+    message = EmailMessage()
+    message["From"] = NOTIFY_FROM
+    message["To"] = NOTIFY_TO
+    message["Subject"] = f"New contact form submission from {submission['name']}"
+    message["Reply-To"] = submission["email"]
+    message.set_content("\n".join(
+        f"{label}: {submission.get(field) or '-'}"
+        for label, field in (
+            ("Name", "name"), ("Email", "email"), ("Company", "company"), ("Role", "role"),
+            ("Service", "service"), ("Timeline", "timeline"), ("Message", "message"),
+        )
+    ))
+    return message
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given number of failed attempts"""
+    delay = min(NOTIFICATION_BACKOFF_SECONDS * 2 ** (attempts - 1), NOTIFICATION_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class SmtpSender:
+    """Sends batches of messages over one SMTP connection that is reused between batches"""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT):
+        self.host = host
+        self.port = port
+        self._connection: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._connection is not None:
+            try:
+                self._connection.noop()
+                return self._connection
+            except smtplib.SMTPException:
+                self.close()
+        connection = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        if SMTP_STARTTLS:
+            connection.starttls()
+        if SMTP_USERNAME and SMTP_PASSWORD:
+            connection.login(SMTP_USERNAME, SMTP_PASSWORD)
+        self._connection = connection
+        return connection
+
+    def send_batch(self, rows: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """Notify about every submission, returning {id: error message or None}. Runs in a worker thread."""
+        outcomes = {}
+        for row in rows:
+            try:
+                self._connect().send_message(build_contact_message(row))
+                outcomes[row["id"]] = None
+            except (smtplib.SMTPException, OSError) as e:
+                # Drop the connection so the next message reconnects
+                self.close()
+                outcomes[row["id"]] = str(e) or e.__class__.__name__
+        return outcomes
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+
+class NotificationWorkerPool:
+    """asyncio workers that claim submissions with due notifications in batches and deliver them.
+
+    The notify_* fields of a submission act as its outbox entry. Submissions are
+    claimed by stamping a claim token and a lease, so several workers (or
+    processes) never send the same notification twice while its lease is valid.
+    Failures are retried with exponential backoff until NOTIFICATION_MAX_ATTEMPTS
+    is reached.
+    """
+
+    def __init__(
+        self,
+        collection,
+        workers: int = NOTIFICATION_WORKERS,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        sender: Callable[[], SmtpSender] = SmtpSender,
+    ):
+        self.collection = collection
+        self.sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self):
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def notify(self):
+        """Wake idle workers because new submissions were written"""
+        self._wakeup.set()
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        due = {"$or": [
+            {"notify_status": "pending", "notify_next_attempt_at": {"$lte": now}},
+            {"notify_status": "sending", "notify_locked_until": {"$lt": now}},
+        ]}
+        candidates = await self.collection.find(due, {"_id": 0, "id": 1}).sort(
+            "notify_next_attempt_at", 1
+        ).to_list(self.batch_size)
+        if not candidates:
+            return []
+
+        token = uuid.uuid4().hex
+        await self.collection.update_many(
+            {"$and": [{"id": {"$in": [row["id"] for row in candidates]}}, due]},
+            {
+                "$set": {"notify_status": "sending", "notify_claim_token": token,
+                         "notify_locked_until": now + timedelta(seconds=NOTIFICATION_LEASE_SECONDS)},
+                "$inc": {"notify_attempts": 1},
+            }
+        )
+        return await self.collection.find({"notify_claim_token": token}, {"_id": 0}).to_list(self.batch_size)
+
+    async def _record(self, rows: List[Dict[str, Any]], outcomes: Dict[str, Optional[str]]):
+        now = datetime.utcnow()
+        for row in rows:
+            error = outcomes.get(row["id"], "Not attempted")
+            attempts = row["notify_attempts"]
+            if error is None:
+                update = {"notify_status": "sent", "notified_at": now}
+                self.sent += 1
+            elif attempts >= NOTIFICATION_MAX_ATTEMPTS:
+                update = {"notify_status": "failed", "notify_last_error": error}
+                self.failed += 1
+                logger.error(f"Giving up on notification for submission {row['id']} after {attempts} attempts: {error}")
+            else:
+                update = {
+                    "notify_status": "pending",
+                    "notify_last_error": error,
+                    "notify_next_attempt_at": now + timedelta(seconds=backoff_delay(attempts)),
+                }
+                self.retried += 1
+            await self.collection.update_one(
+                {"id": row["id"], "notify_claim_token": row["notify_claim_token"]},
+                {"$set": update, "$unset": {"notify_claim_token": "", "notify_locked_until": ""}}
+            )
+
+    async def _work(self):
+        sender = self.sender()
+        try:
+            while not self._stopping:
+                try:
+                    rows = await self._claim()
+                    if rows:
+                        outcomes = await asyncio.to_thread(sender.send_batch, rows)
+                        await self._record(rows, outcomes)
+                        continue
+                except Exception as e:
+                    logger.error(f"Notification worker error: {e}")
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), NOTIFICATION_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await asyncio.to_thread(sender.close)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
@@ -0,0 +1,119 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Page-view ingestion configuration
+PAGE_VIEW_BUFFER_SIZE = int(os.environ.get('PAGE_VIEW_BUFFER_SIZE', '50000'))
+PAGE_VIEW_BATCH_SIZE = int(os.environ.get('PAGE_VIEW_BATCH_SIZE', '1000'))
+PAGE_VIEW_FLUSH_INTERVAL = float(os.environ.get('PAGE_VIEW_FLUSH_INTERVAL', '2'))
+
+
+class PageViewBuffer:
+    """In-memory ring buffer of page-view events flushed with insert_many.
+
+    record() is a constant-time append that never touches Mongo. When the buffer
+    is full the oldest events are overwritten, so a stalled database costs
+    analytics accuracy rather than memory. A background task flushes once
+    batch_size events are waiting or every flush_interval seconds, and on_flush is
+    awaited with every successfully written batch.
+    """
+
+    def __init__(
+        self,
+        collection,
+        capacity: int = PAGE_VIEW_BUFFER_SIZE,
+        batch_size: int = PAGE_VIEW_BATCH_SIZE,
+        flush_interval: float = PAGE_VIEW_FLUSH_INTERVAL,
+        on_flush: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._events: deque = deque(maxlen=capacity)
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        return len(self._events)
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self.running:
+            return
+        self._ready = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    def record(self, event: Dict[str, Any]):
+        """Buffer an event, overwriting the oldest one when full"""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self.recorded += 1
+        if self._ready is not None and len(self._events) >= self.batch_size:
+            self._ready.set()
+
+    async def flush(self):
+        """Write everything currently buffered in batch_size chunks"""
+        while self._events:
+            batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Page-view flush of {len(batch)} events failed: {e}")
+            else:
+                if self.on_flush:
+                    try:
+                        await self.on_flush(batch)
+                    except Exception as e:
+                        logger.error(f"Page-view on_flush hook failed: {e}")
+            self.batches += 1
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            await self.flush()
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still buffered"""
+        if self._task is not None:
+            self._stopping = True
+            self._ready.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer counters for monitoring"""
+        return {
+            "running": self.running,
+            "depth": self.depth,
+            "capacity": self._events.maxlen,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -0,0 +1,110 @@
+from fastapi import HTTPException
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from itertools import islice
+from read_model import read_model
+import base64
+import json
+import os
+
+# Page size contract for list endpoints
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '500'))
+
+
+def encode_cursor(sort_value: datetime, doc_id: str) -> str:
+    """Encode the (sort value, id) of the last document on a page as an opaque cursor"""
+    payload = json.dumps({"t": sort_value.isoformat(), "id": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode an opaque cursor back into its (sort value, id) pair"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), str(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_filter(filter_query: Dict[str, Any], sort_field: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """Extend a filter so it only matches documents after the cursor in (sort_field, id) descending order"""
+    if not cursor:
+        return filter_query
+
+    sort_value, doc_id = decode_cursor(cursor)
+    after_cursor = {"$or": [
+        {sort_field: {"$lt": sort_value}},
+        {sort_field: sort_value, "id": {"$lt": doc_id}},
+    ]}
+    if not filter_query:
+        return after_cursor
+    return {"$and": [filter_query, after_cursor]}
+
+
+async def fetch_page(
+    collection,
+    filter_query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page of documents newest first, returning the documents and the next cursor.
+
+    Sorting on (sort_field, id) uses the compound indexes created in init_database,
+    so every page is an index range scan regardless of how deep it is. Collections
+    held by the read model are paged in memory without querying Mongo.
+    """
+    if read_model.active and sort_field == "created_at":
+        snapshot = await read_model.snapshot(collection.name)
+        if snapshot is not None and snapshot.covers(filter_query):
+            return slice_page(snapshot.find(filter_query), sort_field, limit, cursor, projection)
+
+    query = keyset_filter(filter_query, sort_field, cursor)
+    documents = await collection.find(query, projection).sort(
+        [(sort_field, -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last[sort_field], last["id"])
+
+    # Remove MongoDB ObjectIds
+    for document in documents:
+        if "_id" in document:
+            del document["_id"]
+
+    return documents, next_cursor
+
+
+def slice_page(
+    documents: Iterable[dict],
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """fetch_page over documents already sorted by (sort_field, id) descending"""
+    if cursor:
+        sort_value, doc_id = decode_cursor(cursor)
+        documents = (
+            document for document in documents
+            if (document[sort_field], document["id"]) < (sort_value, doc_id)
+        )
+    documents = list(islice(documents, limit + 1))
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last[sort_field], last["id"])
+
+    fields = None if projection is None else {name for name, included in projection.items() if included}
+    return [
+        {name: value for name, value in document.items() if fields is None or name in fields}
+        for document in documents
+    ], next_cursor
@@ -0,0 +1,147 @@
+from fastapi import Header, HTTPException
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from urllib.parse import unquote
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Shared secret that unlocks on-demand profiling and the profile download routes
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+# Fraction of requests profiled without being asked, e.g. 0.001
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', Path(__file__).parent / 'profiles'))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '200'))
+PROFILING_ENABLED = bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY = "profile"
+PROFILE_ROUTES = "/api/admin/profiles"
+# <route name>-<UTC timestamp>-<id>.pstats
+PROFILE_NAME = re.compile(r"^(?P<route>[A-Za-z0-9_]+)-(?P<stamp>\d{8}T\d{6})-[0-9a-f]{8}\.pstats$")
+
+
+def token_matches(candidate: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN and candidate) and hmac.compare_digest(candidate, PROFILE_TOKEN)
+
+
+def requested(scope) -> bool:
+    """Whether the request carries the profile token as a header or ?profile= query flag"""
+    if scope["path"].startswith(PROFILE_ROUTES):
+        # The download routes reuse the token header; profiling them would only add noise
+        return False
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return token_matches(value.decode("latin-1"))
+    query = scope.get("query_string", b"").decode("latin-1")
+    if PROFILE_QUERY + "=" in query:
+        for pair in query.split("&"):
+            key, _, value = pair.partition("=")
+            if key == PROFILE_QUERY:
+                return token_matches(unquote(value))
+    return False
+
+
+def route_name(scope) -> str:
+    route = scope.get("route")
+    return re.sub(r"[^A-Za-z0-9_]", "_", getattr(route, "name", None) or "unmatched")
+
+
+def prune_profiles(directory: Path = PROFILE_DIR, keep: int = PROFILE_MAX_FILES):
+    """Delete the oldest profiles beyond the retention limit"""
+    files = sorted(directory.glob("*.pstats"), key=lambda path: path.stat().st_mtime)
+    for path in files[:max(0, len(files) - keep)]:
+        path.unlink(missing_ok=True)
+
+
+def list_profiles(directory: Path = PROFILE_DIR) -> List[Dict[str, Any]]:
+    profiles = []
+    for path in sorted(directory.glob("*.pstats"), key=lambda path: path.stat().st_mtime, reverse=True):
+        match = PROFILE_NAME.match(path.name)
+        if match:
+            profiles.append({
+                "name": path.name,
+                "route": match["route"],
+                "created_at": datetime.strptime(match["stamp"], "%Y%m%dT%H%M%S"),
+                "size": path.stat().st_size,
+            })
+    return profiles
+
+
+def profile_path(name: str, directory: Path = PROFILE_DIR) -> Optional[Path]:
+    """Resolve a profile name to its file, rejecting anything that is not a profile name"""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = directory / name
+    return path if path.is_file() else None
+
+
+async def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    """Dependency guarding the profile routes with PROFILE_TOKEN"""
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling access denied")
+
+
+class ProfilingMiddleware:
+    """Runs selected requests under cProfile and saves the stats as a .pstats file.
+
+    A request is profiled when it carries PROFILE_TOKEN in the X-Profile-Token
+    header or the ?profile= query flag, or when it is picked by PROFILE_SAMPLE_RATE.
+    cProfile observes the whole event loop thread, so only one request is profiled
+    at a time and the profile also contains whatever else ran meanwhile. Files are
+    named after the route handler (e.g. get_projects-20250101T120000-ab12cd34.pstats)
+    and the name is returned in the X-Profile-Id header. server.py only installs
+    the middleware when profiling is configured, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app, directory: Path = PROFILE_DIR, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not (
+            (self.sample_rate and random.random() < self.sample_rate) or requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        name = None
+
+        async def send_with_profile_id(message):
+            nonlocal name
+            if message["type"] == "http.response.start":
+                name = f"{route_name(scope)}-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.pstats"
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", name.encode())]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.disable()
+            self._active = False
+            if name:
+                try:
+                    await asyncio.to_thread(self._save, profiler, name)
+                    logger.info(f"Saved profile {name} ({(time.perf_counter() - started) * 1000:.1f}ms request)")
+                except OSError as e:
+                    logger.error(f"Failed to save profile {name}: {e}")
+
+    def _save(self, profiler: cProfile.Profile, name: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.directory / name)
+        prune_profiles(self.directory)
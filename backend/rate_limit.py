@@ -0,0 +1,114 @@
+from fastapi import HTTPException, Request
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+import math
+import os
+import time
+
+# Defaults for public write routes; override per route with RATE_LIMIT_<ROUTE>_PER_MINUTE / _BURST.
+# Limits are for the whole server; each worker process enforces its share (see rate_limit()).
+RATE_LIMIT_PER_MINUTE = float(os.environ.get('RATE_LIMIT_PER_MINUTE', '6'))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', '3'))
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', '10000'))
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Number of reverse proxies in front of the app whose X-Forwarded-For entries can be trusted;
+# gunicorn.conf.py defaults it to 1 for the proxied production deployment
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+# Set by gunicorn.conf.py for every worker
+WORKER_COUNT = max(1, int(os.environ.get('WEB_CONCURRENCY', '1')))
+
+
+class TokenBucketLimiter:
+    """Token bucket per client with a bounded LRU of buckets.
+
+    Each bucket holds up to `burst` tokens and refills at `rate` tokens per second.
+    When more than max_clients buckets exist, the least recently seen client is
+    forgotten, which at worst hands it a fresh full bucket.
+    """
+
+    def __init__(self, per_minute: float, burst: float, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, client: str) -> float:
+        """Take a token for a client; returns 0 when allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [self.burst, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            self.allowed += 1
+            return 0.0
+
+        self.rejected += 1
+        return (1.0 - bucket[0]) / self.rate if self.rate > 0 else 60.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "clients": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def client_ip(request: Request) -> str:
+    """Best-effort client address, honouring X-Forwarded-For only from trusted proxies"""
+    if TRUSTED_PROXY_HOPS > 0:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if hops:
+                return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+
+# Limiters by route name, exposed for monitoring
+limiters: Dict[str, TokenBucketLimiter] = {}
+
+
+def rate_limit(
+    route: str,
+    per_minute: Optional[float] = None,
+    burst: Optional[float] = None,
+    exempt: Optional[Callable[[Request], bool]] = None,
+):
+    """Build a FastAPI dependency that rejects clients over the route's limit with 429.
+
+    Requests for which `exempt` returns True are not charged a token.
+
+    Buckets live in each worker process, so every worker gets 1/WEB_CONCURRENCY of
+    the configured rate and burst (at least one request). A client spread over all
+    workers therefore never exceeds the configured limit. The trade-off is that a
+    client pinned to one worker by keep-alive only gets that worker's share, which
+    is fine for these low-volume form routes and avoids a Mongo round trip per check.
+    """
+    prefix = f"RATE_LIMIT_{route.upper()}"
+    limiter = limiters[route] = TokenBucketLimiter(
+        per_minute=float(os.environ.get(f"{prefix}_PER_MINUTE", per_minute or RATE_LIMIT_PER_MINUTE)) / WORKER_COUNT,
+        burst=max(1.0, float(os.environ.get(f"{prefix}_BURST", burst or RATE_LIMIT_BURST)) / WORKER_COUNT),
+    )
+
+    async def check_rate_limit(request: Request):
+        if not RATE_LIMIT_ENABLED or (exempt is not None and exempt(request)):
+            return
+        retry_after = limiter.acquire(client_ip(request))
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please slow down",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    return check_rate_limit
@@ -0,0 +1,185 @@
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+from datetime import datetime
+from cache import ResponseCache, response_cache
+from database import db
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Serve public reads from in-memory snapshots instead of Mongo
+READ_MODEL_ENABLED = os.environ.get('READ_MODEL_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# Collections held in memory, with the filter selecting the documents that are loaded
+READ_MODEL_COLLECTIONS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "projects": {},
+    "research_projects": {},
+    "services": {},
+    "testimonials": {"approved": True},
+    "about_info": {},
+})
+
+
+class Snapshot:
+    """Immutable copy of one collection's documents, newest first by (created_at, id).
+
+    Documents are handed out as shallow copies so callers can never modify the
+    snapshot that concurrent requests are reading.
+    """
+
+    __slots__ = ("name", "base_filter", "documents", "loaded_at")
+
+    def __init__(self, name: str, base_filter: Mapping[str, Any], documents: List[dict]):
+        self.name = name
+        self.base_filter = base_filter
+        self.documents = tuple(documents)
+        self.loaded_at = datetime.utcnow()
+
+    def covers(self, filter_query: Dict[str, Any]) -> bool:
+        """Whether every document matching an equality filter is in the snapshot"""
+        if any(isinstance(value, (dict, list)) for value in filter_query.values()):
+            return False
+        return all(filter_query.get(field) == value for field, value in self.base_filter.items())
+
+    def find(self, filter_query: Dict[str, Any]) -> Iterator[dict]:
+        """Documents matching an equality filter, in snapshot order (not copied)"""
+        for document in self.documents:
+            if all(document.get(field) == value for field, value in filter_query.items()):
+                yield document
+
+    def find_one(self, filter_query: Dict[str, Any]) -> Optional[dict]:
+        return next((dict(document) for document in self.find(filter_query)), None)
+
+    def __len__(self):
+        return len(self.documents)
+
+
+class ReadModel:
+    """In-memory snapshots of the public collections, swapped atomically on reload.
+
+    A reload reads the collections from Mongo and replaces the snapshot
+    references in one assignment, so a request always sees either the old or the
+    new data, never a mix. A local write invalidating a collection reloads it in
+    the background, and reads of that collection wait for the reload so writers
+    see their own changes. Entries the response cache built from an older
+    snapshot are dropped once the new one is in place.
+    """
+
+    def __init__(self, cache: ResponseCache, collections: Mapping[str, Mapping[str, Any]] = READ_MODEL_COLLECTIONS):
+        self.cache = cache
+        self.collections = collections
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+        self._started = False
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        cache.add_invalidation_listener(self._collection_changed)
+
+    @property
+    def active(self) -> bool:
+        return self._started
+
+    def _next_generation(self, name: str) -> int:
+        self._generations[name] = self._generations.get(name, 0) + 1
+        return self._generations[name]
+
+    async def _load(self, name: str) -> Snapshot:
+        base_filter = self.collections[name]
+        documents = await db[name].find(dict(base_filter), {"_id": 0}).sort(
+            [("created_at", -1), ("id", -1)]
+        ).to_list(None)
+        return Snapshot(name, base_filter, documents)
+
+    async def reload(self):
+        """Load every collection and swap all snapshots at once; old ones stay on failure"""
+        names = list(self.collections)
+        generations = {name: self._next_generation(name) for name in names}
+        try:
+            loaded = await asyncio.gather(*(self._load(name) for name in names))
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            raise
+        # Skip collections a reload started meanwhile (after a write) has already replaced
+        fresh = {
+            name: snapshot for name, snapshot in zip(names, loaded)
+            if self._generations[name] == generations[name]
+        }
+        self._snapshots = {**self._snapshots, **fresh}
+        self.reloads += 1
+        self.last_error = None
+        for name in names:
+            self.cache.invalidate(name, propagate=False)
+        print(f"🧊 Read model loaded {sum(len(snapshot) for snapshot in loaded)} documents")
+
+    async def reload_collection(self, name: str):
+        """Reload one collection; if that fails its reads go back to Mongo until the next reload"""
+        if not self._started:
+            return
+        generation = self._next_generation(name)
+        try:
+            snapshot = await self._load(name)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"Failed to reload {name} into the read model: {e}")
+            if self._generations[name] == generation:
+                self._snapshots = {key: value for key, value in self._snapshots.items() if key != name}
+            return
+        # A later reload of the same collection may already have finished
+        if self._generations[name] != generation:
+            return
+        self._snapshots = {**self._snapshots, name: snapshot}
+        self.reloads += 1
+        self.cache.invalidate(name, propagate=False)
+
+    def _collection_changed(self, name: str):
+        if not self._started or name not in self.collections:
+            return
+        task = asyncio.get_running_loop().create_task(self.reload_collection(name))
+        self._pending[name] = task
+        task.add_done_callback(lambda done: self._reload_finished(name, done))
+
+    def _reload_finished(self, name: str, task: asyncio.Task):
+        if self._pending.get(name) is task:
+            del self._pending[name]
+
+    async def snapshot(self, name: str) -> Optional[Snapshot]:
+        """Current snapshot of a collection, waiting for a reload a local write started"""
+        if not self._started:
+            return None
+        pending = self._pending.get(name)
+        if pending is not None:
+            # Shielded so a disconnecting client cannot cancel the reload
+            await asyncio.shield(pending)
+        return self._snapshots.get(name)
+
+    async def start(self):
+        await self.reload()
+        self._started = True
+
+    async def stop(self):
+        self._started = False
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        snapshots = self._snapshots
+        return {
+            "enabled": self._started,
+            "collections": {
+                name: {"documents": len(snapshot), "loaded_at": snapshot.loaded_at}
+                for name, snapshot in snapshots.items()
+            },
+            "documents": sum(len(snapshot) for snapshot in snapshots.values()),
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+# Shared read model; only started when READ_MODEL_ENABLED is set
+read_model = ReadModel(response_cache)
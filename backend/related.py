@@ -0,0 +1,214 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+from search import tokenize
+from database import projects_collection
+import numpy as np
+import os
+
+# Number of related projects kept per project
+RELATED_TOP_N = int(os.environ.get('RELATED_TOP_N', '4'))
+
+# Fields returned for each related project
+SUMMARY_FIELDS = ("id", "title", "category", "company", "image")
+
+
+def project_features(project: Dict[str, Any]) -> Set[str]:
+    """Build the feature set compared between projects"""
+    features = {f"tool:{tool.strip().lower()}" for tool in project.get("tools") or []}
+    if project.get("category"):
+        features.add(f"category:{project['category'].lower()}")
+    if project.get("company"):
+        features.add(f"company:{project['company'].lower()}")
+    features.update(f"term:{term}" for term in tokenize(project.get("description") or ""))
+    return features
+
+
+class RelatedProjectsIndex:
+    """Precomputed top-N Jaccard neighbours for every project.
+
+    Feature sets are stored as rows of a binary NumPy matrix so one project can be
+    scored against all others with a single matrix-vector product. Changing one
+    project rescores only its own row plus the rows whose top-N it enters or leaves,
+    instead of rebuilding the full O(n²) similarity matrix.
+
+    Not thread-safe: every read and change must run on the event loop, which is
+    why routes schedule the async wrappers below rather than these methods.
+    """
+
+    def __init__(self, top_n: int = RELATED_TOP_N):
+        self.top_n = top_n
+        # Incremental changes applied so far; kept across rebuilds
+        self.changes = 0
+        self._vocabulary: Dict[str, int] = {}
+        self._matrix = np.zeros((16, 256), dtype=np.float32)
+        self._sizes = np.zeros(16, dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._related: Dict[str, List[Tuple[str, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _ensure_capacity(self, rows: int, columns: int):
+        current_rows, current_columns = self._matrix.shape
+        if rows <= current_rows and columns <= current_columns:
+            return
+        new_rows = current_rows if rows <= current_rows else max(rows, current_rows * 2)
+        new_columns = current_columns if columns <= current_columns else max(columns, current_columns * 2)
+        matrix = np.zeros((new_rows, new_columns), dtype=np.float32)
+        matrix[:current_rows, :current_columns] = self._matrix
+        sizes = np.zeros(new_rows, dtype=np.float32)
+        sizes[:current_rows] = self._sizes
+        self._matrix, self._sizes = matrix, sizes
+
+    def _similarities(self, row: int) -> np.ndarray:
+        """Jaccard similarity of one row against every indexed row"""
+        count = len(self._ids)
+        matrix = self._matrix[:count]
+        intersections = matrix @ self._matrix[row]
+        unions = self._sizes[:count] + self._sizes[row] - intersections
+        scores = np.divide(intersections, unions, out=np.zeros(count, dtype=np.float32), where=unions > 0)
+        scores[row] = 0.0
+        return scores
+
+    def _top(self, scores: np.ndarray) -> List[Tuple[str, float]]:
+        count = min(self.top_n, len(scores))
+        if count == 0:
+            return []
+        # Keep every candidate tied with the N-th best score so ties break on id, not array order
+        threshold = -np.partition(-scores, count - 1)[count - 1]
+        candidates = [
+            (self._ids[index], round(float(scores[index]), 4))
+            for index in np.nonzero((scores >= threshold) & (scores > 0))[0]
+        ]
+        candidates.sort(key=lambda item: (-item[1], item[0]))
+        return candidates[:self.top_n]
+
+    def _rescore(self, project_id: str):
+        self._related[project_id] = self._top(self._similarities(self._rows[project_id]))
+
+    def rebuild(self, projects: List[Dict[str, Any]]):
+        """Index every project and compute all neighbour lists in one pass"""
+        changes = self.changes
+        self.__init__(self.top_n)
+        self.changes = changes
+        for project in projects:
+            self._store(project)
+        for project_id in self._ids:
+            self._rescore(project_id)
+
+    def _store(self, project: Dict[str, Any]) -> int:
+        """Write a project's feature row, returning its row index"""
+        features = project_features(project)
+        for feature in features:
+            if feature not in self._vocabulary:
+                self._vocabulary[feature] = len(self._vocabulary)
+
+        project_id = project["id"]
+        row = self._rows.get(project_id)
+        if row is None:
+            row = len(self._ids)
+            self._ids.append(project_id)
+            self._rows[project_id] = row
+        self._ensure_capacity(row + 1, len(self._vocabulary))
+
+        self._matrix[row] = 0.0
+        self._matrix[row, [self._vocabulary[feature] for feature in features]] = 1.0
+        self._sizes[row] = len(features)
+        self._summaries[project_id] = {field: project.get(field) for field in SUMMARY_FIELDS}
+        return row
+
+    def upsert(self, project: Dict[str, Any]):
+        """Add or update one project and refresh only the neighbour lists it affects"""
+        project_id = project["id"]
+        self.changes += 1
+        row = self._store(project)
+        scores = self._similarities(row)
+        self._related[project_id] = self._top(scores)
+
+        for other_id, other_row in self._rows.items():
+            if other_id == project_id:
+                continue
+            neighbours = self._related.get(other_id, [])
+            score = round(float(scores[other_row]), 4)
+            if any(neighbour_id == project_id for neighbour_id, _ in neighbours):
+                # Its score to this project may have dropped, so rescore the row
+                self._rescore(other_id)
+            elif score > 0 and (
+                len(neighbours) < self.top_n
+                or (-score, project_id) < (-neighbours[-1][1], neighbours[-1][0])
+            ):
+                neighbours = neighbours + [(project_id, score)]
+                neighbours.sort(key=lambda item: (-item[1], item[0]))
+                self._related[other_id] = neighbours[:self.top_n]
+
+    def remove(self, project_id: str):
+        """Drop a project and rescore the projects that listed it as a neighbour"""
+        row = self._rows.pop(project_id, None)
+        if row is None:
+            return
+        self.changes += 1
+
+        # Move the last row into the freed slot to keep the matrix dense
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._sizes[row] = self._sizes[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._matrix[last] = 0.0
+        self._sizes[last] = 0.0
+        self._ids.pop()
+        self._summaries.pop(project_id, None)
+        self._related.pop(project_id, None)
+
+        for other_id, neighbours in list(self._related.items()):
+            if any(neighbour_id == project_id for neighbour_id, _ in neighbours):
+                self._rescore(other_id)
+
+    def related(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the precomputed neighbours of a project, or None if it is unknown"""
+        if project_id not in self._rows:
+            return None
+        return [
+            {**self._summaries[neighbour_id], "similarity": score}
+            for neighbour_id, score in self._related.get(project_id, [])
+        ]
+
+
+# Shared related-projects index
+related_projects = RelatedProjectsIndex()
+
+
+# Reads a rebuild repeats when local writes land while it is loading
+RELATED_REBUILD_ATTEMPTS = 3
+
+
+async def upsert_related_project(project: Dict[str, Any]):
+    """Apply a project write to the shared index on the event loop.
+
+    Background tasks that are plain functions run in Starlette's threadpool, where
+    they would race with requests reading the index.
+    """
+    related_projects.upsert(project)
+
+
+async def remove_related_project(project_id: str):
+    """Apply a project deletion to the shared index on the event loop"""
+    related_projects.remove(project_id)
+
+
+async def build_related_projects():
+    """Load all projects from Mongo and precompute their neighbours.
+
+    If an incremental change is applied while the projects are loading, the load
+    may predate that write, so it is read again before replacing the index.
+    """
+    for _ in range(RELATED_REBUILD_ATTEMPTS):
+        changes = related_projects.changes
+        projects = [project async for project in projects_collection.find({}, {"_id": 0})]
+        if related_projects.changes == changes:
+            break
+    related_projects.rebuild(projects)
+    print(f"🧭 Related projects computed for {len(related_projects)} projects")
@@ -0,0 +1,72 @@
+from pymongo import UpdateOne
+from typing import Any, Dict, List, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from database import page_view_rollups_collection
+import os
+
+# Bucket widths for pre-aggregated page-view counters
+GRANULARITIES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+# Minute and hour buckets are only useful for recent traffic; they expire after this many
+# days (hour buckets carry visitor sketches too). Day buckets keep the long-term counts.
+MINUTE_ROLLUP_RETENTION_DAYS = int(os.environ.get('MINUTE_ROLLUP_RETENTION_DAYS', '7'))
+HOUR_ROLLUP_RETENTION_DAYS = int(os.environ.get('HOUR_ROLLUP_RETENTION_DAYS', '90'))
+ROLLUP_RETENTION = {
+    "minute": timedelta(days=MINUTE_ROLLUP_RETENTION_DAYS),
+    "hour": timedelta(days=HOUR_ROLLUP_RETENTION_DAYS),
+}
+# Upper bound on buckets a single summary request may span
+MAX_SUMMARY_BUCKETS = 5000
+# Rollup documents with this page hold the totals across every page
+SITE_PAGE = None
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a naive UTC timestamp to the start of its bucket"""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def record_rollups(events: List[Dict[str, Any]]):
+    """Fold a batch of page views into minute/hour/day counters with one bulk upsert.
+
+    Each view is counted for its page and for the site-wide SITE_PAGE document.
+    """
+    counts = Counter(
+        (page, granularity, bucket_start(event["timestamp"], granularity))
+        for event in events
+        for page in (event["page"], SITE_PAGE)
+        for granularity in GRANULARITIES
+    )
+    if not counts:
+        return
+
+    operations = []
+    for (page, granularity, bucket), views in counts.items():
+        update = {"$inc": {"views": views}}
+        if granularity in ROLLUP_RETENTION:
+            update["$setOnInsert"] = {"expires_at": bucket + ROLLUP_RETENTION[granularity]}
+        operations.append(UpdateOne(
+            {"page": page, "granularity": granularity, "bucket": bucket},
+            update,
+            upsert=True
+        ))
+    await page_view_rollups_collection.bulk_write(operations, ordered=False)
+
+
+async def load_summary(page: Optional[str], start: datetime, end: datetime, granularity: str) -> List[Dict[str, Any]]:
+    """Read per-bucket view counts for a range from the rollups only; no page means site-wide"""
+    match = {
+        "page": page or SITE_PAGE,
+        "granularity": granularity,
+        "bucket": {"$gte": bucket_start(start, granularity), "$lte": end},
+    }
+    cursor = page_view_rollups_collection.find(match, {"_id": 0, "bucket": 1, "views": 1}).sort("bucket", 1)
+    return await cursor.to_list(MAX_SUMMARY_BUCKETS)
@@ -1,26 +1,42 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from models import AboutInfo, AboutInfoUpdate, SuccessResponse
 from database import about_info_collection
+from pymongo import ReturnDocument
+from cache import response_cache, CACHE_TTL_SECONDS
+from snapshots import serve_snapshot
+from read_model import read_model
 from datetime import datetime
+import os
 
 router = APIRouter(prefix="/about", tags=["about"])
 
+# API writes invalidate the about document, but scripts such as update_about_data.py
+# edit it directly, so by default it expires like every other entry
+ABOUT_CACHE_TTL_SECONDS = float(os.environ.get('ABOUT_CACHE_TTL_SECONDS', CACHE_TTL_SECONDS))
+
 @router.get("/", response_model=SuccessResponse)
-async def get_about_info():
+async def get_about_info(request: Request):
     """Get about information"""
     try:
-        about_info = await about_info_collection.find_one({"id": "about_info"})
-        if not about_info:
-            raise HTTPException(status_code=404, detail="About information not found")
-            
-        # Remove MongoDB ObjectId
-        if "_id" in about_info:
-            del about_info["_id"]
+        async def load_about_info():
+            snapshot = await read_model.snapshot("about_info")
+            if snapshot is not None:
+                about_info = snapshot.find_one({"id": "about_info"})
+            else:
+                about_info = await about_info_collection.find_one({"id": "about_info"})
+            if not about_info:
+                raise HTTPException(status_code=404, detail="About information not found")
+                
+            # Remove MongoDB ObjectId
+            if "_id" in about_info:
+                del about_info["_id"]
+                
+            return SuccessResponse(
+                data={"about": about_info},
+                message="About information retrieved successfully"
+            )
             
-        return SuccessResponse(
-            data={"about": about_info},
-            message="About information retrieved successfully"
-        )
+        return await serve_snapshot(request, "about_info", None, load_about_info, ttl=ABOUT_CACHE_TTL_SECONDS)
     except HTTPException:
         raise
     except Exception as e:
@@ -33,17 +49,16 @@ async def update_about_info(about_update: AboutInfoUpdate):
         update_dict = {k: v for k, v in about_update.dict().items() if v is not None}
         update_dict["updated_at"] = datetime.utcnow()
         
-        result = await about_info_collection.update_one(
+        updated_about = await about_info_collection.find_one_and_update(
             {"id": "about_info"},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_about is None:
             raise HTTPException(status_code=404, detail="About information not found")
-            
-        updated_about = await about_info_collection.find_one({"id": "about_info"})
-        if "_id" in updated_about:
-            del updated_about["_id"]
+        response_cache.invalidate("about_info")
             
         return SuccessResponse(
             data={"about": updated_about},
@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from typing import Optional
+from models import PageView, PageViewCreate, SuccessResponse
+from database import page_views_collection
+from pageviews import PageViewBuffer
+from rollups import GRANULARITIES, MAX_SUMMARY_BUCKETS, record_rollups, load_summary
+from visitors import visitor_sketches
+from hyperloglog import STANDARD_ERROR
+from rate_limit import client_ip, rate_limit
+from cache import response_cache
+from snapshots import serve_snapshot
+from datetime import datetime, timezone
+import asyncio
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Default span of a summary request when from is omitted
+DEFAULT_SUMMARY_BUCKETS = {"minute": 60, "hour": 48, "day": 30}
+
+async def page_views_written(events):
+    """Fold a flushed page-view batch into the rollups and visitor sketches"""
+    await record_rollups(events)
+    await visitor_sketches.record(events)
+    response_cache.invalidate("page_view_rollups")
+
+page_view_buffer = PageViewBuffer(page_views_collection, on_flush=page_views_written)
+
+def as_utc(value: datetime) -> datetime:
+    """Normalize a query datetime to the naive UTC used in storage"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+# A visitor opens a few pages a minute; the limit keeps one client from flooding the rollups
+@router.post("/pageview", status_code=204, response_class=Response, dependencies=[Depends(rate_limit("pageview", per_minute=60, burst=20))])
+async def record_page_view(request: Request):
+    """Accept a page-view beacon and buffer it for batched insertion"""
+    # navigator.sendBeacon posts text/plain, so parse the body regardless of content type
+    try:
+        event = PageViewCreate.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid page view: {e.errors()[0]['msg']}")
+
+    page_view = PageView(
+        page=event.page,
+        referrer=event.referrer or request.headers.get("referer"),
+        user_agent=request.headers.get("user-agent"),
+        ip_address=client_ip(request)
+    )
+    page_view_buffer.record(page_view.dict())
+    return Response(status_code=204)
+
+@router.get("/summary", response_model=SuccessResponse)
+async def get_page_view_summary(
+    request: Request,
+    page: Optional[str] = Query(None, description="Page path; omit for site-wide totals"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$")
+):
+    """Get page-view counts per time bucket from the pre-aggregated rollups"""
+    try:
+        # Key on the requested range so open-ended queries share a snapshot until the next flush
+        params = {"page": page, "from": start, "to": end, "granularity": granularity}
+        end = as_utc(end) if end else datetime.utcnow()
+        start = as_utc(start) if start else end - GRANULARITIES[granularity] * DEFAULT_SUMMARY_BUCKETS[granularity]
+        if start > end:
+            raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+        if (end - start) / GRANULARITIES[granularity] > MAX_SUMMARY_BUCKETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Range spans more than {MAX_SUMMARY_BUCKETS} {granularity} buckets, use a coarser granularity"
+            )
+
+        async def load():
+            buckets, (visitors, unique_visitors) = await asyncio.gather(
+                load_summary(page, start, end, granularity),
+                visitor_sketches.unique_visitors(page, start, end, granularity)
+            )
+            if visitors:
+                for bucket in buckets:
+                    bucket["unique_visitors"] = visitors.get(bucket["bucket"], 0)
+            return SuccessResponse(
+                data={
+                    "page": page,
+                    "granularity": granularity,
+                    "from": start,
+                    "to": end,
+                    "buckets": buckets,
+                    "total_views": sum(bucket["views"] for bucket in buckets),
+                    "unique_visitors": unique_visitors,
+                    "unique_visitors_error": round(STANDARD_ERROR, 4),
+                },
+                message="Page-view summary retrieved successfully"
+            )
+
+        return await serve_snapshot(request, "page_view_rollups", params, load)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch page-view summary: {str(e)}")
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, HTTPException, Request
+from models import SuccessResponse
+from database import (
+    projects_collection, about_info_collection, research_projects_collection,
+    services_collection, testimonials_collection
+)
+from cache import response_cache
+from pagination import fetch_page, MAX_PAGE_SIZE
+from fields import resolve_fields
+from snapshots import serve_snapshot
+from read_model import read_model
+import asyncio
+import json
+import os
+
+router = APIRouter(prefix="/bundle", tags=["bundle"])
+
+# Sections each page needs, overridable with a JSON object in BUNDLE_PAGES
+DEFAULT_BUNDLE_PAGES = {
+    "home": ["about", "featured_projects", "services", "testimonials"],
+    "about": ["about", "testimonials"],
+    "portfolio": ["projects"],
+    "research": ["research"],
+    "services": ["services", "testimonials"],
+}
+BUNDLE_PAGES = json.loads(os.environ['BUNDLE_PAGES']) if os.environ.get('BUNDLE_PAGES') else DEFAULT_BUNDLE_PAGES
+FEATURED_PROJECTS_LIMIT = int(os.environ.get('FEATURED_PROJECTS_LIMIT', '6'))
+
+async def load_about():
+    snapshot = await read_model.snapshot("about_info")
+    if snapshot is not None:
+        return snapshot.find_one({"id": "about_info"})
+    return await about_info_collection.find_one({"id": "about_info"}, {"_id": 0})
+
+async def load_featured_projects():
+    _, projection = resolve_fields("projects", None)
+    projects, _ = await fetch_page(projects_collection, {}, "created_at", FEATURED_PROJECTS_LIMIT, projection=projection)
+    return projects
+
+async def load_projects():
+    _, projection = resolve_fields("projects", None)
+    projects, _ = await fetch_page(projects_collection, {}, "created_at", MAX_PAGE_SIZE, projection=projection)
+    return projects
+
+async def load_research():
+    _, projection = resolve_fields("research_projects", None)
+    research, _ = await fetch_page(research_projects_collection, {}, "created_at", MAX_PAGE_SIZE, projection=projection)
+    return research
+
+async def load_services():
+    _, projection = resolve_fields("services", None)
+    services, _ = await fetch_page(services_collection, {}, "created_at", MAX_PAGE_SIZE, projection=projection)
+    return services
+
+async def load_testimonials():
+    testimonials, _ = await fetch_page(testimonials_collection, {"approved": True}, "created_at", MAX_PAGE_SIZE)
+    return testimonials
+
+# Section name -> (collection the section depends on, loader)
+SECTIONS = {
+    "about": ("about_info", load_about),
+    "featured_projects": ("projects", load_featured_projects),
+    "projects": ("projects", load_projects),
+    "research": ("research_projects", load_research),
+    "services": ("services", load_services),
+    "testimonials": ("testimonials", load_testimonials),
+}
+
+def validate_bundle_pages(pages):
+    """Reject pages naming unknown sections, so bad config fails at import instead of with a 500"""
+    for page, sections in pages.items():
+        unknown = [section for section in sections if section not in SECTIONS]
+        if unknown:
+            raise RuntimeError(
+                f"BUNDLE_PAGES page {page!r} has unknown sections {unknown}; "
+                f"valid sections are {sorted(SECTIONS)}"
+            )
+
+validate_bundle_pages(BUNDLE_PAGES)
+
+@router.get("/{page}", response_model=SuccessResponse)
+async def get_page_bundle(page: str, request: Request):
+    """Get every section a page needs in a single response"""
+    try:
+        sections = BUNDLE_PAGES.get(page)
+        if sections is None:
+            raise HTTPException(status_code=404, detail=f"Unknown bundle page: {page}")
+
+        async def load_bundle():
+            results = await asyncio.gather(*(SECTIONS[section][1]() for section in sections))
+            data = {"page": page}
+            data.update(zip(sections, results))
+            return SuccessResponse(
+                data=data,
+                message="Page bundle retrieved successfully"
+            )
+
+        # Keying on the versions of every source collection means any write to
+        # one of them loads a fresh snapshot for this page
+        versions = tuple(response_cache.version(SECTIONS[section][0]) for section in sections)
+        return await serve_snapshot(request, "bundle", {"page": page, "versions": versions}, load_bundle)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve page bundle: {str(e)}")
@@ -1,57 +1,102 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from typing import List, Optional
 from models import ContactSubmission, ContactSubmissionCreate, SuccessResponse
 from database import contact_submissions_collection
+from pagination import fetch_page, MAX_PAGE_SIZE
+from cache import response_cache
+from snapshots import EncodedResponse
+from write_behind import WriteBehindQueue, QueueFullError
+from notifications import NOTIFICATIONS_ENABLED, NotificationWorkerPool, pending_notification
+from idempotency import replay_exempt, run_idempotent
+from rate_limit import rate_limit
 from datetime import datetime
 import uuid
 
 router = APIRouter(prefix="/contact", tags=["contact"])
 
-@router.post("/", response_model=SuccessResponse)
-async def submit_contact_form(submission: ContactSubmissionCreate):
+# Delivers the notifications pending on submissions when SMTP is configured
+notification_workers = NotificationWorkerPool(contact_submissions_collection)
+
+async def submissions_written(submissions):
+    """Wake the notification workers for a flushed write-behind batch"""
+    response_cache.invalidate("contact_submissions")
+    if NOTIFICATIONS_ENABLED:
+        notification_workers.notify()
+
+# Batches submissions into insert_many calls when CONTACT_WRITE_BEHIND is enabled
+contact_write_queue = WriteBehindQueue(contact_submissions_collection, on_write=submissions_written)
+
+@router.post("/", response_model=SuccessResponse, dependencies=[Depends(rate_limit("contact", exempt=replay_exempt("contact.create")))])
+async def submit_contact_form(submission: ContactSubmissionCreate, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Submit contact form"""
-    try:
-        submission_dict = submission.dict()
-        submission_dict["id"] = str(uuid.uuid4())
-        submission_dict["submitted_at"] = datetime.utcnow()
-        submission_dict["status"] = "new"
+    async def execute():
+        try:
+            submission_dict = submission.dict()
+            submission_dict["id"] = str(uuid.uuid4())
+            submission_dict["submitted_at"] = datetime.utcnow()
+            submission_dict["status"] = "new"
+            if NOTIFICATIONS_ENABLED:
+                # The pending notification travels in the submission document itself,
+                # so it is stored if and only if the submission is
+                submission_dict.update(pending_notification())
         
-        result = await contact_submissions_collection.insert_one(submission_dict)
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to submit contact form")
-        
-        # Remove MongoDB ObjectId for response
-        submission_dict.pop("_id", None)
+            if contact_write_queue.running:
+                try:
+                    contact_write_queue.put(submission_dict)
+                except QueueFullError:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Too many submissions right now, please try again shortly",
+                        headers={"Retry-After": "5"}
+                    )
+            else:
+                # Delivery happens later in the notification workers
+                result = await contact_submissions_collection.insert_one(submission_dict)
+                if not result.inserted_id:
+                    raise HTTPException(status_code=500, detail="Failed to submit contact form")
+            
+                # Remove MongoDB ObjectId for response
+                submission_dict.pop("_id", None)
+                response_cache.invalidate("contact_submissions")
+                if NOTIFICATIONS_ENABLED:
+                    notification_workers.notify()
         
-        # TODO: Send email notification to admin
-        # await send_contact_notification(submission_dict)
+            return SuccessResponse(
+                data={"submission_id": submission_dict["id"]},
+                message="Thank you for your message! I'll get back to you within 24 hours."
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to submit contact form: {str(e)}")
         
-        return SuccessResponse(
-            data={"submission_id": submission_dict["id"]},
-            message="Thank you for your message! I'll get back to you within 24 hours."
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit contact form: {str(e)}")
+    return await run_idempotent(idempotency_key, "contact.create", submission, execute)
 
 @router.get("/", response_model=SuccessResponse)
-async def get_contact_submissions(status: str = None):
-    """Get all contact submissions (admin only - auth to be added)"""
+async def get_contact_submissions(
+    request: Request,
+    status: str = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    """Get contact submissions newest first with cursor pagination (admin only - auth to be added)"""
     try:
         filter_query = {}
         if status:
             filter_query["status"] = status
             
-        submissions = await contact_submissions_collection.find(filter_query).sort("submitted_at", -1).to_list(1000)
-        
-        # Remove MongoDB ObjectIds
-        for submission in submissions:
-            if "_id" in submission:
-                del submission["_id"]
+        submissions, next_cursor = await fetch_page(
+            contact_submissions_collection, filter_query, "submitted_at", limit, cursor
+        )
                 
-        return SuccessResponse(
-            data={"submissions": submissions, "total": len(submissions)},
+        # Not cached, so served uncompressed; clients polling an unchanged list still
+        # get a 304 via the content ETag
+        return await EncodedResponse.build(SuccessResponse(
+            data={"submissions": submissions, "total": len(submissions), "next_cursor": next_cursor},
             message="Contact submissions retrieved successfully"
-        )
+        )).respond(request, compress=False)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve submissions: {str(e)}")
 
@@ -70,6 +115,7 @@ async def update_submission_status(submission_id: str, status: str):
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Submission not found")
+        response_cache.invalidate("contact_submissions")
             
         return SuccessResponse(
             data={"submission_id": submission_id, "new_status": status},
@@ -78,10 +124,4 @@ async def update_submission_status(submission_id: str, status: str):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update submission status: {str(e)}")
-
-# TODO: Implement email notification function
-async def send_contact_notification(submission_dict):
-    """Send email notification for new contact submission"""
-    # This will be implemented when email service is configured
-    pass
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to update submission status: {str(e)}")
\ No newline at end of file
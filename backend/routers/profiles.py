@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from models import SuccessResponse
+from profiling import PROFILING_ENABLED, list_profiles, profile_path, require_profile_token
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"], dependencies=[Depends(require_profile_token)])
+
+@router.get("/", response_model=SuccessResponse)
+async def get_profiles():
+    """List saved request profiles, newest first (admin only)"""
+    try:
+        profiles = list_profiles()
+        return SuccessResponse(
+            data={"enabled": PROFILING_ENABLED, "profiles": profiles, "total": len(profiles)},
+            message="Profiles retrieved successfully"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list profiles: {str(e)}")
+
+@router.get("/{name}")
+async def download_profile(name: str):
+    """Download a .pstats profile, e.g. for snakeviz or python -m pstats (admin only)"""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,17 +1,35 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, BackgroundTasks, HTTPException, Query, Request
 from typing import List, Optional
-from models import Project, ProjectCreate, ProjectUpdate, SuccessResponse
+from models import Project, ProjectCreate, ProjectUpdate, SuccessResponse, BulkWriteRequest
 from database import projects_collection
+from pymongo import ReturnDocument
+from cache import response_cache
+from search import search_index
+from related import related_projects, remove_related_project, upsert_related_project
+from pagination import fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from fields import resolve_fields
+from snapshots import serve_snapshot
+from read_model import read_model
+from collections import Counter
+from bulk import run_bulk_write, fetch_documents
 from bson import ObjectId
+from idempotency import run_idempotent
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 @router.get("/", response_model=SuccessResponse)
-async def get_projects(category: Optional[str] = Query(None)):
-    """Get all projects with optional category filter"""
+async def get_projects(
+    request: Request,
+    category: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, 'summary' (default) or 'all'")
+):
+    """Get projects newest first with optional category filter and cursor pagination"""
     try:
+        field_set, projection = resolve_fields("projects", fields)
         filter_query = {}
         if category and category != "all":
             # Convert category filter format (e.g., "3d-design" to "3D Design")
@@ -25,82 +43,197 @@ async def get_projects(category: Optional[str] = Query(None)):
             }
             filter_query["category"] = category_map.get(category, category)
             
-        projects = await projects_collection.find(filter_query).sort("created_at", -1).to_list(1000)
-        
-        # Convert ObjectId to string for JSON serialization
-        for project in projects:
-            if "_id" in project:
-                del project["_id"]
-                
-        return SuccessResponse(
-            data={"projects": projects, "total": len(projects)},
-            message="Projects retrieved successfully"
-        )
+        async def load_projects():
+            projects, next_cursor = await fetch_page(
+                projects_collection, filter_query, "created_at", limit, cursor, projection
+            )
+            return SuccessResponse(
+                data={"projects": projects, "total": len(projects), "next_cursor": next_cursor},
+                message="Projects retrieved successfully"
+            )
+            
+        cache_params = {**filter_query, "limit": limit, "cursor": cursor, "fields": field_set}
+        return await serve_snapshot(request, "projects", cache_params, load_projects)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve projects: {str(e)}")
 
+def facet_payload(categories, companies, tools, total):
+    for item in categories:
+        # Slug matching the category filter accepted by get_projects
+        item["slug"] = str(item["value"]).lower().replace(" ", "-")
+    return SuccessResponse(
+        data={"categories": categories, "companies": companies, "tools": tools, "total": total},
+        message="Project facets retrieved successfully"
+    )
+
+def facets_from_projects(projects):
+    """The facet aggregation computed over in-memory projects"""
+    def counts(values):
+        # Same order as the pipeline: count descending, then value (nulls first)
+        ordered = sorted(Counter(values).items(), key=lambda item: (-item[1], item[0] is not None, item[0] or ""))
+        return [{"value": value, "count": count} for value, count in ordered]
+
+    return facet_payload(
+        counts(project.get("category") for project in projects),
+        counts(project.get("company") for project in projects),
+        counts(tool for project in projects for tool in project.get("tools") or []),
+        len(projects)
+    )
+
+@router.get("/facets", response_model=SuccessResponse)
+async def get_project_facets(request: Request):
+    """Get project counts per category, company and tool"""
+    try:
+        def count_by(field):
+            return [
+                {"$group": {"_id": field, "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ]
+            
+        async def load_facets():
+            snapshot = await read_model.snapshot("projects")
+            if snapshot is not None:
+                return facets_from_projects(snapshot.documents)
+
+            pipeline = [
+                # Only the faceted fields travel through the pipeline
+                {"$project": {"_id": 0, "category": 1, "company": 1, "tools": 1}},
+                {"$facet": {
+                    "categories": count_by("$category"),
+                    "companies": count_by("$company"),
+                    "tools": [{"$unwind": "$tools"}] + count_by("$tools"),
+                    "total": [{"$count": "count"}],
+                }},
+            ]
+            results = await projects_collection.aggregate(pipeline).to_list(1)
+            facets = results[0] if results else {}
+
+            def counts(bucket):
+                return [{"value": item["_id"], "count": item["count"]} for item in facets.get(bucket, [])]
+
+            total = facets.get("total") or [{"count": 0}]
+            return facet_payload(counts("categories"), counts("companies"), counts("tools"), total[0]["count"])
+
+        return await serve_snapshot(request, "projects", {"facets": True}, load_facets)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve project facets: {str(e)}")
+
 @router.get("/{project_id}", response_model=SuccessResponse)
-async def get_project(project_id: str):
+async def get_project(project_id: str, request: Request):
     """Get single project by ID"""
     try:
-        project = await projects_collection.find_one({"id": project_id})
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-            
-        # Remove MongoDB ObjectId
-        if "_id" in project:
-            del project["_id"]
+        async def load_project():
+            snapshot = await read_model.snapshot("projects")
+            if snapshot is not None:
+                project = snapshot.find_one({"id": project_id})
+            else:
+                project = await projects_collection.find_one({"id": project_id})
+            if not project:
+                raise HTTPException(status_code=404, detail="Project not found")
+                
+            # Remove MongoDB ObjectId
+            if "_id" in project:
+                del project["_id"]
+                
+            return SuccessResponse(
+                data={"project": project},
+                message="Project retrieved successfully"
+            )
             
-        return SuccessResponse(
-            data={"project": project},
-            message="Project retrieved successfully"
-        )
+        return await serve_snapshot(request, "projects", {"id": project_id}, load_project)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve project: {str(e)}")
 
+@router.get("/{project_id}/related", response_model=SuccessResponse)
+async def get_related_projects(project_id: str):
+    """Get precomputed similar projects for a project"""
+    related = related_projects.related(project_id)
+    if related is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+        
+    return SuccessResponse(
+        data={"project_id": project_id, "related": related, "total": len(related)},
+        message="Related projects retrieved successfully"
+    )
+
 @router.post("/", response_model=SuccessResponse)
-async def create_project(project: ProjectCreate):
+async def create_project(project: ProjectCreate, background_tasks: BackgroundTasks, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Create new project (admin only - auth to be added)"""
-    try:
-        project_dict = project.dict()
-        project_dict["id"] = str(uuid.uuid4())
-        project_dict["created_at"] = datetime.utcnow()
-        project_dict["updated_at"] = datetime.utcnow()
+    async def execute():
+        try:
+            project_dict = project.dict()
+            project_dict["id"] = str(uuid.uuid4())
+            project_dict["created_at"] = datetime.utcnow()
+            project_dict["updated_at"] = datetime.utcnow()
         
-        result = await projects_collection.insert_one(project_dict)
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to create project")
+            result = await projects_collection.insert_one(project_dict)
+            if not result.inserted_id:
+                raise HTTPException(status_code=500, detail="Failed to create project")
             
-        # Remove MongoDB ObjectId for response
-        project_dict.pop("_id", None)
+            # Remove MongoDB ObjectId for response
+            project_dict.pop("_id", None)
+            response_cache.invalidate("projects")
+            search_index.upsert("projects", project_dict)
+            background_tasks.add_task(upsert_related_project, project_dict)
         
-        return SuccessResponse(
-            data={"project": project_dict},
-            message="Project created successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
+            return SuccessResponse(
+                data={"project": project_dict},
+                message="Project created successfully"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "projects.create", project, execute)
+
+@router.post("/bulk", response_model=SuccessResponse)
+async def bulk_write_projects(bulk_request: BulkWriteRequest, background_tasks: BackgroundTasks, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    """Insert, update and delete projects in one bulk write (admin only)"""
+    async def execute():
+        try:
+            outcome = await run_bulk_write(projects_collection, bulk_request.operations, ProjectCreate, ProjectUpdate)
+            if outcome.changed:
+                response_cache.invalidate("projects")
+                for project_id in outcome.deleted_ids:
+                    search_index.remove("projects", project_id)
+                    background_tasks.add_task(remove_related_project, project_id)
+                for project in outcome.inserted + await fetch_documents(projects_collection, outcome.updated_ids):
+                    search_index.upsert("projects", project)
+                    background_tasks.add_task(upsert_related_project, project)
+            
+            return SuccessResponse(
+                data={"results": outcome.results, **outcome.counts},
+                message="Bulk write completed"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to bulk write projects: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "projects.bulk", bulk_request, execute)
 
 @router.put("/{project_id}", response_model=SuccessResponse)
-async def update_project(project_id: str, project_update: ProjectUpdate):
+async def update_project(project_id: str, project_update: ProjectUpdate, background_tasks: BackgroundTasks):
     """Update project (admin only - auth to be added)"""
     try:
         update_dict = {k: v for k, v in project_update.dict().items() if v is not None}
         update_dict["updated_at"] = datetime.utcnow()
         
-        result = await projects_collection.update_one(
+        updated_project = await projects_collection.find_one_and_update(
             {"id": project_id},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_project is None:
             raise HTTPException(status_code=404, detail="Project not found")
-            
-        updated_project = await projects_collection.find_one({"id": project_id})
-        if "_id" in updated_project:
-            del updated_project["_id"]
+        response_cache.invalidate("projects")
+        search_index.upsert("projects", updated_project)
+        background_tasks.add_task(upsert_related_project, updated_project)
             
         return SuccessResponse(
             data={"project": updated_project},
@@ -112,13 +245,16 @@ async def update_project(project_id: str, project_update: ProjectUpdate):
         raise HTTPException(status_code=500, detail=f"Failed to update project: {str(e)}")
 
 @router.delete("/{project_id}", response_model=SuccessResponse)
-async def delete_project(project_id: str):
+async def delete_project(project_id: str, background_tasks: BackgroundTasks):
     """Delete project (admin only - auth to be added)"""
     try:
         result = await projects_collection.delete_one({"id": project_id})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
+        response_cache.invalidate("projects")
+        search_index.remove("projects", project_id)
+        background_tasks.add_task(remove_related_project, project_id)
             
         return SuccessResponse(
             data={"deleted_id": project_id},
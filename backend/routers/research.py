@@ -1,53 +1,97 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import ResearchProject, ResearchProjectCreate, ResearchProjectUpdate, SuccessResponse
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from typing import List, Optional
+from models import ResearchProject, ResearchProjectCreate, ResearchProjectUpdate, SuccessResponse, BulkWriteRequest
 from database import research_projects_collection
+from pymongo import ReturnDocument
+from cache import response_cache
+from search import search_index
+from pagination import fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from fields import resolve_fields
+from snapshots import serve_snapshot
+from bulk import run_bulk_write, fetch_documents
 from bson import ObjectId
+from idempotency import run_idempotent
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/research", tags=["research"])
 
 @router.get("/", response_model=SuccessResponse)
-async def get_research_projects():
-    """Get all research projects"""
+async def get_research_projects(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, 'summary' (default) or 'all'")
+):
+    """Get research projects newest first with cursor pagination"""
     try:
-        projects = await research_projects_collection.find().sort("created_at", -1).to_list(1000)
+        field_set, projection = resolve_fields("research_projects", fields)
         
-        # Remove MongoDB ObjectIds
-        for project in projects:
-            if "_id" in project:
-                del project["_id"]
-                
-        return SuccessResponse(
-            data={"research": projects, "total": len(projects)},
-            message="Research projects retrieved successfully"
-        )
+        async def load_research_projects():
+            projects, next_cursor = await fetch_page(
+                research_projects_collection, {}, "created_at", limit, cursor, projection
+            )
+            return SuccessResponse(
+                data={"research": projects, "total": len(projects), "next_cursor": next_cursor},
+                message="Research projects retrieved successfully"
+            )
+            
+        cache_params = {"limit": limit, "cursor": cursor, "fields": field_set}
+        return await serve_snapshot(request, "research_projects", cache_params, load_research_projects)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve research projects: {str(e)}")
 
 @router.post("/", response_model=SuccessResponse)
-async def create_research_project(project: ResearchProjectCreate):
+async def create_research_project(project: ResearchProjectCreate, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Create new research project (admin only)"""
-    try:
-        project_dict = project.dict()
-        project_dict["id"] = str(uuid.uuid4())
-        project_dict["created_at"] = datetime.utcnow()
-        project_dict["updated_at"] = datetime.utcnow()
+    async def execute():
+        try:
+            project_dict = project.dict()
+            project_dict["id"] = str(uuid.uuid4())
+            project_dict["created_at"] = datetime.utcnow()
+            project_dict["updated_at"] = datetime.utcnow()
         
-        result = await research_projects_collection.insert_one(project_dict)
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to create research project")
+            result = await research_projects_collection.insert_one(project_dict)
+            if not result.inserted_id:
+                raise HTTPException(status_code=500, detail="Failed to create research project")
             
-        # Remove MongoDB ObjectId for response
-        project_dict.pop("_id", None)
+            # Remove MongoDB ObjectId for response
+            project_dict.pop("_id", None)
+            response_cache.invalidate("research_projects")
+            search_index.upsert("research_projects", project_dict)
         
-        return SuccessResponse(
-            data={"research_project": project_dict},
-            message="Research project created successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create research project: {str(e)}")
+            return SuccessResponse(
+                data={"research_project": project_dict},
+                message="Research project created successfully"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create research project: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "research.create", project, execute)
+
+@router.post("/bulk", response_model=SuccessResponse)
+async def bulk_write_research_projects(bulk_request: BulkWriteRequest, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    """Insert, update and delete research projects in one bulk write (admin only)"""
+    async def execute():
+        try:
+            outcome = await run_bulk_write(research_projects_collection, bulk_request.operations, ResearchProjectCreate, ResearchProjectUpdate)
+            if outcome.changed:
+                response_cache.invalidate("research_projects")
+                for doc_id in outcome.deleted_ids:
+                    search_index.remove("research_projects", doc_id)
+                for document in outcome.inserted + await fetch_documents(research_projects_collection, outcome.updated_ids):
+                    search_index.upsert("research_projects", document)
+            
+            return SuccessResponse(
+                data={"results": outcome.results, **outcome.counts},
+                message="Bulk write completed"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to bulk write research projects: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "research.bulk", bulk_request, execute)
 
 @router.put("/{project_id}", response_model=SuccessResponse)
 async def update_research_project(project_id: str, project_update: ResearchProjectUpdate):
@@ -56,17 +100,17 @@ async def update_research_project(project_id: str, project_update: ResearchProje
         update_dict = {k: v for k, v in project_update.dict().items() if v is not None}
         update_dict["updated_at"] = datetime.utcnow()
         
-        result = await research_projects_collection.update_one(
+        updated_project = await research_projects_collection.find_one_and_update(
             {"id": project_id},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_project is None:
             raise HTTPException(status_code=404, detail="Research project not found")
-            
-        updated_project = await research_projects_collection.find_one({"id": project_id})
-        if "_id" in updated_project:
-            del updated_project["_id"]
+        response_cache.invalidate("research_projects")
+        search_index.upsert("research_projects", updated_project)
             
         return SuccessResponse(
             data={"research_project": updated_project},
@@ -85,6 +129,8 @@ async def delete_research_project(project_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Research project not found")
+        response_cache.invalidate("research_projects")
+        search_index.remove("research_projects", project_id)
             
         return SuccessResponse(
             data={"deleted_id": project_id},
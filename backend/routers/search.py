@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from models import SuccessResponse
+from search import search_index, SEARCH_COLLECTIONS
+import time
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/", response_model=SuccessResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, description="Comma-separated collections: projects, research_projects, services"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search projects, research projects and services"""
+    try:
+        collections = None
+        if type:
+            collections = [name.strip() for name in type.split(",") if name.strip()]
+            unknown = sorted(set(collections) - set(SEARCH_COLLECTIONS))
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(unknown)}")
+                
+        started = time.perf_counter()
+        results = search_index.search(q, limit=limit, collections=collections)
+        took_ms = (time.perf_counter() - started) * 1000
+        
+        return SuccessResponse(
+            data={"query": q, "results": results, "total": len(results), "took_ms": round(took_ms, 3)},
+            message="Search completed successfully"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search: {str(e)}")
@@ -1,53 +1,97 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import ServiceItem, ServiceItemCreate, ServiceItemUpdate, SuccessResponse
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from typing import List, Optional
+from models import ServiceItem, ServiceItemCreate, ServiceItemUpdate, SuccessResponse, BulkWriteRequest
 from database import services_collection
+from pymongo import ReturnDocument
+from cache import response_cache
+from search import search_index
+from pagination import fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from fields import resolve_fields
+from snapshots import serve_snapshot
+from bulk import run_bulk_write, fetch_documents
 from bson import ObjectId
+from idempotency import run_idempotent
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/services", tags=["services"])
 
 @router.get("/", response_model=SuccessResponse)
-async def get_services():
-    """Get all services"""
+async def get_services(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, 'summary' (default) or 'all'")
+):
+    """Get services newest first with cursor pagination"""
     try:
-        services = await services_collection.find().sort("created_at", -1).to_list(1000)
+        field_set, projection = resolve_fields("services", fields)
         
-        # Remove MongoDB ObjectIds
-        for service in services:
-            if "_id" in service:
-                del service["_id"]
-                
-        return SuccessResponse(
-            data={"services": services, "total": len(services)},
-            message="Services retrieved successfully"
-        )
+        async def load_services():
+            services, next_cursor = await fetch_page(
+                services_collection, {}, "created_at", limit, cursor, projection
+            )
+            return SuccessResponse(
+                data={"services": services, "total": len(services), "next_cursor": next_cursor},
+                message="Services retrieved successfully"
+            )
+            
+        cache_params = {"limit": limit, "cursor": cursor, "fields": field_set}
+        return await serve_snapshot(request, "services", cache_params, load_services)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve services: {str(e)}")
 
 @router.post("/", response_model=SuccessResponse)
-async def create_service(service: ServiceItemCreate):
+async def create_service(service: ServiceItemCreate, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Create new service (admin only)"""
-    try:
-        service_dict = service.dict()
-        service_dict["id"] = str(uuid.uuid4())
-        service_dict["created_at"] = datetime.utcnow()
-        service_dict["updated_at"] = datetime.utcnow()
+    async def execute():
+        try:
+            service_dict = service.dict()
+            service_dict["id"] = str(uuid.uuid4())
+            service_dict["created_at"] = datetime.utcnow()
+            service_dict["updated_at"] = datetime.utcnow()
         
-        result = await services_collection.insert_one(service_dict)
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to create service")
+            result = await services_collection.insert_one(service_dict)
+            if not result.inserted_id:
+                raise HTTPException(status_code=500, detail="Failed to create service")
             
-        # Remove MongoDB ObjectId for response
-        service_dict.pop("_id", None)
+            # Remove MongoDB ObjectId for response
+            service_dict.pop("_id", None)
+            response_cache.invalidate("services")
+            search_index.upsert("services", service_dict)
         
-        return SuccessResponse(
-            data={"service": service_dict},
-            message="Service created successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create service: {str(e)}")
+            return SuccessResponse(
+                data={"service": service_dict},
+                message="Service created successfully"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create service: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "services.create", service, execute)
+
+@router.post("/bulk", response_model=SuccessResponse)
+async def bulk_write_services(bulk_request: BulkWriteRequest, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    """Insert, update and delete services in one bulk write (admin only)"""
+    async def execute():
+        try:
+            outcome = await run_bulk_write(services_collection, bulk_request.operations, ServiceItemCreate, ServiceItemUpdate)
+            if outcome.changed:
+                response_cache.invalidate("services")
+                for doc_id in outcome.deleted_ids:
+                    search_index.remove("services", doc_id)
+                for document in outcome.inserted + await fetch_documents(services_collection, outcome.updated_ids):
+                    search_index.upsert("services", document)
+            
+            return SuccessResponse(
+                data={"results": outcome.results, **outcome.counts},
+                message="Bulk write completed"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to bulk write services: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "services.bulk", bulk_request, execute)
 
 @router.put("/{service_id}", response_model=SuccessResponse)
 async def update_service(service_id: str, service_update: ServiceItemUpdate):
@@ -56,17 +100,17 @@ async def update_service(service_id: str, service_update: ServiceItemUpdate):
         update_dict = {k: v for k, v in service_update.dict().items() if v is not None}
         update_dict["updated_at"] = datetime.utcnow()
         
-        result = await services_collection.update_one(
+        updated_service = await services_collection.find_one_and_update(
             {"id": service_id},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_service is None:
             raise HTTPException(status_code=404, detail="Service not found")
-            
-        updated_service = await services_collection.find_one({"id": service_id})
-        if "_id" in updated_service:
-            del updated_service["_id"]
+        response_cache.invalidate("services")
+        search_index.upsert("services", updated_service)
             
         return SuccessResponse(
             data={"service": updated_service},
@@ -85,6 +129,8 @@ async def delete_service(service_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Service not found")
+        response_cache.invalidate("services")
+        search_index.remove("services", service_id)
             
         return SuccessResponse(
             data={"deleted_id": service_id},
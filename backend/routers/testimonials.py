@@ -1,57 +1,98 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import Testimonial, TestimonialCreate, TestimonialUpdate, SuccessResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from typing import List, Optional
+from models import Testimonial, TestimonialCreate, TestimonialUpdate, SuccessResponse, BulkWriteRequest
 from database import testimonials_collection
+from pymongo import ReturnDocument
+from cache import response_cache
+from pagination import fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from snapshots import serve_snapshot
+from bulk import run_bulk_write
 from bson import ObjectId
+from idempotency import replay_exempt, run_idempotent
+from rate_limit import rate_limit
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/testimonials", tags=["testimonials"])
 
 @router.get("/", response_model=SuccessResponse)
-async def get_testimonials(approved_only: bool = True):
-    """Get testimonials (approved only by default)"""
+async def get_testimonials(
+    request: Request,
+    approved_only: bool = True,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    """Get testimonials newest first (approved only by default) with cursor pagination"""
     try:
         filter_query = {}
         if approved_only:
             filter_query["approved"] = True
             
-        testimonials = await testimonials_collection.find(filter_query).sort("created_at", -1).to_list(1000)
-        
-        # Remove MongoDB ObjectIds
-        for testimonial in testimonials:
-            if "_id" in testimonial:
-                del testimonial["_id"]
-                
-        return SuccessResponse(
-            data={"testimonials": testimonials, "total": len(testimonials)},
-            message="Testimonials retrieved successfully"
-        )
+        async def load_testimonials():
+            testimonials, next_cursor = await fetch_page(
+                testimonials_collection, filter_query, "created_at", limit, cursor
+            )
+            return SuccessResponse(
+                data={"testimonials": testimonials, "total": len(testimonials), "next_cursor": next_cursor},
+                message="Testimonials retrieved successfully"
+            )
+            
+        cache_params = {"approved_only": approved_only, "limit": limit, "cursor": cursor}
+        return await serve_snapshot(request, "testimonials", cache_params, load_testimonials)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve testimonials: {str(e)}")
 
-@router.post("/", response_model=SuccessResponse)
-async def create_testimonial(testimonial: TestimonialCreate):
+@router.post("/", response_model=SuccessResponse, dependencies=[Depends(rate_limit("testimonials", exempt=replay_exempt("testimonials.create")))])
+async def create_testimonial(testimonial: TestimonialCreate, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Submit new testimonial (requires admin approval)"""
-    try:
-        testimonial_dict = testimonial.dict()
-        testimonial_dict["id"] = str(uuid.uuid4())
-        testimonial_dict["approved"] = False  # Requires admin approval
-        testimonial_dict["created_at"] = datetime.utcnow()
+    async def execute():
+        try:
+            testimonial_dict = testimonial.dict()
+            testimonial_dict["id"] = str(uuid.uuid4())
+            testimonial_dict["approved"] = False  # Requires admin approval
+            testimonial_dict["created_at"] = datetime.utcnow()
         
-        result = await testimonials_collection.insert_one(testimonial_dict)
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to submit testimonial")
+            result = await testimonials_collection.insert_one(testimonial_dict)
+            if not result.inserted_id:
+                raise HTTPException(status_code=500, detail="Failed to submit testimonial")
             
-        # Remove MongoDB ObjectId for response
-        testimonial_dict.pop("_id", None)
+            # Remove MongoDB ObjectId for response
+            testimonial_dict.pop("_id", None)
+            response_cache.invalidate("testimonials")
         
-        return SuccessResponse(
-            data={"testimonial": testimonial_dict},
-            message="Testimonial submitted successfully and is pending approval"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit testimonial: {str(e)}")
+            return SuccessResponse(
+                data={"testimonial": testimonial_dict},
+                message="Testimonial submitted successfully and is pending approval"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to submit testimonial: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "testimonials.create", testimonial, execute)
+
+@router.post("/bulk", response_model=SuccessResponse)
+async def bulk_write_testimonials(bulk_request: BulkWriteRequest, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    """Insert, update and delete testimonials in one bulk write (admin only)"""
+    async def execute():
+        try:
+            outcome = await run_bulk_write(
+                testimonials_collection, bulk_request.operations, TestimonialCreate, TestimonialUpdate,
+                insert_defaults={"approved": False},
+                timestamp_fields=("created_at",),
+                update_timestamp=None
+            )
+            if outcome.changed:
+                response_cache.invalidate("testimonials")
+            
+            return SuccessResponse(
+                data={"results": outcome.results, **outcome.counts},
+                message="Bulk write completed"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to bulk write testimonials: {str(e)}")
+        
+    return await run_idempotent(idempotency_key, "testimonials.bulk", bulk_request, execute)
 
 @router.put("/{testimonial_id}", response_model=SuccessResponse)
 async def update_testimonial(testimonial_id: str, testimonial_update: TestimonialUpdate):
@@ -59,17 +100,16 @@ async def update_testimonial(testimonial_id: str, testimonial_update: Testimonia
     try:
         update_dict = {k: v for k, v in testimonial_update.dict().items() if v is not None}
         
-        result = await testimonials_collection.update_one(
+        updated_testimonial = await testimonials_collection.find_one_and_update(
             {"id": testimonial_id},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_testimonial is None:
             raise HTTPException(status_code=404, detail="Testimonial not found")
-            
-        updated_testimonial = await testimonials_collection.find_one({"id": testimonial_id})
-        if "_id" in updated_testimonial:
-            del updated_testimonial["_id"]
+        response_cache.invalidate("testimonials")
             
         return SuccessResponse(
             data={"testimonial": updated_testimonial},
@@ -88,6 +128,7 @@ async def delete_testimonial(testimonial_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Testimonial not found")
+        response_cache.invalidate("testimonials")
             
         return SuccessResponse(
             data={"deleted_id": testimonial_id},
@@ -109,6 +150,7 @@ async def approve_testimonial(testimonial_id: str):
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Testimonial not found")
+        response_cache.invalidate("testimonials")
             
         return SuccessResponse(
             data={"testimonial_id": testimonial_id},
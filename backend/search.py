@@ -0,0 +1,179 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from database import projects_collection, research_projects_collection, services_collection
+import asyncio
+import bisect
+import math
+import re
+
+# Indexed fields and how many times their terms count towards term frequency
+FIELD_BOOSTS = {
+    "title": 3,
+    "tools": 2,
+    "company": 1,
+    "description": 1,
+    "impact": 1,
+    "publications": 1,
+}
+
+# Fields copied into search hits so clients can render results without another request
+RESULT_FIELDS = ("title", "category", "company", "organization", "status", "image")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Cap on how many index terms a single prefix may expand to
+MAX_PREFIX_EXPANSIONS = 50
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into alphanumeric terms, dropping stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value) if value is not None else ""
+
+
+class SearchIndex:
+    """In-process inverted index with prefix matching and BM25 ranking.
+
+    Documents are identified by (collection, id). The index is rebuilt at startup
+    and kept current by the write handlers through upsert() and remove().
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Tuple[str, str], int]] = {}
+        self._lengths: Dict[Tuple[str, str], int] = {}
+        self._terms_by_doc: Dict[Tuple[str, str], Counter] = {}
+        self._results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._total_length = 0
+        self._sorted_terms: List[str] = []
+        self._terms_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def clear(self):
+        """Remove every document from the index"""
+        self.__init__()
+
+    def rebuild(self, documents: Dict[str, List[Dict[str, Any]]]):
+        """Replace the whole index with {collection: documents}.
+
+        Runs without awaiting, so concurrent searches see the old or the new
+        index but never a partial one.
+        """
+        self.clear()
+        for collection, collection_documents in documents.items():
+            for document in collection_documents:
+                self.upsert(collection, document)
+
+    def upsert(self, collection: str, document: Dict[str, Any]):
+        """Index a document, replacing any previous version with the same id"""
+        key = (collection, document["id"])
+        self.remove(collection, document["id"])
+
+        terms = Counter()
+        for field, boost in FIELD_BOOSTS.items():
+            for token in tokenize(_field_text(document.get(field))):
+                terms[token] += boost
+
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms_dirty = True
+            postings[key] = frequency
+
+        length = sum(terms.values())
+        self._lengths[key] = length
+        self._terms_by_doc[key] = terms
+        self._total_length += length
+        self._results[key] = {field: document[field] for field in RESULT_FIELDS if field in document}
+
+    def remove(self, collection: str, doc_id: str):
+        """Drop a document from the index if present"""
+        key = (collection, doc_id)
+        terms = self._terms_by_doc.pop(key, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+
+        self._total_length -= self._lengths.pop(key)
+        del self._results[key]
+
+    def _expand(self, token: str) -> Iterable[Tuple[str, float]]:
+        """Yield index terms matching a query token, exact matches weighted above prefix matches"""
+        if self._terms_dirty:
+            self._sorted_terms = sorted(self._postings)
+            self._terms_dirty = False
+
+        start = bisect.bisect_left(self._sorted_terms, token)
+        for term in self._sorted_terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            yield term, 1.0 if term == token else 0.5
+
+    def search(self, query: str, limit: int = 20, collections: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return the best matching documents for a query, highest BM25 score first"""
+        tokens = tokenize(query)
+        if not tokens or not self._lengths:
+            return []
+
+        allowed = set(collections) if collections else None
+        doc_count = len(self._lengths)
+        average_length = self._total_length / doc_count
+        scores: Dict[Tuple[str, str], float] = {}
+
+        for token in tokens:
+            for term, weight in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, frequency in postings.items():
+                    if allowed is not None and key[0] not in allowed:
+                        continue
+                    norm = K1 * (1 - B + B * self._lengths[key] / average_length)
+                    score = weight * idf * frequency * (K1 + 1) / (frequency + norm)
+                    scores[key] = scores.get(key, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"collection": key[0], "id": key[1], "score": round(score, 4), **self._results[key]}
+            for key, score in ranked
+        ]
+
+
+# Shared index over projects, research projects and services
+search_index = SearchIndex()
+
+# Collections covered by the search index
+SEARCH_COLLECTIONS = {
+    "projects": projects_collection,
+    "research_projects": research_projects_collection,
+    "services": services_collection,
+}
+
+
+async def build_search_index():
+    """Load every searchable collection from Mongo, then swap it into the shared index"""
+    loaded = await asyncio.gather(*(
+        collection.find({}, {"_id": 0}).to_list(None) for collection in SEARCH_COLLECTIONS.values()
+    ))
+    search_index.rebuild(dict(zip(SEARCH_COLLECTIONS, loaded)))
+    print(f"🔎 Search index built with {len(search_index)} documents")
@@ -10,8 +10,10 @@ from database import (
     research_projects_collection, 
     services_collection, 
     testimonials_collection,
+    cache_versions_collection,
     init_database
 )
+from coherence import bump_versions
 
 # Sample projects data (subset for testing)
 sample_projects = [
@@ -268,9 +270,12 @@ async def seed_database():
         # await services_collection.delete_many({})
         # await testimonials_collection.delete_many({})
         
+        seeded = []
+
         # Insert sample projects
         if await projects_collection.count_documents({}) == 0:
             await projects_collection.insert_many(sample_projects)
+            seeded.append("projects")
             print(f"✅ Inserted {len(sample_projects)} projects")
         else:
             print("🔄 Projects already exist, skipping...")
@@ -278,6 +283,7 @@ async def seed_database():
         # Insert research projects
         if await research_projects_collection.count_documents({}) == 0:
             await research_projects_collection.insert_many(research_data)
+            seeded.append("research_projects")
             print(f"✅ Inserted {len(research_data)} research projects")
         else:
             print("🔄 Research projects already exist, skipping...")
@@ -285,6 +291,7 @@ async def seed_database():
         # Insert services
         if await services_collection.count_documents({}) == 0:
             await services_collection.insert_many(services_data)
+            seeded.append("services")
             print(f"✅ Inserted {len(services_data)} services")
         else:
             print("🔄 Services already exist, skipping...")
@@ -292,10 +299,13 @@ async def seed_database():
         # Insert testimonials
         if await testimonials_collection.count_documents({}) == 0:
             await testimonials_collection.insert_many(testimonials_data)
+            seeded.append("testimonials")
             print(f"✅ Inserted {len(testimonials_data)} testimonials")
         else:
             print("🔄 Testimonials already exist, skipping...")
             
+        # Running servers reload what was seeded within a poll interval
+        await bump_versions(cache_versions_collection, seeded)
         print("🎉 Database seeding completed successfully!")
         
     except Exception as e:
@@ -1,30 +1,147 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+import time
+# Measured for the startup report
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
+import asyncio
+import functools
 import logging
+import signal
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
 # Import database and models
-from database import init_database, close_database
+from database import init_database, close_database, connect_database, get_client, DEFER_OPTIONAL_INDEXES, cache_versions_collection
 from models import SuccessResponse
+from cache import response_cache
+from search import build_search_index, search_index
+from related import build_related_projects, related_projects
+from health import HealthMonitor
+from coherence import CACHE_COHERENCE, CacheCoherence
+from read_model import READ_MODEL_ENABLED, read_model
+from write_behind import CONTACT_WRITE_BEHIND
+from notifications import NOTIFICATIONS_ENABLED
+from metrics import metrics, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from command_monitor import ServerTimingMiddleware
+from profiling import PROFILING_ENABLED, ProfilingMiddleware
+from rate_limit import limiters, rate_limit
 
 # Import routers
-from routers import projects, contact, about, research, services, testimonials
+from routers import projects, contact, about, research, services, testimonials, bundle, search, analytics, profiles
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
+async def ping_database():
+    await get_client().admin.command("ping")
+
+# Probes read this instead of pinging Mongo themselves. The page-view ring buffer
+# is left out: it overwrites old events when full, so it is only reported as metrics
+health = HealthMonitor(ping_database)
+health.add_queue("contact_write_behind", lambda: contact.contact_write_queue.stats())
+
+# Propagates cache invalidations between worker processes
+coherence = CacheCoherence(response_cache, cache_versions_collection)
+for collection_name in ("projects", "research_projects", "services"):
+    coherence.on_change(collection_name, build_search_index)
+coherence.on_change("projects", build_related_projects)
+if READ_MODEL_ENABLED:
+    for collection_name in read_model.collections:
+        coherence.on_change(collection_name, functools.partial(read_model.reload_collection, collection_name))
+
+async def reload_read_model():
+    """Swap in fresh snapshots and rebuild the in-memory indexes loaded from the same collections.
+
+    The other workers are told through the shared versions and reload the same way.
+    """
+    await asyncio.gather(read_model.reload(), build_search_index(), build_related_projects())
+    await coherence.announce(read_model.collections)
+
+# Reloads started by SIGHUP, kept referenced until they finish
+signal_reloads = set()
+
+def reload_on_signal():
+    async def run():
+        try:
+            await reload_read_model()
+        except Exception as e:
+            logger.error(f"Read model reload on SIGHUP failed: {e}")
+    task = asyncio.create_task(run())
+    signal_reloads.add(task)
+    task.add_done_callback(signal_reloads.discard)
+
+def watch_sighup(enabled):
+    """Reload the read model on SIGHUP.
+
+    kill -HUP <worker pid> reloads that worker, which then has the others reload
+    too; HUP to the gunicorn master restarts every worker. Signals can only
+    be handled on the main thread of a Unix process, so elsewhere (e.g. under a
+    test client) only the admin endpoint is available.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        if enabled:
+            loop.add_signal_handler(signal.SIGHUP, reload_on_signal)
+        else:
+            loop.remove_signal_handler(signal.SIGHUP)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        pass
+
+# Milliseconds spent in each startup phase
+startup_timings = {}
+
+async def timed(phase, awaitable):
+    """Await a startup step and record how long it took"""
+    started = time.perf_counter()
+    result = await awaitable
+    startup_timings[phase] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
 # Lifespan events for database initialization
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_database()
+    startup_timings["import"] = round(IMPORT_SECONDS * 1000, 1)
+    started = time.perf_counter()
+    await timed("connect", connect_database())
+    await health.start()
+    if CACHE_COHERENCE:
+        await coherence.start()
+    await timed("indexes", init_database(defer_optional_indexes=DEFER_OPTIONAL_INDEXES))
+    warm = [build_search_index(), build_related_projects()]
+    if READ_MODEL_ENABLED:
+        warm.append(read_model.start())
+    await timed("warm", asyncio.gather(*warm))
+    if READ_MODEL_ENABLED:
+        watch_sighup(True)
+    if CONTACT_WRITE_BEHIND:
+        contact.contact_write_queue.start()
+    if NOTIFICATIONS_ENABLED:
+        contact.notification_workers.start()
+    analytics.page_view_buffer.start()
+    startup_timings["startup"] = round((time.perf_counter() - started) * 1000, 1)
+    print("⏱️ Startup timings (ms): " + ", ".join(f"{phase} {ms:g}" for phase, ms in startup_timings.items())
+          + (" (optional indexes deferred)" if DEFER_OPTIONAL_INDEXES else ""))
+    health.mark_ready()
     print("🚀 Backend server started successfully")
     yield
     # Shutdown
+    await health.stop()
+    await contact.contact_write_queue.stop()
+    await contact.notification_workers.stop()
+    await analytics.page_view_buffer.stop()
+    if READ_MODEL_ENABLED:
+        watch_sighup(False)
+    await read_model.stop()
+    await coherence.stop()
     await close_database()
     print("👋 Backend server shutdown complete")
 
@@ -48,6 +165,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profile requests on demand; not installed at all unless PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Report per-request Mongo time to the browser
+app.add_middleware(ServerTimingMiddleware)
+
+# Time every request; added last so it wraps the other middleware
+app.add_middleware(MetricsMiddleware)
+
+def collect_app_metrics():
+    """Cache, queue and rate-limit figures exposed alongside the request metrics"""
+    cache = response_cache.stats()
+    yield "cache_entries", "gauge", "Entries in the response cache", [({}, cache["entries"])]
+    yield "cache_hits_total", "counter", "Response cache hits", [({}, cache["hits"])]
+    yield "cache_misses_total", "counter", "Response cache misses", [({}, cache["misses"])]
+    yield "cache_hit_ratio", "gauge", "Response cache hit ratio since start", [({}, cache["hit_ratio"])]
+    yield "cache_stale_served_total", "counter", "Expired cache entries served while being refreshed", [
+        ({}, cache["stale_served"])
+    ]
+    yield "cache_coalesced_total", "counter", "Cache misses that joined a load already in flight", [({}, cache["coalesced"])]
+    yield "cache_refresh_failures_total", "counter", "Failed background cache refreshes", [({}, cache["refresh_failures"])]
+    yield "cache_evictions_total", "counter", "Response cache LRU evictions", [({}, cache["evictions"])]
+    yield "cache_invalidations_total", "counter", "Response cache invalidations", [({}, cache["invalidations"])]
+    yield "mongo_pool_max_size", "gauge", "Configured Mongo connection pool size", [
+        ({}, get_client().options.pool_options.max_pool_size)
+    ]
+    queues = {
+        "contact_write_behind": contact.contact_write_queue.depth,
+        "page_views": analytics.page_view_buffer.depth,
+    }
+    yield "queue_depth", "gauge", "Items waiting in background write queues", [
+        ({"queue": name}, depth) for name, depth in queues.items()
+    ]
+    yield "page_views_dropped_total", "counter", "Page views overwritten in a full buffer", [
+        ({}, analytics.page_view_buffer.dropped)
+    ]
+    read_model_stats = read_model.stats()
+    yield "read_model_documents", "gauge", "Documents held in in-memory snapshots", [
+        ({"collection": name}, collection["documents"]) for name, collection in read_model_stats["collections"].items()
+    ]
+    yield "read_model_reloads_total", "counter", "Read model snapshot swaps", [({}, read_model_stats["reloads"])]
+    yield "rate_limit_rejected_total", "counter", "Requests rejected by the rate limiter", [
+        ({"route": route}, limiter.rejected) for route, limiter in limiters.items()
+    ]
+
+metrics.register_collector(collect_app_metrics)
+
 # Basic health check endpoint
 @api_router.get("/", response_model=SuccessResponse)
 async def root():
@@ -63,6 +228,51 @@ async def health_check():
         message="Service is healthy"
     )
 
+@api_router.get("/health/live", response_model=SuccessResponse)
+async def liveness_check():
+    """Process is up and serving; never depends on Mongo"""
+    return SuccessResponse(data=health.liveness(), message="Service is alive")
+
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Ready to take traffic, from the last background Mongo ping and in-memory state"""
+    readiness = health.readiness()
+    readiness["checks"]["warm"] = {
+        "search_documents": len(search_index),
+        "related_projects": len(related_projects),
+        "cache_entries": response_cache.stats()["entries"],
+        "read_model_documents": read_model.stats()["documents"],
+    }
+    readiness["startup_ms"] = startup_timings
+    if not readiness["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content=jsonable_encoder({"success": False, "error": "Service is not ready", "code": "NOT_READY", "data": readiness})
+        )
+    return SuccessResponse(data=readiness, message="Service is ready")
+
+@api_router.get("/cache/stats", response_model=SuccessResponse)
+async def cache_stats():
+    return SuccessResponse(
+        data={"cache": response_cache.stats(), "coherence": coherence.stats(), "read_model": read_model.stats()},
+        message="Cache statistics retrieved successfully"
+    )
+
+@api_router.post("/admin/read-model/reload", response_model=SuccessResponse, dependencies=[Depends(rate_limit("read_model_reload"))])
+async def reload_read_model_endpoint():
+    """Reload the in-memory snapshots from Mongo, e.g. after editing documents directly (admin only - auth to be added)"""
+    if not read_model.active:
+        raise HTTPException(status_code=400, detail="Read model is not enabled")
+    try:
+        await reload_read_model()
+        return SuccessResponse(data=read_model.stats(), message="Read model reloaded successfully")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reload read model: {str(e)}")
+
+@api_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Include all routers
 api_router.include_router(projects.router)
 api_router.include_router(contact.router)
@@ -70,6 +280,10 @@ api_router.include_router(about.router)
 api_router.include_router(research.router)
 api_router.include_router(services.router)
 api_router.include_router(testimonials.router)
+api_router.include_router(bundle.router)
+api_router.include_router(search.router)
+api_router.include_router(analytics.router)
+api_router.include_router(profiles.router)
 
 # Include the API router in the main app
 app.include_router(api_router)
@@ -90,6 +304,15 @@ async def not_found_handler(request, exc):
         content={"success": False, "error": "Endpoint not found", "code": "NOT_FOUND"}
     )
 
+@app.exception_handler(429)
+async def rate_limited_handler(request, exc):
+    from fastapi.responses import JSONResponse
+    return JSONResponse(
+        status_code=429,
+        content={"success": False, "error": exc.detail, "code": "RATE_LIMITED"},
+        headers=exc.headers
+    )
+
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     from fastapi.responses import JSONResponse
@@ -0,0 +1,138 @@
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from models import SuccessResponse
+from cache import response_cache
+from conditional import content_etag, etag_matches
+import asyncio
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+# Moderate levels: gzip 9 / brotli 11 cost several times more CPU for a few percent smaller bodies
+GZIP_LEVEL = int(os.environ.get('SNAPSHOT_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('SNAPSHOT_BROTLI_QUALITY', '5'))
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL)}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+class EncodedResponse:
+    """Final response bytes for a payload, encoded at most once per content coding.
+
+    Each compressed body is built the first time a client asks for that coding,
+    in a worker thread so the event loop keeps serving other requests meanwhile.
+    """
+
+    def __init__(self, body: bytes):
+        self.etag = content_etag(body)
+        self.bodies = {"identity": body}
+        self.codings: List[str] = list(COMPRESSORS) if len(body) >= MIN_COMPRESS_BYTES else []
+        self._encoding: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def build(cls, payload: SuccessResponse) -> "EncodedResponse":
+        """Serialize a SuccessResponse exactly as FastAPI's JSONResponse would"""
+        body = json.dumps(
+            jsonable_encoder(payload),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return cls(body)
+
+    def choose_encoding(self, accept_encoding: Optional[str]) -> str:
+        """Pick the best available coding the client accepts"""
+        accepted = _accepted_encodings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.codings and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                return coding
+        return "identity"
+
+    async def body(self, coding: str) -> bytes:
+        """The body in a coding, compressing it on first use; concurrent callers share the work"""
+        body = self.bodies.get(coding)
+        if body is not None:
+            return body
+        future = self._encoding.get(coding)
+        if future is None:
+            future = self._encoding[coding] = asyncio.ensure_future(
+                asyncio.to_thread(COMPRESSORS[coding], self.bodies["identity"])
+            )
+        try:
+            # Shielded so a disconnecting client cannot cancel it for the others
+            body = await asyncio.shield(future)
+        except Exception:
+            self._encoding.pop(coding, None)
+            raise
+        self.bodies[coding] = body
+        return body
+
+    def etag_for(self, coding: str) -> str:
+        """Strong ETag of one representation; each content coding has different bytes"""
+        if coding == "identity":
+            return self.etag
+        return f'{self.etag[:-1]}-{coding}"'
+
+    async def respond(self, request: Request, compress: bool = True) -> Response:
+        """Serve the stored bytes matching the request's Accept-Encoding, or a 304
+        when the client's If-None-Match already names that representation.
+
+        compress=False always serves the identity body, for responses that are
+        not cached and would otherwise be compressed on every request.
+        """
+        coding = self.choose_encoding(request.headers.get("accept-encoding")) if compress else "identity"
+        etag = self.etag_for(coding)
+        headers = {"Vary": "Accept-Encoding", "ETag": etag}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=await self.body(coding), media_type="application/json", headers=headers)
+
+async def serve_snapshot(
+    request: Request,
+    collection: str,
+    params: Optional[Dict[str, Any]],
+    loader: Callable[[], Awaitable[SuccessResponse]],
+    ttl: Optional[float] = None,
+) -> Response:
+    """Serve a cached, pre-encoded response for a read endpoint.
+
+    The snapshot is taken from the response cache, so the loader only runs (and the
+    payload is only serialized and compressed) once per cache entry. Its ETag is a hash
+    of the body, so a matching If-None-Match gets a 304 on any worker, and a reload that
+    finds changed content, e.g. after a direct database edit, yields a new tag.
+    """
+    async def build_snapshot():
+        return EncodedResponse.build(await loader())
+
+    snapshot = await response_cache.get_or_load(collection, params, build_snapshot, ttl=ttl)
+    return await snapshot.respond(request)
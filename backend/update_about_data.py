@@ -3,7 +3,8 @@ Update script to correct the about information and experience data
 """
 import asyncio
 from datetime import datetime
-from database import about_info_collection, init_database
+from database import about_info_collection, cache_versions_collection, init_database
+from coherence import bump_versions
 
 async def update_about_info():
     """Update about information with correct experience data"""
@@ -71,6 +72,8 @@ async def update_about_info():
         )
         
         if result.modified_count > 0 or result.upserted_id:
+            # Running servers drop their cached copy within a poll interval
+            await bump_versions(cache_versions_collection, ["about_info"])
             print("✅ About information updated successfully!")
         else:
             print("⚠️ No changes made to about information")
@@ -0,0 +1,139 @@
+from bson import Binary
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from database import page_view_rollups_collection
+from hyperloglog import HyperLogLog, hash64
+from rollups import SITE_PAGE, bucket_start
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Sketches are kept on hour and day rollups; minute ranges are answered from hours
+SKETCH_GRANULARITIES = ("hour", "day")
+# Recently written sketches kept in memory to skip the read before merging (4 KiB each)
+SKETCH_CACHE_SIZE = int(os.environ.get('VISITOR_SKETCH_CACHE_SIZE', '1024'))
+SKETCH_MAX_RETRIES = 5
+
+
+def visitor_id(event: Dict[str, Any]) -> str:
+    """Identify a visitor by address and user agent"""
+    return f"{event.get('ip_address') or ''}|{event.get('user_agent') or ''}"
+
+
+class VisitorSketches:
+    """Unique-visitor HyperLogLog sketches stored on the page-view rollup documents.
+
+    Each flush builds one sketch per (page, granularity, bucket), plus one for the
+    site-wide SITE_PAGE document, in memory and merges
+    it into the stored sketch. Writes use the visitors_rev counter for optimistic
+    concurrency, so several workers can merge into the same bucket safely. The last
+    written sketches are kept in a bounded LRU so steady traffic needs no reads.
+    """
+
+    def __init__(self, collection, cache_size: int = SKETCH_CACHE_SIZE):
+        self.collection = collection
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Tuple[int, HyperLogLog]]" = OrderedDict()
+        self.merges = 0
+        self.skipped = 0
+        self.conflicts = 0
+
+    def _remember(self, key: Tuple, revision: int, sketch: HyperLogLog):
+        self._cache[key] = (revision, sketch)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: Tuple) -> Tuple[int, HyperLogLog]:
+        page, granularity, bucket = key
+        document = await self.collection.find_one(
+            {"page": page, "granularity": granularity, "bucket": bucket},
+            {"_id": 0, "visitors": 1, "visitors_rev": 1}
+        )
+        if document and document.get("visitors"):
+            return document.get("visitors_rev", 0), HyperLogLog.from_bytes(document["visitors"])
+        return 0, HyperLogLog()
+
+    async def _merge_into(self, key: Tuple, delta: HyperLogLog):
+        page, granularity, bucket = key
+        for _ in range(SKETCH_MAX_RETRIES):
+            cached = self._cache.get(key)
+            revision, stored = cached if cached is not None else await self._load(key)
+            merged = stored.copy().merge(delta)
+            if merged == stored:
+                # Every visitor in the batch was already counted
+                self.skipped += 1
+                self._remember(key, revision, stored)
+                return
+
+            result = await self.collection.update_one(
+                {
+                    "page": page, "granularity": granularity, "bucket": bucket,
+                    "visitors_rev": revision if revision else {"$exists": False},
+                },
+                {"$set": {"visitors": Binary(merged.to_bytes()), "visitors_rev": revision + 1}}
+            )
+            if result.matched_count:
+                self.merges += 1
+                self._remember(key, revision + 1, merged)
+                return
+
+            # Another writer got there first; reload and merge again
+            self.conflicts += 1
+            self._cache.pop(key, None)
+        logger.error(f"Gave up merging visitor sketch for {key} after {SKETCH_MAX_RETRIES} conflicts")
+
+    async def record(self, events: List[Dict[str, Any]]):
+        """Merge the visitors of a page-view batch into the stored sketches"""
+        deltas: Dict[Tuple, HyperLogLog] = {}
+        for event in events:
+            hashed = hash64(visitor_id(event))
+            for page in (event["page"], SITE_PAGE):
+                for granularity in SKETCH_GRANULARITIES:
+                    key = (page, granularity, bucket_start(event["timestamp"], granularity))
+                    sketch = deltas.get(key)
+                    if sketch is None:
+                        sketch = deltas[key] = HyperLogLog()
+                    sketch.add_hash(hashed)
+        await asyncio.gather(*(self._merge_into(key, delta) for key, delta in deltas.items()))
+
+    async def unique_visitors(
+        self, page: Optional[str], start: datetime, end: datetime, granularity: str
+    ) -> Tuple[Dict[datetime, int], int]:
+        """Estimate unique visitors per bucket and over the whole range by merging sketches.
+
+        Minute ranges have no sketches of their own; they get only the range total,
+        computed from the hour sketches that cover it.
+        """
+        source = granularity if granularity in SKETCH_GRANULARITIES else "hour"
+        match = {
+            "page": page or SITE_PAGE,
+            "granularity": source,
+            "bucket": {"$gte": bucket_start(start, source), "$lte": end},
+            "visitors": {"$exists": True},
+        }
+
+        per_bucket: Dict[datetime, HyperLogLog] = {}
+        total = HyperLogLog()
+        async for document in self.collection.find(match, {"_id": 0, "bucket": 1, "visitors": 1}):
+            sketch = HyperLogLog.from_bytes(document["visitors"])
+            total.merge(sketch)
+            if source == granularity:
+                existing = per_bucket.get(document["bucket"])
+                per_bucket[document["bucket"]] = existing.merge(sketch) if existing else sketch
+
+        return {bucket: sketch.count() for bucket, sketch in per_bucket.items()}, total.count()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached_sketches": len(self._cache),
+            "merges": self.merges,
+            "skipped": self.skipped,
+            "conflicts": self.conflicts,
+        }
+
+
+visitor_sketches = VisitorSketches(page_view_rollups_collection)
@@ -0,0 +1,182 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Write-behind configuration for contact submissions
+CONTACT_WRITE_BEHIND = os.environ.get('CONTACT_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_MAX_QUEUE = int(os.environ.get('WRITE_BEHIND_MAX_QUEUE', '10000'))
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', '200'))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL', '0.5'))
+# Failed flushes are retried with exponential backoff before documents are given up on
+WRITE_BEHIND_MAX_RETRIES = int(os.environ.get('WRITE_BEHIND_MAX_RETRIES', '8'))
+WRITE_BEHIND_RETRY_DELAY = float(os.environ.get('WRITE_BEHIND_RETRY_DELAY', '0.5'))
+WRITE_BEHIND_MAX_RETRY_DELAY = float(os.environ.get('WRITE_BEHIND_MAX_RETRY_DELAY', '30'))
+
+# Duplicate key: the document was stored by an earlier attempt of the same flush
+DUPLICATE_KEY = 11000
+
+
+class QueueFullError(Exception):
+    """Raised when the write-behind queue cannot accept more documents"""
+
+
+class WriteBehindQueue:
+    """Bounded in-process queue flushed to a collection with insert_many.
+
+    A background task writes a batch as soon as batch_size documents are waiting
+    or flush_interval seconds have passed since the first one arrived. stop()
+    drains whatever is still queued. on_write is awaited with every document that
+    was written, including the inserted part of a partially failed batch.
+
+    Documents were already acknowledged to clients, so a failed flush is retried
+    with exponential backoff while new documents wait in the queue (which then
+    rejects puts once full). insert_many assigns each document's _id on the first
+    attempt, so documents stored by an attempt that still reported an error show
+    up as duplicate keys on the retry and count as written.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_size: int = WRITE_BEHIND_MAX_QUEUE,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+        on_write: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        max_retries: int = WRITE_BEHIND_MAX_RETRIES,
+        retry_delay: float = WRITE_BEHIND_RETRY_DELAY,
+    ):
+        self.collection = collection
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_write = on_write
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.rejected = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, document: Dict[str, Any]):
+        """Queue a document for writing, raising QueueFullError when at capacity"""
+        try:
+            self._queue.put_nowait(document)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError("Write-behind queue is full")
+        self.enqueued += 1
+
+    async def _insert(self, documents: List[Dict[str, Any]]):
+        """Insert documents, returning (written, still to write, error)"""
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+            return documents, [], None
+        except BulkWriteError as e:
+            failed = {
+                error["index"] for error in e.details.get("writeErrors", [])
+                if error.get("code") != DUPLICATE_KEY
+            }
+            written = [document for index, document in enumerate(documents) if index not in failed]
+            remaining = [document for index, document in enumerate(documents) if index in failed]
+            return written, remaining, e
+        except Exception as e:
+            # Unknown outcome, e.g. a network error; retries sort out what was stored
+            return [], documents, e
+
+    async def _written(self, documents: List[Dict[str, Any]]):
+        self.written += len(documents)
+        if self.on_write and documents:
+            try:
+                await self.on_write(documents)
+            except Exception as e:
+                logger.error(f"Write-behind on_write hook failed: {e}")
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        remaining = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(min(self.retry_delay * 2 ** (attempt - 1), WRITE_BEHIND_MAX_RETRY_DELAY))
+            written, remaining, error = await self._insert(remaining)
+            await self._written(written)
+            if not remaining:
+                break
+            logger.warning(
+                f"Write-behind flush left {len(remaining)} of {len(batch)} documents unwritten "
+                f"(attempt {attempt + 1} of {self.max_retries + 1}): {error}"
+            )
+        else:
+            self.failed += len(remaining)
+            logger.error(
+                f"Giving up on {len(remaining)} write-behind documents after {self.max_retries + 1} attempts: "
+                + ", ".join(str(document.get("id", document.get("_id"))) for document in remaining)
+            )
+        self.batches += 1
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                # None is the shutdown sentinel queued by stop()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if batch:
+                await self._write(batch)
+
+    async def stop(self):
+        """Stop accepting work and wait until every queued document is written"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue counters for monitoring"""
+        return {
+            "running": self.running,
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+        }
@@ -70,14 +70,30 @@ export const portfolioAPI = {
     return await apiClient.get('/testimonials/');
   },
 
-  // Contact form submission
-  submitContactForm: async (formData) => {
-    return await apiClient.post('/contact/', formData);
+  // Page bundle (all sections a page needs in one request)
+  getPageBundle: async (page) => {
+    return await apiClient.get(`/bundle/${page}`);
   },
 
-  // Submit testimonial
-  submitTestimonial: async (testimonialData) => {
-    return await apiClient.post('/testimonials/', testimonialData);
+  // Contact form submission (pass the same idempotencyKey on retries to avoid duplicates)
+  submitContactForm: async (formData, idempotencyKey = null) => {
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {};
+    return await apiClient.post('/contact/', formData, { headers });
+  },
+
+  // Submit testimonial (pass the same idempotencyKey on retries to avoid duplicates)
+  submitTestimonial: async (testimonialData, idempotencyKey = null) => {
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {};
+    return await apiClient.post('/testimonials/', testimonialData, { headers });
+  },
+
+  // Page-view beacon; sendBeacon survives page unloads and never blocks navigation
+  trackPageView: (page, referrer = document.referrer || null) => {
+    const body = JSON.stringify({ page, referrer });
+    if (navigator.sendBeacon && navigator.sendBeacon(`${API_BASE}/analytics/pageview`, body)) {
+      return;
+    }
+    apiClient.post('/analytics/pageview', body).catch(() => {});
   },
 
   // Health check
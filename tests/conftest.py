@@ -0,0 +1,16 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+# database.py only needs the URL once a client is created; tests pass their own collections
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+
+@pytest.fixture
+def mongo():
+    """An in-memory Motor-compatible database"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()["portfolio_test"]
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from fastapi.params import Depends
+from starlette.requests import Request
+
+from models import PageViewCreate
+from pageviews import PageViewBuffer
+
+analytics = pytest.importorskip("routers.analytics")
+
+
+@pytest.mark.parametrize("page, path", [
+    ("/portfolio?utm_source=newsletter#work", "/portfolio"),
+    ("/project/3f2a-hemp/", "/project/3f2a-hemp"),
+    ("https://example.com/services?ref=1", "/services"),
+    ("//contact//", "/contact"),
+    ("/", "/"),
+])
+def test_pages_are_reduced_to_their_path(page, path):
+    assert PageViewCreate(page=page).page == path
+
+
+@pytest.mark.parametrize("page", ["portfolio", "?q=1", "/<script>", "/about me", "/" + "a" * 300])
+def test_pages_outside_the_path_pattern_are_rejected(page):
+    with pytest.raises(ValueError):
+        PageViewCreate(page=page)
+
+
+def beacon(page, host="203.0.113.7"):
+    body = json.dumps({"page": page}).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "headers": [], "client": (host, 4000)}, receive)
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = PageViewBuffer(collection=None)
+    monkeypatch.setattr(analytics, "page_view_buffer", buffer)
+    return buffer
+
+
+def test_beacon_buffers_the_normalized_page(buffer):
+    response = asyncio.run(analytics.record_page_view(beacon("/research?tab=papers")))
+    assert response.status_code == 204
+    assert [event["page"] for event in buffer._events] == ["/research"]
+
+
+def test_beacon_rejects_arbitrary_pages(buffer):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(analytics.record_page_view(beacon("not a page")))
+    assert error.value.status_code == 422
+    assert buffer.depth == 0
+
+
+def test_beacon_is_rate_limited():
+    route = next(route for route in analytics.router.routes if route.path.endswith("/pageview"))
+    [check] = [dependency.dependency for dependency in route.dependencies if isinstance(dependency, Depends)]
+
+    async def scenario():
+        for _ in range(100):
+            await check(beacon("/"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 429
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from bulk import run_bulk_write, fetch_documents
+from models import BulkOperation, ServiceItemCreate, ServiceItemUpdate
+
+
+def operation(op, id=None, **data):
+    return BulkOperation(op=op, id=id, data=data or None)
+
+
+async def seed(collection):
+    await collection.insert_many([
+        {"id": "keep", "title": "Consulting", "description": "Circular design"},
+        {"id": "drop", "title": "Workshops", "description": "Natural dyes"},
+    ])
+
+
+def bulk(collection, operations):
+    return run_bulk_write(collection, operations, ServiceItemCreate, ServiceItemUpdate)
+
+
+def test_partial_failures_are_reported_per_item(mongo):
+    collection = mongo.services
+
+    async def scenario():
+        await seed(collection)
+        outcome = await bulk(collection, [
+            operation("insert", title="Audits", description="Supply chain audits", deliverables=["Report"]),
+            operation("insert", title="Missing a description"),
+            operation("update", "keep", title="Strategy"),
+            operation("update"),
+            operation("delete", "drop"),
+            operation("rename", "keep"),
+        ])
+        return outcome, await fetch_documents(collection, ["keep", "drop"])
+
+    outcome, stored = asyncio.run(scenario())
+    assert [result["status"] for result in outcome.results] == ["ok", "error", "ok", "error", "ok", "error"]
+    assert "description" in outcome.results[1]["error"]
+    assert outcome.results[3]["error"] == "id is required"
+    assert outcome.results[5]["error"] == "Unknown op: rename"
+    assert outcome.counts == {"inserted": 1, "matched": 1, "modified": 1, "deleted": 1}
+    assert [document["title"] for document in outcome.inserted] == ["Audits"]
+    assert "_id" not in outcome.inserted[0]
+    assert outcome.updated_ids == ["keep"]
+    assert outcome.deleted_ids == ["drop"]
+    assert [(document["id"], document["title"]) for document in stored] == [("keep", "Strategy")]
+
+
+def test_unknown_ids_are_not_found(mongo):
+    collection = mongo.services
+
+    async def scenario():
+        await seed(collection)
+        return await bulk(collection, [
+            operation("update", "ghost", title="Nothing to update"),
+            operation("delete", "ghost"),
+            operation("update", "keep", title="Strategy"),
+        ])
+
+    outcome = asyncio.run(scenario())
+    assert [result["status"] for result in outcome.results] == ["not_found", "not_found", "ok"]
+    assert outcome.updated_ids == ["keep"]
+    assert outcome.deleted_ids == []
+    assert outcome.changed
+
+
+def test_batch_with_only_unknown_targets_changes_nothing(mongo):
+    collection = mongo.services
+
+    async def scenario():
+        await seed(collection)
+        return await bulk(collection, [operation("update", "ghost", title="Nothing to update")])
+
+    outcome = asyncio.run(scenario())
+    assert outcome.results[0]["status"] == "not_found"
+    assert not outcome.changed
+
+
+class DeletedDuringWrite:
+    """A collection where another request deletes a document just before the bulk write lands"""
+
+    def __init__(self, collection, doc_id):
+        self.collection = collection
+        self.doc_id = doc_id
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def bulk_write(self, requests, **options):
+        await self.collection.delete_one({"id": self.doc_id})
+        return await self.collection.bulk_write(requests, **options)
+
+
+def test_update_of_a_concurrently_deleted_document_is_not_found(mongo):
+    async def scenario():
+        await seed(mongo.services)
+        collection = DeletedDuringWrite(mongo.services, "keep")
+        return await bulk(collection, [
+            operation("update", "keep", title="Strategy"),
+            operation("update", "drop", title="Dye workshops"),
+        ])
+
+    outcome = asyncio.run(scenario())
+    assert [result["status"] for result in outcome.results] == ["not_found", "ok"]
+    assert outcome.updated_ids == ["drop"]
+
+
+def test_write_errors_are_reported_per_item(mongo):
+    collection = mongo.services
+
+    async def scenario():
+        await collection.create_index("title", unique=True)
+        await seed(collection)
+        return await bulk(collection, [
+            operation("insert", title="Consulting", description="A duplicate title", deliverables=["Report"]),
+            operation("insert", title="Audits", description="Supply chain audits", deliverables=["Report"]),
+        ])
+
+    outcome = asyncio.run(scenario())
+    assert [result["status"] for result in outcome.results] == ["error", "ok"]
+    assert [document["title"] for document in outcome.inserted] == ["Audits"]
+    assert outcome.counts["inserted"] == 1
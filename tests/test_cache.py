@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from cache import ResponseCache
+import cache as cache_module
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ResponseCache(ttl_seconds=10, stale_seconds=0)
+    cache.set("projects", {"page": 1}, "cached")
+    clock.now += 9
+    assert cache.get("projects", {"page": 1}) == "cached"
+    clock.now += 2
+    assert cache.get("projects", {"page": 1}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("projects", {"page": 1}, "one")
+    cache.set("projects", {"page": 2}, "two")
+    cache.get("projects", {"page": 1})
+    cache.set("projects", {"page": 3}, "three")
+    assert cache.get("projects", {"page": 2}) is None
+    assert cache.get("projects", {"page": 1}) == "one"
+    assert cache.get("projects", {"page": 3}) == "three"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_drops_only_that_collection(clock):
+    cache = ResponseCache(ttl_seconds=60)
+    seen = []
+    cache.add_invalidation_listener(seen.append)
+    cache.set("projects", {"page": 1}, "projects")
+    cache.set("services", None, "services")
+    cache.invalidate("projects")
+    cache.invalidate("projects", propagate=False)
+    assert cache.get("projects", {"page": 1}) is None
+    assert cache.get("services") == "services"
+    assert cache.version("projects") == 2
+    # Only the local write is announced to listeners
+    assert seen == ["projects"]
+
+
+def test_get_or_load_caches_the_loaded_value(clock):
+    cache = ResponseCache(ttl_seconds=10, stale_seconds=0)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "loaded"
+
+    async def scenario():
+        first = await cache.get_or_load("projects", None, loader)
+        second = await cache.get_or_load("projects", None, loader)
+        clock.now += 11
+        third = await cache.get_or_load("projects", None, loader)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == ("loaded", "loaded", "loaded")
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,100 @@
+import asyncio
+
+from cache import ResponseCache
+from coherence import CacheCoherence, bump_versions
+
+
+class Worker:
+    """One process's cache and coherence state"""
+
+    def __init__(self, versions):
+        self.cache = ResponseCache(ttl_seconds=60)
+        # A long interval so the tests drive polling themselves
+        self.coherence = CacheCoherence(self.cache, versions, interval=3600)
+        self.rebuilds = 0
+        self.coherence.on_change("projects", self.rebuild)
+        self.coherence.on_change("services", self.rebuild)
+
+    async def rebuild(self):
+        self.rebuilds += 1
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_write_on_one_worker_invalidates_the_other(mongo):
+    async def scenario():
+        first, second = Worker(mongo.cache_versions), Worker(mongo.cache_versions)
+        await first.coherence.start()
+        await second.coherence.start()
+        second.cache.set("projects", None, "cached on the second worker")
+        second.cache.set("services", None, "unrelated")
+
+        first.cache.invalidate("projects")
+        await settle()
+        changed_elsewhere = await second.coherence.poll()
+        changed_locally = await first.coherence.poll()
+
+        await first.coherence.stop()
+        await second.coherence.stop()
+        return first, second, changed_elsewhere, changed_locally
+
+    first, second, changed_elsewhere, changed_locally = asyncio.run(scenario())
+    assert changed_elsewhere == ["projects"]
+    assert second.cache.get("projects") is None
+    assert second.cache.get("services") == "unrelated"
+    assert second.rebuilds == 1
+    # The writer does not re-apply its own announcement
+    assert changed_locally == []
+    assert first.rebuilds == 0
+
+
+def test_applied_remote_change_is_not_announced_again(mongo):
+    async def scenario():
+        first, second = Worker(mongo.cache_versions), Worker(mongo.cache_versions)
+        await first.coherence.start()
+        await second.coherence.start()
+        first.cache.invalidate("projects")
+        await settle()
+        await second.coherence.poll()
+        await settle()
+        await first.coherence.stop()
+        await second.coherence.stop()
+        return await mongo.cache_versions.find_one({"_id": "projects"}), second.coherence.stats()
+
+    document, stats = asyncio.run(scenario())
+    assert document["version"] == 1
+    assert stats["published"] == 0
+    assert stats["applied"] == 1
+
+
+def test_script_bump_reaches_every_worker_and_rebuilds_once(mongo):
+    async def scenario():
+        workers = [Worker(mongo.cache_versions), Worker(mongo.cache_versions)]
+        for worker in workers:
+            await worker.coherence.start()
+            worker.cache.set("projects", None, "before the seed")
+        # e.g. seed_data.py rewriting several collections
+        await bump_versions(mongo.cache_versions, ["projects", "services"])
+        changed = [sorted(await worker.coherence.poll()) for worker in workers]
+        for worker in workers:
+            await worker.coherence.stop()
+        return workers, changed
+
+    workers, changed = asyncio.run(scenario())
+    assert changed == [["projects", "services"], ["projects", "services"]]
+    for worker in workers:
+        assert worker.cache.get("projects") is None
+        # The shared handler runs once even though two collections changed
+        assert worker.rebuilds == 1
+
+
+def test_announce_is_a_no_op_until_started(mongo):
+    async def scenario():
+        worker = Worker(mongo.cache_versions)
+        await worker.coherence.announce(["projects"])
+        return await mongo.cache_versions.count_documents({})
+
+    assert asyncio.run(scenario()) == 0
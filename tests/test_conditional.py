@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from cache import ResponseCache
+from conditional import content_etag, etag_matches
+from models import SuccessResponse
+import snapshots
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(ttl_seconds=60)
+    monkeypatch.setattr(snapshots, "response_cache", cache)
+    return cache
+
+
+def get(if_none_match=None):
+    headers = [(b"accept-encoding", b"gzip")]
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+class Store:
+    """Stands in for a collection whose documents a write can change"""
+
+    def __init__(self):
+        self.titles = ["First project"]
+        self.loads = 0
+
+    async def load(self):
+        self.loads += 1
+        return SuccessResponse(data={"projects": list(self.titles)}, message="Projects retrieved successfully")
+
+
+def serve(store, request):
+    return snapshots.serve_snapshot(request, "projects", {"page": 1}, store.load)
+
+
+def test_matching_if_none_match_gets_304(cache):
+    store = Store()
+
+    async def scenario():
+        first = await serve(store, get())
+        return first, await serve(store, get(first.headers["etag"]))
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.body == b""
+    assert second.headers["etag"] == first.headers["etag"]
+    assert store.loads == 1
+
+
+def test_write_changes_the_etag(cache):
+    store = Store()
+
+    async def scenario():
+        before = await serve(store, get())
+        store.titles.append("Second project")
+        cache.invalidate("projects")
+        after = await serve(store, get(before.headers["etag"]))
+        revalidated = await serve(store, get(after.headers["etag"]))
+        return before, after, revalidated
+
+    before, after, revalidated = asyncio.run(scenario())
+    # The old tag no longer matches, so the client gets the new content
+    assert after.status_code == 200
+    assert b"Second project" in after.body
+    assert after.headers["etag"] != before.headers["etag"]
+    assert revalidated.status_code == 304
+
+
+def test_reload_with_unchanged_content_keeps_the_etag(cache):
+    store = Store()
+
+    async def scenario():
+        before = await serve(store, get())
+        # e.g. another worker, or the same worker after its entry expired
+        cache.clear()
+        return before, await serve(store, get(before.headers["etag"]))
+
+    before, after = asyncio.run(scenario())
+    assert store.loads == 2
+    assert after.status_code == 304
+
+
+def test_etag_matching():
+    etag = content_etag(b'{"success":true}')
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_each_content_coding_has_its_own_etag(cache):
+    store = Store()
+    store.titles = [f"Project {number} on recycled hemp fibers" for number in range(40)]
+
+    async def scenario():
+        compressed = await serve(store, get())
+        plain = await serve(store, Request({"type": "http", "method": "GET", "headers": []}))
+        compressed_again = await serve(store, get(compressed.headers["etag"]))
+        plain_with_gzip_tag = await serve(store, Request({
+            "type": "http", "method": "GET", "headers": [(b"if-none-match", compressed.headers["etag"].encode())],
+        }))
+        return compressed, plain, compressed_again, plain_with_gzip_tag
+
+    compressed, plain, compressed_again, plain_with_gzip_tag = asyncio.run(scenario())
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert compressed_again.status_code == 304
+    # A tag for the gzip bytes does not validate the identity representation
+    assert plain_with_gzip_tag.status_code == 200
+
+
+def test_uncompressed_response_for_uncached_payloads():
+    snapshot = snapshots.EncodedResponse.build(
+        SuccessResponse(data={"submissions": ["message"] * 200}, message="Contact submissions retrieved successfully")
+    )
+
+    response = asyncio.run(snapshot.respond(get(), compress=False))
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == snapshot.etag
+    assert list(snapshot.bodies) == ["identity"]
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+from starlette.requests import Request
+
+from cache import ResponseCache
+from read_model import ReadModel
+import read_model as read_model_module
+import snapshots
+
+projects_router = pytest.importorskip("routers.projects")
+
+PROJECTS = [
+    {"id": "1", "title": "Hemp", "category": "Research", "company": "Kent State", "tools": ["Python", "Excel"]},
+    {"id": "2", "title": "Dye", "category": "Research", "company": "Lulu Group", "tools": ["Excel"]},
+    {"id": "3", "title": "Drape", "category": "3D Design", "company": "Lulu Group", "tools": ["CLO3D", "Excel"]},
+    {"id": "4", "title": "Moodboard", "category": "Styling", "tools": []},
+]
+
+
+@pytest.fixture
+def projects(mongo, monkeypatch):
+    cache = ResponseCache(ttl_seconds=60)
+    monkeypatch.setattr(snapshots, "response_cache", cache)
+    monkeypatch.setattr(read_model_module, "db", mongo)
+    monkeypatch.setattr(projects_router, "projects_collection", mongo.projects)
+    monkeypatch.setattr(projects_router, "read_model", ReadModel(cache, {"projects": {}}))
+    asyncio.run(mongo.projects.insert_many([dict(project) for project in PROJECTS]))
+    return mongo.projects
+
+
+def facets():
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    response = asyncio.run(projects_router.get_project_facets(request))
+    assert response.status_code == 200
+    return json.loads(response.body)["data"]
+
+
+def test_facets_count_each_value(projects):
+    data = facets()
+    assert data["total"] == 4
+    assert data["categories"] == [
+        {"value": "Research", "count": 2, "slug": "research"},
+        {"value": "3D Design", "count": 1, "slug": "3d-design"},
+        {"value": "Styling", "count": 1, "slug": "styling"},
+    ]
+    # A project without a company is counted under null
+    assert data["companies"] == [
+        {"value": "Lulu Group", "count": 2},
+        {"value": None, "count": 1},
+        {"value": "Kent State", "count": 1},
+    ]
+    assert data["tools"] == [
+        {"value": "Excel", "count": 3},
+        {"value": "CLO3D", "count": 1},
+        {"value": "Python", "count": 1},
+    ]
+
+
+def test_read_model_facets_match_the_pipeline(projects, monkeypatch):
+    from_pipeline = facets()
+    model = ReadModel(ResponseCache(ttl_seconds=60), {"projects": {}})
+    asyncio.run(model.start())
+    monkeypatch.setattr(projects_router, "read_model", model)
+    snapshots.response_cache.clear()
+    assert facets() == from_pipeline
+
+
+def test_facet_slugs_are_accepted_by_the_category_filter(projects):
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    for category in facets()["categories"]:
+        response = asyncio.run(projects_router.get_projects(
+            request, category=category["slug"], limit=20, cursor=None, fields=None,
+        ))
+        listed = json.loads(response.body)["data"]["projects"]
+        assert len(listed) == category["count"]
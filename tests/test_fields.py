@@ -0,0 +1,40 @@
+import pytest
+from fastapi import HTTPException
+
+from fields import resolve_fields
+
+# Fields the frontend list pages (PortfolioPage, HomePage, ResearchPage, ServicesPage) render
+LIST_VIEW_FIELDS = {
+    "projects": {"id", "title", "category", "company", "image", "description", "tools"},
+    "research_projects": {"id", "title", "organization", "status", "collaboration", "description", "publications"},
+    "services": {"id", "title", "description", "deliverables"},
+}
+
+
+@pytest.mark.parametrize("collection", sorted(LIST_VIEW_FIELDS))
+def test_summary_keeps_every_field_the_list_views_render(collection):
+    _, projection = resolve_fields(collection, None)
+    assert LIST_VIEW_FIELDS[collection] <= set(projection)
+    assert projection["_id"] == 0
+
+
+def test_summary_leaves_out_detail_page_fields():
+    _, projection = resolve_fields("projects", "summary")
+    assert not {"challenge", "solution", "impact", "role"} & set(projection)
+
+
+def test_explicit_fields_keep_the_pagination_fields():
+    label, projection = resolve_fields("projects", "title, image")
+    assert label == "created_at,id,image,title"
+    assert projection == {"_id": 0, "created_at": 1, "id": 1, "image": 1, "title": 1}
+
+
+def test_all_returns_full_documents():
+    assert resolve_fields("services", "all") == ("all", None)
+
+
+def test_unknown_field_is_rejected_with_400():
+    with pytest.raises(HTTPException) as error:
+        resolve_fields("projects", "title,secret")
+    assert error.value.status_code == 400
+    assert "secret" in error.value.detail
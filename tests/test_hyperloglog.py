@@ -0,0 +1,102 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from hyperloglog import DEFAULT_PRECISION, STANDARD_ERROR, HyperLogLog  # noqa: E402
+
+
+def synthetic_visitors(count, seed=0):
+    """Distinct ip|user-agent pairs shaped like the page-view events"""
+    rng = random.Random(seed)
+    agents = [f"Mozilla/5.0 (agent {index})" for index in range(50)]
+    visitors = set()
+    while len(visitors) < count:
+        ip = ".".join(str(rng.randrange(256)) for _ in range(4))
+        visitors.add(f"{ip}|{rng.choice(agents)}")
+    return sorted(visitors)
+
+
+def sketch_of(values, precision=DEFAULT_PRECISION):
+    sketch = HyperLogLog(precision)
+    sketch.update(values)
+    return sketch
+
+
+def test_empty_sketch_counts_zero():
+    assert HyperLogLog().count() == 0
+
+
+def test_small_sets_are_nearly_exact():
+    for count in (1, 10, 100):
+        assert abs(sketch_of(synthetic_visitors(count)).count() - count) <= max(1, count * 0.02)
+
+
+@pytest.mark.parametrize("count", [1_000, 10_000, 50_000])
+def test_estimate_within_error_bound(count):
+    estimate = sketch_of(synthetic_visitors(count, seed=count)).count()
+    # Four standard errors keeps the check deterministic-safe for fixed seeds
+    assert abs(estimate - count) / count <= 4 * STANDARD_ERROR
+
+
+def test_mean_error_matches_documented_rate():
+    count = 5_000
+    errors = [
+        abs(sketch_of(synthetic_visitors(count, seed=seed)).count() - count) / count
+        for seed in range(10)
+    ]
+    assert sum(errors) / len(errors) <= 1.5 * STANDARD_ERROR
+
+
+def test_repeated_values_do_not_inflate_count():
+    visitors = synthetic_visitors(2_000, seed=1)
+    sketch = sketch_of(visitors)
+    before = sketch.count()
+    sketch.update(visitors * 5)
+    assert sketch.count() == before
+
+
+def test_merge_equals_sketch_of_union():
+    first = synthetic_visitors(3_000, seed=2)
+    second = synthetic_visitors(3_000, seed=3)
+    union = set(first) | set(second)
+
+    merged = sketch_of(first).merge(sketch_of(second))
+
+    assert merged == sketch_of(union)
+    assert abs(merged.count() - len(union)) / len(union) <= 4 * STANDARD_ERROR
+
+
+def test_merge_is_commutative_and_idempotent():
+    first = sketch_of(synthetic_visitors(500, seed=4))
+    second = sketch_of(synthetic_visitors(500, seed=5))
+
+    assert first.copy().merge(second) == second.copy().merge(first)
+    assert first.copy().merge(first) == first
+
+
+def test_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(10))
+
+
+def test_memory_is_bounded():
+    sketch = sketch_of(synthetic_visitors(20_000, seed=6))
+    assert sketch.registers.nbytes == 1 << DEFAULT_PRECISION
+
+
+def test_serialization_round_trip_is_compact():
+    sketch = sketch_of(synthetic_visitors(100, seed=7))
+    data = sketch.to_bytes()
+
+    assert HyperLogLog.from_bytes(data) == sketch
+    assert len(data) < sketch.registers.nbytes
+
+
+def test_from_bytes_rejects_corrupt_data():
+    data = HyperLogLog(10).to_bytes()
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(bytes([12]) + data[1:])
@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from cache import ResponseCache
+from models import SuccessResponse
+from rate_limit import rate_limit
+import idempotency
+
+
+@pytest.fixture
+def keys(mongo, monkeypatch):
+    collection = mongo.idempotency_keys
+    monkeypatch.setattr(idempotency, "idempotency_keys_collection", collection)
+    monkeypatch.setattr(idempotency, "_recent", ResponseCache(max_entries=16, ttl_seconds=60))
+    monkeypatch.setattr(idempotency, "_in_flight", {})
+    return collection
+
+
+class Handler:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return SuccessResponse(data={"id": f"item-{self.calls}"}, message="Created")
+
+
+def request_with_key(key):
+    return Request({
+        "type": "http",
+        "headers": [(b"idempotency-key", key.encode())],
+        "client": ("203.0.113.7", 4000),
+    })
+
+
+def test_replay_returns_the_stored_response(keys):
+    handler = Handler()
+
+    async def scenario():
+        await keys.create_index("key", unique=True)
+        first = await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, handler)
+        # A fresh process only has the Mongo record
+        idempotency._recent.clear()
+        replay = await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, handler)
+        return first, replay, await keys.find_one({"key": "items.create:abc"})
+
+    first, replay, stored = asyncio.run(scenario())
+    assert handler.calls == 1
+    assert first.data == {"id": "item-1"}
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert b'"item-1"' in replay.body
+    assert stored["status"] == "completed"
+    assert "locked_until" not in stored
+
+
+def test_reused_key_with_a_different_body_is_rejected(keys):
+    handler = Handler()
+
+    async def scenario():
+        await keys.create_index("key", unique=True)
+        await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, handler)
+        await idempotency.run_idempotent("abc", "items.create", {"name": "b"}, handler)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 422
+    assert handler.calls == 1
+
+
+def test_expired_lock_is_taken_over(keys):
+    handler = Handler()
+
+    async def scenario():
+        await keys.create_index("key", unique=True)
+        # Left behind by a process that crashed while executing the key
+        await keys.insert_one({
+            "key": "items.create:abc",
+            "fingerprint": "stale",
+            "status": "in_progress",
+            "claim_token": "crashed",
+            "locked_until": datetime.utcnow() - timedelta(seconds=1),
+            "created_at": datetime.utcnow() - timedelta(minutes=5),
+        })
+        result = await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, handler)
+        return result, await keys.find_one({"key": "items.create:abc"})
+
+    result, stored = asyncio.run(scenario())
+    assert handler.calls == 1
+    assert result.data == {"id": "item-1"}
+    assert stored["status"] == "completed"
+    assert stored["response"]["data"] == {"id": "item-1"}
+
+
+def test_held_lock_returns_409_after_waiting(keys, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0.2)
+    handler = Handler()
+
+    async def scenario():
+        await keys.create_index("key", unique=True)
+        await keys.insert_one({
+            "key": "items.create:abc",
+            "fingerprint": "other",
+            "status": "in_progress",
+            "claim_token": "running",
+            "locked_until": datetime.utcnow() + timedelta(minutes=1),
+            "created_at": datetime.utcnow(),
+        })
+        await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, handler)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 409
+    assert handler.calls == 0
+
+
+def test_failed_handler_releases_the_key(keys):
+    async def failing():
+        raise RuntimeError("insert failed")
+
+    async def scenario():
+        await keys.create_index("key", unique=True)
+        with pytest.raises(RuntimeError):
+            await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, failing)
+        return await keys.count_documents({})
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_replay_is_not_charged_by_the_rate_limit(keys):
+    check = rate_limit("idempotency_test", per_minute=1, burst=1, exempt=idempotency.replay_exempt("items.create"))
+
+    async def scenario():
+        await keys.create_index("key", unique=True)
+        await check(request_with_key("abc"))
+        await idempotency.run_idempotent("abc", "items.create", {"name": "a"}, Handler())
+        # The bucket is empty, but replays of the completed key still pass
+        await check(request_with_key("abc"))
+        await check(request_with_key("abc"))
+        await check(request_with_key("new"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 429
+
+
+class Unreachable:
+    def __getattr__(self, name):
+        raise AssertionError(f"rate limiting queried Mongo ({name})")
+
+
+def test_exemption_never_queries_mongo(monkeypatch):
+    monkeypatch.setattr(idempotency, "idempotency_keys_collection", Unreachable())
+    monkeypatch.setattr(idempotency, "_recent", ResponseCache(max_entries=16, ttl_seconds=60))
+    check = rate_limit("idempotency_fresh_keys", per_minute=1, burst=1, exempt=idempotency.replay_exempt("items.create"))
+
+    async def scenario():
+        # A client sending a fresh key every time is limited from memory alone
+        for number in range(3):
+            await check(request_with_key(f"random-{number}"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 429
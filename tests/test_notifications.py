@@ -0,0 +1,131 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+
+from notifications import NotificationWorkerPool, SmtpSender, pending_notification
+import notifications
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode())
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    monkeypatch.setattr(notifications, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(notifications, "NOTIFY_TO", "owner@example.com")
+    inbox = Inbox()
+    controller = controller_module.Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    inbox.port = controller.port
+    yield inbox
+    controller.stop()
+
+
+def submission(name="Ada", **fields):
+    return {
+        "id": f"submission-{name}",
+        "name": name,
+        "email": f"{name.lower()}@example.com",
+        "message": "Hello there",
+        "status": "new",
+        "submitted_at": datetime.utcnow(),
+        **pending_notification(),
+        **fields,
+    }
+
+
+def test_pending_submission_is_delivered_over_smtp(mongo, smtp_server):
+    async def scenario():
+        collection = mongo.contact_submissions
+        await collection.insert_one(submission())
+        pool = NotificationWorkerPool(collection, workers=1, sender=partial(SmtpSender, "127.0.0.1", smtp_server.port))
+        pool.start()
+        pool.notify()
+        for _ in range(100):
+            if pool.sent:
+                break
+            await asyncio.sleep(0.05)
+        await pool.stop()
+        return await collection.find_one({"id": "submission-Ada"}), pool.stats()
+
+    stored, stats = asyncio.run(scenario())
+    assert stats["sent"] == 1
+    assert stored["notify_status"] == "sent"
+    assert "notify_claim_token" not in stored
+    assert len(smtp_server.messages) == 1
+    assert "Subject: New contact form submission from Ada" in smtp_server.messages[0]
+    assert "Reply-To: ada@example.com" in smtp_server.messages[0]
+
+
+def test_failed_delivery_is_retried_later(mongo):
+    async def scenario():
+        collection = mongo.contact_submissions
+        await collection.insert_one(submission())
+        pool = NotificationWorkerPool(collection)
+        rows = await pool._claim()
+        # Nothing listens on this port, so the send fails
+        outcomes = await asyncio.to_thread(SmtpSender("127.0.0.1", free_port()).send_batch, rows)
+        await pool._record(rows, outcomes)
+        return await collection.find_one({"id": "submission-Ada"}), pool.stats()
+
+    stored, stats = asyncio.run(scenario())
+    assert stats["retried"] == 1
+    assert stored["notify_status"] == "pending"
+    assert stored["notify_attempts"] == 1
+    assert stored["notify_last_error"]
+    assert stored["notify_next_attempt_at"] > datetime.utcnow()
+
+
+def test_expired_lease_is_taken_over(mongo):
+    async def scenario():
+        collection = mongo.contact_submissions
+        await collection.insert_one(submission())
+        first, second = NotificationWorkerPool(collection), NotificationWorkerPool(collection)
+        claimed = await first._claim()
+        # Claimed rows are invisible to other workers while the lease holds
+        assert await second._claim() == []
+
+        await collection.update_one(
+            {"id": "submission-Ada"},
+            {"$set": {"notify_locked_until": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        taken_over = await second._claim()
+        # The stalled worker finishing late must not overwrite the new claim
+        await first._record(claimed, {"submission-Ada": None})
+        return claimed, taken_over, await collection.find_one({"id": "submission-Ada"})
+
+    claimed, taken_over, stored = asyncio.run(scenario())
+    assert [row["id"] for row in taken_over] == ["submission-Ada"]
+    assert taken_over[0]["notify_claim_token"] != claimed[0]["notify_claim_token"]
+    assert stored["notify_attempts"] == 2
+    assert stored["notify_status"] == "sending"
+    assert stored["notify_claim_token"] == taken_over[0]["notify_claim_token"]
+
+
+def test_submissions_without_notification_state_are_ignored(mongo):
+    async def scenario():
+        collection = mongo.contact_submissions
+        plain = submission()
+        for field in ("notify_status", "notify_attempts", "notify_next_attempt_at"):
+            plain.pop(field)
+        await collection.insert_one(plain)
+        return await NotificationWorkerPool(collection)._claim()
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,79 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from pagination import decode_cursor, encode_cursor, fetch_page, slice_page
+
+START = datetime(2026, 1, 1, 12, 0)
+
+
+def projects():
+    # Pairs of documents share a created_at so the id tie-break matters
+    return [
+        {"id": f"project-{number:02d}", "title": f"Project {number}", "created_at": START + timedelta(minutes=number // 2)}
+        for number in range(7)
+    ]
+
+
+def newest_first(documents):
+    return sorted(documents, key=lambda document: (document["created_at"], document["id"]), reverse=True)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(START, "project-03")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (START, "project-03")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b'{"id":"project-03"}').decode(),
+    base64.urlsafe_b64encode(b'{"t":"yesterday","id":"project-03"}').decode(),
+    encode_cursor(START, "project-03")[:-4],
+])
+def test_tampered_cursor_is_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_cover_every_document_once(mongo):
+    async def scenario():
+        collection = mongo.projects
+        await collection.insert_many(projects())
+        pages, cursor = [], None
+        while True:
+            documents, cursor = await fetch_page(collection, {}, "created_at", 3, cursor=cursor)
+            pages.append([document["id"] for document in documents])
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(scenario())
+    expected = [document["id"] for document in newest_first(projects())]
+    assert pages == [expected[0:3], expected[3:6], expected[6:7]]
+
+
+def test_in_memory_pages_match_mongo_pages(mongo):
+    async def scenario():
+        collection = mongo.projects
+        await collection.insert_many(projects())
+        _, cursor = await fetch_page(collection, {}, "created_at", 2)
+        return await fetch_page(collection, {}, "created_at", 2, cursor=cursor), cursor
+
+    (from_mongo, next_from_mongo), cursor = asyncio.run(scenario())
+    from_memory, next_from_memory = slice_page(newest_first(projects()), "created_at", 2, cursor, {"id": 1, "title": 1})
+    assert [document["id"] for document in from_memory] == [document["id"] for document in from_mongo]
+    assert next_from_memory == next_from_mongo
+    assert set(from_memory[0]) == {"id", "title"}
+
+
+def test_fetch_page_rejects_a_tampered_cursor(mongo):
+    async def scenario():
+        await fetch_page(mongo.projects, {}, "created_at", 3, cursor="tampered!")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 400
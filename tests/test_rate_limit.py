@@ -0,0 +1,127 @@
+import asyncio
+import os
+import runpy
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from rate_limit import TokenBucketLimiter, client_ip, rate_limit
+import rate_limit as rate_limit_module
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit_module, "time", clock)
+    return clock
+
+
+def request_from(host, forwarded_for=None):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (host, 4000)})
+
+
+def test_burst_then_refill(clock):
+    limiter = TokenBucketLimiter(per_minute=6, burst=2)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    # Empty bucket: one token takes 10 seconds at 6 per minute
+    assert limiter.acquire("a") == pytest.approx(10)
+    clock.now += 10
+    assert limiter.acquire("a") == 0
+    assert limiter.stats() == {"clients": 1, "allowed": 3, "rejected": 1}
+
+
+def test_clients_have_separate_buckets(clock):
+    limiter = TokenBucketLimiter(per_minute=6, burst=1)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("b") == 0
+    assert limiter.acquire("a") > 0
+
+
+def test_least_recently_seen_client_is_forgotten(clock):
+    limiter = TokenBucketLimiter(per_minute=6, burst=1, max_clients=2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("c")
+    assert limiter.stats()["clients"] == 2
+    # "a" was evicted and starts again with a full bucket
+    assert limiter.acquire("a") == 0
+
+
+def test_over_limit_request_gets_429_with_retry_after(clock):
+    check = rate_limit("rate_limit_test", per_minute=6, burst=1)
+
+    async def scenario():
+        await check(request_from("203.0.113.7"))
+        clock.now += 2.5
+        await check(request_from("203.0.113.7"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 429
+    # 7.5 seconds until the next token, rounded up
+    assert error.value.headers == {"Retry-After": "8"}
+
+
+def test_forwarded_for_is_only_trusted_behind_proxies(monkeypatch):
+    request = request_from("10.0.0.2", forwarded_for="198.51.100.9, 203.0.113.7")
+    assert client_ip(request) == "10.0.0.2"
+    monkeypatch.setattr(rate_limit_module, "TRUSTED_PROXY_HOPS", 1)
+    assert client_ip(request) == "203.0.113.7"
+    monkeypatch.setattr(rate_limit_module, "TRUSTED_PROXY_HOPS", 2)
+    assert client_ip(request) == "198.51.100.9"
+
+
+def test_visitors_behind_the_proxy_get_their_own_buckets(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "TRUSTED_PROXY_HOPS", 1)
+    check = rate_limit("proxied_test", per_minute=6, burst=1)
+
+    async def scenario():
+        # Both requests arrive from the proxy's address
+        await check(request_from("10.0.0.2", forwarded_for="198.51.100.9"))
+        await check(request_from("10.0.0.2", forwarded_for="203.0.113.7"))
+        await check(request_from("10.0.0.2", forwarded_for="spoofed, 198.51.100.9"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 429
+
+
+def test_production_config_trusts_one_proxy_hop(monkeypatch):
+    environ = {key: value for key, value in os.environ.items() if key != "TRUSTED_PROXY_HOPS"}
+    monkeypatch.setattr(os, "environ", environ)
+    runpy.run_path(str(Path(rate_limit_module.__file__).with_name("gunicorn.conf.py")))
+    assert environ["TRUSTED_PROXY_HOPS"] == "1"
+
+
+def test_workers_share_the_configured_limit(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "WORKER_COUNT", 4)
+    # Each worker process builds its own limiter for the route
+    workers = [rate_limit(f"shared_test_{number}", per_minute=8, burst=4) for number in range(4)]
+
+    async def scenario():
+        allowed = 0
+        for second in range(61):
+            for check in workers:
+                try:
+                    await check(request_from("203.0.113.7"))
+                    allowed += 1
+                except HTTPException:
+                    pass
+            clock.now += 1
+        return allowed
+
+    # Spread over every worker, a client gets the burst plus a minute of refill, not four times that
+    assert 8 <= asyncio.run(scenario()) <= 4 + 8
+    assert rate_limit_module.limiters["shared_test_0"].burst == 1
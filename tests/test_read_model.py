@@ -0,0 +1,138 @@
+import asyncio
+import os
+import signal
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache import ResponseCache
+from read_model import ReadModel
+import read_model as read_model_module
+
+START = datetime(2026, 1, 1)
+COLLECTIONS = {"projects": {}, "testimonials": {"approved": True}}
+
+
+def document(number, **fields):
+    return {"id": f"doc-{number}", "created_at": START + timedelta(minutes=number), **fields}
+
+
+@pytest.fixture
+def database(mongo, monkeypatch):
+    monkeypatch.setattr(read_model_module, "db", mongo)
+    return mongo
+
+
+async def seeded(database):
+    await database.projects.insert_many([document(1, title="First"), document(2, title="Second")])
+    await database.testimonials.insert_many([document(3, approved=True), document(4, approved=False)])
+    model = ReadModel(ResponseCache(ttl_seconds=60), COLLECTIONS)
+    await model.start()
+    return model
+
+
+def test_start_loads_each_collection_newest_first_with_its_filter(database):
+    async def scenario():
+        model = await seeded(database)
+        return await model.snapshot("projects"), await model.snapshot("testimonials"), model.stats()
+
+    projects, testimonials, stats = asyncio.run(scenario())
+    assert [item["id"] for item in projects.documents] == ["doc-2", "doc-1"]
+    assert [item["id"] for item in testimonials.documents] == ["doc-3"]
+    assert stats["documents"] == 3
+    assert testimonials.covers({"approved": True})
+    # Unapproved testimonials are not in the snapshot, so those reads go to Mongo
+    assert not testimonials.covers({"approved": False})
+    assert not projects.covers({"created_at": {"$gt": START}})
+
+
+def test_snapshot_documents_are_handed_out_as_copies(database):
+    async def scenario():
+        model = await seeded(database)
+        snapshot = await model.snapshot("projects")
+        copy = snapshot.find_one({"id": "doc-1"})
+        copy["title"] = "Changed by a caller"
+        return snapshot.find_one({"id": "doc-1"})
+
+    assert asyncio.run(scenario())["title"] == "First"
+
+
+def test_local_write_is_visible_to_the_next_read(database):
+    async def scenario():
+        model = await seeded(database)
+        await database.projects.insert_one(document(5, title="Fresh"))
+        model.cache.invalidate("projects")
+        # The read waits for the reload the write started
+        return await model.snapshot("projects")
+
+    snapshot = asyncio.run(scenario())
+    assert [item["id"] for item in snapshot.documents] == ["doc-5", "doc-2", "doc-1"]
+
+
+def test_failed_reload_keeps_the_previous_snapshots(database, monkeypatch):
+    async def scenario():
+        model = await seeded(database)
+
+        async def failing(name):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(model, "_load", failing)
+        with pytest.raises(RuntimeError):
+            await model.reload()
+        return await model.snapshot("projects"), model.stats()
+
+    snapshot, stats = asyncio.run(scenario())
+    assert len(snapshot) == 2
+    assert stats["failures"] == 1
+    assert stats["last_error"] == "database unavailable"
+
+
+def test_reload_is_a_no_op_until_started(database):
+    async def scenario():
+        model = ReadModel(ResponseCache(ttl_seconds=60), COLLECTIONS)
+        await model.reload_collection("projects")
+        return await model.snapshot("projects"), model.stats()
+
+    snapshot, stats = asyncio.run(scenario())
+    assert snapshot is None
+    assert stats["reloads"] == 0
+
+
+@pytest.fixture
+def server_read_model(database, monkeypatch):
+    server = pytest.importorskip("server")
+
+    async def no_op():
+        pass
+
+    model = ReadModel(ResponseCache(ttl_seconds=60), COLLECTIONS)
+    monkeypatch.setattr(server, "read_model", model)
+    monkeypatch.setattr(server, "build_search_index", no_op)
+    monkeypatch.setattr(server, "build_related_projects", no_op)
+    return server, model
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP is Unix only")
+def test_sighup_reloads_the_read_model(database, server_read_model):
+    server, model = server_read_model
+
+    async def scenario():
+        await database.projects.insert_one(document(1, title="First"))
+        await model.start()
+        await database.projects.insert_one(document(2, title="Edited directly in Mongo"))
+
+        server.watch_sighup(True)
+        try:
+            # Only send the signal if the handler is in place, or it would end the test run
+            assert signal.getsignal(signal.SIGHUP) not in (signal.SIG_DFL, None)
+            os.kill(os.getpid(), signal.SIGHUP)
+            for _ in range(100):
+                if model.reloads > 1 and not server.signal_reloads:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            server.watch_sighup(False)
+        return await model.snapshot("projects")
+
+    snapshot = asyncio.run(scenario())
+    assert [item["id"] for item in snapshot.documents] == ["doc-2", "doc-1"]
@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+import pytest
+
+from related import RelatedProjectsIndex, project_features
+import related
+
+TOOLS = ["clo3d", "illustrator", "photoshop", "python", "excel", "figma", "browzwear", "sql"]
+CATEGORIES = ["Sustainability", "AI", "Design", "Research"]
+COMPANIES = ["Lulu Group", "Mad Street Den", "Kent State"]
+WORDS = ["hemp", "fiber", "circular", "garment", "vision", "textile", "recycled", "pattern", "dye", "trend"]
+
+
+def random_project(rng, number):
+    return {
+        "id": f"project-{number:02d}",
+        "title": f"Project {number}",
+        "category": rng.choice(CATEGORIES),
+        "company": rng.choice(COMPANIES),
+        "tools": rng.sample(TOOLS, rng.randint(0, 3)),
+        "description": " ".join(rng.sample(WORDS, rng.randint(1, 4))),
+    }
+
+
+def neighbours(index, ids):
+    return {project_id: index.related(project_id) for project_id in sorted(ids)}
+
+
+def test_features_combine_tools_category_company_and_terms():
+    features = project_features({
+        "tools": [" CLO3D "], "category": "Design", "company": "Lulu Group", "description": "Recycled hemp",
+    })
+    assert {"tool:clo3d", "category:design", "company:lulu group"} <= features
+    assert any(feature.startswith("term:") for feature in features)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_changes_match_a_full_rebuild(seed):
+    rng = random.Random(seed)
+    incremental = RelatedProjectsIndex(top_n=3)
+    current = {}
+    for step in range(60):
+        action = rng.random()
+        if current and action < 0.25:
+            project_id = rng.choice(sorted(current))
+            del current[project_id]
+            incremental.remove(project_id)
+        else:
+            # Updates an existing project about a third of the time
+            project = random_project(rng, rng.randrange(20))
+            current[project["id"]] = project
+            incremental.upsert(project)
+
+    rebuilt = RelatedProjectsIndex(top_n=3)
+    rebuilt.rebuild(list(current.values()))
+    assert len(incremental) == len(rebuilt) == len(current)
+    assert neighbours(incremental, current) == neighbours(rebuilt, current)
+
+
+def test_removed_project_is_unknown_and_dropped_from_neighbours():
+    index = RelatedProjectsIndex(top_n=2)
+    index.rebuild([
+        {"id": "a", "tools": ["python"], "category": "AI"},
+        {"id": "b", "tools": ["python"], "category": "AI"},
+        {"id": "c", "tools": ["python"], "category": "Design"},
+    ])
+    assert [item["id"] for item in index.related("a")] == ["b", "c"]
+    index.remove("b")
+    assert index.related("b") is None
+    assert [item["id"] for item in index.related("a")] == ["c"]
+
+
+class Projects:
+    """Project collection whose find() lets a write land during the first load"""
+
+    def __init__(self, documents, during_first_load):
+        self.documents = documents
+        self.during_first_load = during_first_load
+        self.loads = 0
+
+    def find(self, *args):
+        self.loads += 1
+        snapshot = list(self.documents)
+        if self.loads == 1:
+            self.during_first_load()
+
+        async def cursor():
+            for document in snapshot:
+                yield document
+        return cursor()
+
+
+def test_rebuild_rereads_when_a_write_lands_during_the_load(monkeypatch):
+    index = RelatedProjectsIndex(top_n=2)
+    documents = [{"id": "a", "tools": ["python"]}]
+    added = {"id": "b", "tools": ["python"]}
+
+    def write():
+        documents.append(added)
+        index.upsert(added)
+
+    collection = Projects(documents, write)
+    monkeypatch.setattr(related, "related_projects", index)
+    monkeypatch.setattr(related, "projects_collection", collection)
+
+    asyncio.run(related.build_related_projects())
+    assert collection.loads == 2
+    assert [item["id"] for item in index.related("a")] == ["b"]
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from visitors import VisitorSketches
+import rollups
+
+HOUR = datetime(2026, 5, 1, 10, 0)
+
+
+@pytest.fixture
+def collection(mongo, monkeypatch):
+    collection = mongo.page_view_rollups
+    monkeypatch.setattr(rollups, "page_view_rollups_collection", collection)
+    return collection
+
+
+def view(page, minutes, ip="198.51.100.1"):
+    return {"page": page, "timestamp": HOUR + timedelta(minutes=minutes), "ip_address": ip, "user_agent": "test"}
+
+
+EVENTS = [
+    view("/", 1, "198.51.100.1"),
+    view("/", 2, "198.51.100.2"),
+    view("/about", 3, "198.51.100.1"),
+    view("/about", 65, "198.51.100.3"),
+]
+
+
+def test_site_totals_are_kept_at_ingest(collection):
+    async def scenario():
+        await rollups.record_rollups(EVENTS[:2])
+        await rollups.record_rollups(EVENTS[2:])
+        site = await rollups.load_summary(None, HOUR, HOUR + timedelta(hours=2), "hour")
+        about = await rollups.load_summary("/about", HOUR, HOUR + timedelta(hours=2), "hour")
+        site_documents = await collection.count_documents({"page": rollups.SITE_PAGE, "granularity": "hour"})
+        return site, about, site_documents
+
+    site, about, site_documents = asyncio.run(scenario())
+    assert site == [
+        {"bucket": HOUR, "views": 3},
+        {"bucket": HOUR + timedelta(hours=1), "views": 1},
+    ]
+    assert [bucket["views"] for bucket in about] == [1, 1]
+    # One site document per bucket, however many pages had views
+    assert site_documents == 2
+
+
+def test_site_unique_visitors_come_from_the_site_sketch(collection):
+    async def scenario():
+        await rollups.record_rollups(EVENTS)
+        sketches = VisitorSketches(collection)
+        await sketches.record(EVENTS)
+        return (
+            await sketches.unique_visitors(None, HOUR, HOUR + timedelta(hours=2), "hour"),
+            await sketches.unique_visitors("/about", HOUR, HOUR + timedelta(hours=2), "hour"),
+        )
+
+    (site_buckets, site_total), (about_buckets, about_total) = asyncio.run(scenario())
+    # 198.51.100.1 viewed both pages but is one visitor site-wide
+    assert site_buckets == {HOUR: 2, HOUR + timedelta(hours=1): 1}
+    assert site_total == 3
+    assert about_total == 2
+
+
+def test_fine_grained_rollups_expire(collection):
+    async def scenario():
+        await rollups.record_rollups(EVENTS[:1])
+        return {
+            document["granularity"]: document.get("expires_at")
+            async for document in collection.find({"page": "/"})
+        }
+
+    expires = asyncio.run(scenario())
+    assert expires["minute"] == HOUR + timedelta(minutes=1) + rollups.ROLLUP_RETENTION["minute"]
+    assert expires["hour"] == HOUR + rollups.ROLLUP_RETENTION["hour"]
+    # Day buckets keep the long-term counts
+    assert expires["day"] is None
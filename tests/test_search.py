@@ -0,0 +1,123 @@
+import asyncio
+import random
+
+import pytest
+
+from search import SearchIndex, tokenize
+import search
+
+PROJECTS = [
+    {"id": "hemp", "title": "Hemp fiber classification", "description": "Machine vision for hemp fibers", "tools": ["Python"]},
+    {"id": "dye", "title": "Natural dye study", "description": "Plant dyes on hemp and cotton", "tools": ["Excel"]},
+    {"id": "ai", "title": "AI quality assurance", "description": "Sustainability checks at scale", "tools": ["Python", "SQL"]},
+]
+SERVICES = [
+    {"id": "consulting", "title": "Sustainability consulting", "description": "Circular design programs"},
+]
+
+
+def built():
+    index = SearchIndex()
+    index.rebuild({"projects": PROJECTS, "services": SERVICES})
+    return index
+
+
+def ranked(index, query, **options):
+    return [hit["id"] for hit in index.search(query, **options)]
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Hemp-Fiber of 2025") == ["hemp", "fiber", "2025"]
+
+
+def test_title_matches_outrank_description_matches():
+    # "hemp" is in one title and one description
+    assert ranked(built(), "hemp") == ["hemp", "dye"]
+
+
+def test_rarer_terms_weigh_more():
+    index = built()
+    # "python" appears in two documents, "dye" in one
+    assert ranked(index, "python dye")[0] == "dye"
+
+
+def test_prefixes_match_and_rank_below_exact_terms():
+    index = built()
+    assert set(ranked(index, "sustain")) == {"ai", "consulting"}
+    exact = {hit["id"]: hit["score"] for hit in index.search("fiber")}
+    prefix = {hit["id"]: hit["score"] for hit in index.search("fib")}
+    assert prefix["hemp"] < exact["hemp"]
+
+
+def test_results_can_be_limited_to_collections():
+    index = built()
+    hits = index.search("sustainability", collections=["services"])
+    assert [(hit["collection"], hit["id"]) for hit in hits] == [("services", "consulting")]
+    assert hits[0]["title"] == "Sustainability consulting"
+    assert ranked(index, "sustainability", limit=1) == ranked(index, "sustainability")[:1]
+
+
+def test_update_replaces_the_previous_terms():
+    index = built()
+    index.upsert("projects", {"id": "dye", "title": "Indigo workshop", "description": "Fermentation vats"})
+    assert ranked(index, "dye") == []
+    assert ranked(index, "indigo") == ["dye"]
+    assert len(index) == 4
+
+
+def scores(index, query):
+    return sorted((hit["collection"], hit["id"], hit["score"]) for hit in index.search(query, limit=100))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_updates_match_a_rebuild(seed):
+    rng = random.Random(seed)
+    words = ["hemp", "fiber", "circular", "vision", "dye", "cotton", "python", "design", "recycled"]
+    incremental = SearchIndex()
+    current = {}
+    for _ in range(80):
+        key = (rng.choice(["projects", "services"]), f"doc-{rng.randrange(12)}")
+        if key in current and rng.random() < 0.3:
+            del current[key]
+            incremental.remove(*key)
+        else:
+            document = {
+                "id": key[1],
+                "title": " ".join(rng.sample(words, 2)),
+                "description": " ".join(rng.sample(words, 4)),
+            }
+            current[key] = document
+            incremental.upsert(key[0], document)
+
+    rebuilt = SearchIndex()
+    rebuilt.rebuild({
+        collection: [document for (name, _), document in current.items() if name == collection]
+        for collection in ("projects", "services")
+    })
+    assert len(incremental) == len(rebuilt)
+    for query in ["hemp", "fib", "circular design", "python cotton", "re"]:
+        assert scores(incremental, query) == scores(rebuilt, query)
+
+
+def test_removing_the_last_document_with_a_term_drops_the_term():
+    index = built()
+    index.remove("services", "consulting")
+    index.remove("projects", "dye")
+    assert ranked(index, "circular") == []
+    assert ranked(index, "cotton") == []
+    assert ranked(index, "hemp") == ["hemp"]
+
+
+def test_build_search_index_loads_every_collection(mongo, monkeypatch):
+    index = SearchIndex()
+    monkeypatch.setattr(search, "search_index", index)
+    monkeypatch.setattr(search, "SEARCH_COLLECTIONS", {"projects": mongo.projects, "services": mongo.services})
+
+    async def scenario():
+        await mongo.projects.insert_many([dict(project) for project in PROJECTS])
+        await mongo.services.insert_many([dict(service) for service in SERVICES])
+        await search.build_search_index()
+
+    asyncio.run(scenario())
+    assert len(index) == 4
+    assert ranked(index, "circular") == ["consulting"]
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from cache import ResponseCache
+import cache as cache_module
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+class Loader:
+    """Counts calls and, when gated, holds each call until release() lets it return"""
+
+    def __init__(self, value="fresh", gated=False):
+        self.value = value
+        self.calls = 0
+        self.gated = gated
+        self.gates = {}
+
+    def release(self, call=None):
+        for number in [call] if call else list(self.gates):
+            self.gates[number].set()
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        if self.gated:
+            gate = self.gates[call] = asyncio.Event()
+            await gate.wait()
+        return f"{self.value}-{call}"
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache(ttl_seconds=60)
+    loader = Loader(gated=True)
+
+    async def scenario():
+        requests = [asyncio.create_task(cache.get_or_load("projects", None, loader)) for _ in range(5)]
+        while loader.calls < 1:
+            await asyncio.sleep(0)
+        loader.release()
+        return await asyncio.gather(*requests)
+
+    assert asyncio.run(scenario()) == ["fresh-1"] * 5
+    assert loader.calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_invalidation_during_a_load_is_not_cached():
+    cache = ResponseCache(ttl_seconds=60)
+    loader = Loader(gated=True)
+
+    async def scenario():
+        before = asyncio.create_task(cache.get_or_load("projects", None, loader))
+        while loader.calls < 1:
+            await asyncio.sleep(0)
+        # A write lands while the first load is still reading
+        cache.invalidate("projects")
+        after = asyncio.create_task(cache.get_or_load("projects", None, loader))
+        while loader.calls < 2:
+            await asyncio.sleep(0)
+        # The load that read before the write finishes last
+        loader.release(2)
+        after = await after
+        loader.release(1)
+        return await before, after, cache.get("projects")
+
+    before, after, cached = asyncio.run(scenario())
+    # The request after the write did not join the load that started before it
+    assert loader.calls == 2
+    assert before == "fresh-1"
+    assert after == "fresh-2"
+    assert cached == "fresh-2"
+
+
+def test_stale_entry_is_served_while_one_task_refreshes_it():
+    cache = ResponseCache(ttl_seconds=60, stale_seconds=60)
+    loader = Loader(gated=True)
+
+    async def scenario():
+        cache.set("projects", None, "stale", ttl=-1)
+        served = [await cache.get_or_load("projects", None, loader) for _ in range(3)]
+        while loader.calls < 1:
+            await asyncio.sleep(0)
+        loader.release()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return served, cache.get("projects")
+
+    served, refreshed = asyncio.run(scenario())
+    assert served == ["stale"] * 3
+    assert loader.calls == 1
+    assert refreshed == "fresh-1"
+    assert cache.stats()["stale_served"] == 3
+
+
+def test_failed_refresh_keeps_serving_the_stale_entry():
+    cache = ResponseCache(ttl_seconds=60, stale_seconds=60)
+
+    async def failing():
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        cache.set("projects", None, "stale", ttl=-1)
+        first = await cache.get_or_load("projects", None, failing)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return first, await cache.get_or_load("projects", None, failing)
+
+    assert asyncio.run(scenario()) == ("stale", "stale")
+    assert cache.stats()["refresh_failures"] >= 1
+
+
+def test_expired_entry_past_the_stale_window_is_reloaded(clock):
+    cache = ResponseCache(ttl_seconds=10, stale_seconds=5)
+    loader = Loader()
+
+    async def scenario():
+        await cache.get_or_load("projects", None, loader)
+        clock.now += 20
+        return await cache.get_or_load("projects", None, loader)
+
+    assert asyncio.run(scenario()) == "fresh-2"
+    assert loader.calls == 2
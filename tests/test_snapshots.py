@@ -0,0 +1,56 @@
+import asyncio
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from models import SuccessResponse
+from snapshots import EncodedResponse
+import snapshots
+
+
+def get(accept_encoding):
+    return Request({"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+
+def payload(size):
+    return SuccessResponse(data={"text": "fiber " * size}, message="ok")
+
+
+@pytest.fixture
+def compressions(monkeypatch):
+    calls = []
+
+    def compress(body):
+        calls.append(len(body))
+        return gzip.compress(body, compresslevel=snapshots.GZIP_LEVEL)
+
+    monkeypatch.setitem(snapshots.COMPRESSORS, "gzip", compress)
+    return calls
+
+
+def test_encodings_are_built_on_first_request(compressions):
+    snapshot = EncodedResponse.build(payload(1000))
+    assert list(snapshot.bodies) == ["identity"]
+
+    async def scenario():
+        plain = await snapshot.respond(get("identity"))
+        assert compressions == []
+        responses = await asyncio.gather(*(snapshot.respond(get("gzip")) for _ in range(5)))
+        return plain, responses
+
+    plain, responses = asyncio.run(scenario())
+    # Concurrent requests for the same coding share one compression
+    assert len(compressions) == 1
+    for response in responses:
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(response.body) == plain.body
+
+
+def test_small_bodies_are_not_compressed(compressions):
+    snapshot = EncodedResponse.build(payload(1))
+
+    response = asyncio.run(snapshot.respond(get("gzip, br")))
+    assert "content-encoding" not in response.headers
+    assert compressions == []
+
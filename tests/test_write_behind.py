@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from write_behind import DUPLICATE_KEY, QueueFullError, WriteBehindQueue
+
+
+class FlakyCollection:
+    """Collection whose insert_many replays scripted failures before succeeding"""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.stored = {}
+        self.calls = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls.append([document["id"] for document in documents])
+        for document in documents:
+            document.setdefault("_id", document["id"])
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, Exception):
+            raise failure
+        write_errors = []
+        for index, document in enumerate(documents):
+            if failure and document["id"] in failure:
+                write_errors.append({"index": index, "code": 121, "errmsg": "Document failed validation"})
+            elif document["_id"] in self.stored:
+                write_errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": "duplicate key"})
+            else:
+                self.stored[document["_id"]] = document
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "nInserted": len(documents) - len(write_errors)})
+
+
+def documents(count):
+    return [{"id": f"doc-{index}"} for index in range(count)]
+
+
+def run_queue(collection, items, **options):
+    written = []
+
+    async def on_write(batch):
+        written.extend(document["id"] for document in batch)
+
+    async def scenario():
+        queue = WriteBehindQueue(collection, flush_interval=0.01, retry_delay=0.001, on_write=on_write, **options)
+        queue.start()
+        for item in items:
+            queue.put(item)
+        await queue.stop()
+        return queue.stats()
+
+    return asyncio.run(scenario()), written
+
+
+def test_batches_are_written_and_reported():
+    collection = FlakyCollection()
+    stats, written = run_queue(collection, documents(5))
+    assert sorted(collection.stored) == [f"doc-{index}" for index in range(5)]
+    assert sorted(written) == sorted(collection.stored)
+    assert stats["written"] == 5 and stats["failed"] == 0
+
+
+def test_partial_failure_reports_inserted_rows_and_retries_the_rest():
+    collection = FlakyCollection(failures=[{"doc-1"}])
+    stats, written = run_queue(collection, documents(3))
+    assert collection.calls == [["doc-0", "doc-1", "doc-2"], ["doc-1"]]
+    assert written == ["doc-0", "doc-2", "doc-1"]
+    assert stats["written"] == 3 and stats["retries"] == 1 and stats["failed"] == 0
+
+
+def test_flush_failure_with_unknown_outcome_is_retried_without_duplicates():
+    collection = FlakyCollection(failures=[AutoReconnect("connection reset")])
+    # Pretend the failed attempt stored the first document before the connection dropped
+    items = documents(2)
+    collection.stored["doc-0"] = items[0]
+    stats, written = run_queue(collection, items)
+    assert len(collection.calls) == 2
+    assert sorted(written) == ["doc-0", "doc-1"]
+    assert stats["written"] == 2 and stats["failed"] == 0
+
+
+def test_documents_are_given_up_after_max_retries():
+    collection = FlakyCollection(failures=[AutoReconnect("down")] * 10)
+    stats, written = run_queue(collection, documents(2), max_retries=2)
+    assert len(collection.calls) == 3
+    assert written == []
+    assert stats["failed"] == 2 and stats["retries"] == 2
+
+
+def test_full_queue_rejects_puts():
+    async def scenario():
+        queue = WriteBehindQueue(FlakyCollection(), max_size=1)
+        queue.start()
+        queue.put({"id": "first"})
+        with pytest.raises(QueueFullError):
+            queue.put({"id": "second"})
+        await queue.stop()
+        return queue.stats()
+
+    assert asyncio.run(scenario())["rejected"] == 1